@@ -4,12 +4,14 @@ Cog pour les commandes d'administration
 import discord
 from discord import app_commands
 from discord.ext import commands
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from config.logging_config import get_logger
 from config.bot_config import bot_settings, ERROR_MESSAGES
 from locales.translation_manager import translator
+from services.purge_service import PurgeAlreadyRunning
 
 logger = get_logger('admin')
 
@@ -32,18 +34,8 @@ class AdminCog(commands.Cog):
         
         try:
             
-            # Obtenir le forum d'alertes
-            alerts_forum = discord.utils.get(
-                interaction.guild.channels, 
-                name=bot_settings.alerts_channel_name
-            )
-            
-            if not alerts_forum:
-                logger.warning("Forum d'alertes non trouvé; stats forum indisponibles.")
-                stats = {'total': 0, 'validated': 0, 'pending': 0}
-            else:
-                # Calculer les statistiques
-                stats = await self._calculate_stats(alerts_forum, period or 7)
+            # Calculer les statistiques (compteurs locaux, sans parcourir le forum)
+            stats = self._calculate_stats(interaction.guild_id, period or 7)
             
             # Créer l'embed
             embed = discord.Embed(
@@ -68,11 +60,30 @@ class AdminCog(commands.Cog):
                 value=str(stats['pending']), 
                 inline=True
             ) 
+            embed.add_field(name="❌ Rejetés", value=str(stats['rejected']), inline=True)
+            
+            # Compteurs journaliers de la période (sans relecture des données brutes)
+            rollup = getattr(self.bot, 'stats_rollup', None)
+            if rollup:
+                period_stats = rollup.get_period(interaction.guild_id, period or 7)
+                totals = period_stats['totals']
+                embed.add_field(name="🔍 Vérifications", value=str(totals['checks']), inline=True)
+                embed.add_field(name="🚨 Flags trouvés", value=str(totals['flags_found']), inline=True)
+                
+                by_category = sorted(
+                    period_stats['by_category'].items(),
+                    key=lambda item: item[1].get('reports_created', 0),
+                    reverse=True
+                )
+                parts = [f"{category}: {counters.get('reports_created', 0)}" for category, counters in by_category[:5]]
+                if parts:
+                    embed.add_field(name="🏷️ Catégories", value=", ".join(parts)[:1024], inline=False)
             
             # Statistiques Supabase (si disponibles)
             try:
                 db_client = getattr(getattr(self.bot, 'report_service', None), 'db', None)
-                if bot_settings.supabase_enabled and db_client and hasattr(db_client, 'get_guild_stats'):
+                # Sans statistiques journalières, se rabattre sur les compteurs Supabase
+                if not rollup and bot_settings.supabase_enabled and db_client and hasattr(db_client, 'get_guild_stats'):
                     supa = await db_client.get_guild_stats(interaction.guild_id, period or 7)
                     if supa:
                         embed.add_field(name="Vérifications", value=str(supa.get('total_checks', 0)), inline=True)
@@ -123,19 +134,22 @@ class AdminCog(commands.Cog):
         
         await interaction.response.defer(ephemeral=True)
         
+        # Catalogue de la langue du serveur pour toute la commande
+        texts = translator.catalog(interaction.guild_id)
+        
         try:
             
             # Vérifier si Supabase est activé
             if not bot_settings.supabase_enabled:
                 await interaction.followup.send(
-                    translator.t("admin_database_disabled", interaction.guild_id),
+                    texts.get("admin_database_disabled"),
                     ephemeral=True
                 )
                 return
             
             embed = discord.Embed(
-                title=translator.t("check_title", interaction.guild_id),
-                description=translator.t("check_description", interaction.guild_id, user_mention=user.mention, user_id=user.id),
+                title=texts.get("check_title"),
+                description=texts.get("check_description", user_mention=user.mention, user_id=user.id),
                 color=discord.Color.orange()
             )
             
@@ -164,20 +178,21 @@ class AdminCog(commands.Cog):
                 except Exception as e:
                     logger.warning(f"Erreur vérification Supabase: {e}")
             
+            rollup = getattr(self.bot, 'stats_rollup', None)
+            if rollup:
+                rollup.record(interaction.guild_id, "checks")
+                if supabase_flag and supabase_flag.get('is_flagged'):
+                    rollup.record(interaction.guild_id, "flags_found")
+            
             # Chercher les signalements locaux concernant cet utilisateur
             user_reports = []
             if hasattr(self.bot, 'report_service'):
-                for report in self.bot.report_service.active_reports.values():
-                    # Priorité à l'ID utilisateur, puis au nom
-                    if (report.target_user_id and report.target_user_id == user.id) or \
-                       (report.target_username.lower() == user.name.lower() or 
-                        report.target_username.lower() == user.display_name.lower()):
-                        user_reports.append(report)
+                # Par ID utilisateur puis par nom (triés du plus récent au plus ancien)
+                user_reports = self.bot.report_service.get_reports_for_target(
+                    user.id, usernames=(user.name, user.display_name)
+                )
             
             if user_reports:
-                # Trier par date (plus récent en premier)
-                user_reports.sort(key=lambda r: r.created_at, reverse=True)
-                
                 # Statistiques
                 validated_count = len([r for r in user_reports if r.status == "validated"])
                 pending_count = len([r for r in user_reports if r.status == "pending"])
@@ -230,17 +245,17 @@ class AdminCog(commands.Cog):
                 
             else:
                 embed.add_field(
-                    name=translator.t("check_local_reports", interaction.guild_id),
-                    value=translator.t("check_no_local_reports", interaction.guild_id),
+                    name=texts.get("check_local_reports"),
+                    value=texts.get("check_no_local_reports"),
                     inline=True
                 )
             
             # Afficher les informations de la base globale Supabase
-            if supabase_flag:
+            if supabase_flag and supabase_flag.get('is_flagged'):
                 # Nouveau format avec niveaux et historique
                 active_flags = supabase_flag.get('active_flags', 0)
                 total_flags = supabase_flag.get('total_flags', 0)
-                current_level = supabase_flag.get('current_level', 'unknown').upper()
+                current_level = supabase_flag.get('current_level', supabase_flag.get('risk_level', 'unknown')).upper()
                 
                 # Extraire la dernière raison de l'historique JSON
                 flag_history = supabase_flag.get('flag_history', [])
@@ -254,9 +269,14 @@ class AdminCog(commands.Cog):
                             last_reason = flag_item.get('reason', 'N/A')[:50]
                             last_category = flag_item.get('category', 'N/A')
                             break
+                elif supabase_flag.get('reports'):
+                    # Signalements validés récents (du plus récent au plus ancien)
+                    latest_report = supabase_flag['reports'][0]
+                    last_reason = (latest_report.get('reason') or 'N/A')[:50]
+                    last_category = latest_report.get('category') or 'N/A'
                 
                 embed.add_field(
-                    name=translator.t("check_global_database", interaction.guild_id),
+                    name=texts.get("check_global_database"),
                     value=f"🚨 **UTILISATEUR FLAGGÉ**\n"
                           f"**Niveau:** {current_level}\n"
                           f"**Flags actifs/total:** {active_flags}/{total_flags}\n"
@@ -267,16 +287,16 @@ class AdminCog(commands.Cog):
                 embed.color = discord.Color.red()
             elif hasattr(self.bot.report_service, 'db') and self.bot.report_service.db and self.bot.report_service.db.is_connected:
                 embed.add_field(
-                    name=translator.t("check_global_database", interaction.guild_id),
-                    value=translator.t("check_not_flagged_globally", interaction.guild_id),
+                    name=texts.get("check_global_database"),
+                    value=texts.get("check_not_flagged_globally"),
                     inline=True
                 )
                 if not user_reports:  # Seulement vert si pas de signalements locaux non plus
                     embed.color = discord.Color.green()
             else:
                 embed.add_field(
-                    name=translator.t("check_global_database", interaction.guild_id),
-                    value=translator.t("check_database_unavailable", interaction.guild_id),
+                    name=texts.get("check_global_database"),
+                    value=texts.get("check_database_unavailable"),
                     inline=True
                 )
             
@@ -285,7 +305,7 @@ class AdminCog(commands.Cog):
         except Exception as e:
             logger.error(f"Erreur dans /check: {e}")
             await interaction.followup.send(
-                translator.t("admin_verification_error", interaction.guild_id),
+                texts.get("admin_verification_error"),
                 ephemeral=True
             )
     
@@ -383,56 +403,73 @@ class AdminCog(commands.Cog):
                 )
                 return
             
-            # Calculer la date de coupure
+            engine = getattr(self.bot, 'purge_engine', None)
+            if not engine:
+                await interaction.followup.send(
+                    translator.t("purge_error", interaction.guild_id),
+                    ephemeral=True
+                )
+                return
+            
+            # Calculer la date de coupure (une purge interrompue reprend avec son propre critère)
             cutoff_date = datetime.now(timezone.utc) - timedelta(days=days or 30)
+            job = await engine.start(interaction.guild_id, alerts_forum.id, cutoff_date, days or 30)
+            
+            def _progress_embed(title_key: str, color: discord.Color, final: bool = False) -> discord.Embed:
+                embed = discord.Embed(
+                    title=translator.t(title_key, interaction.guild_id),
+                    description=translator.t("purge_cleanup_description", interaction.guild_id, days=job.days),
+                    color=color
+                )
+                if job.resumed:
+                    embed.set_footer(text=translator.t("purge_resumed", interaction.guild_id))
+                if final:
+                    value = translator.t("purge_results_value", interaction.guild_id, 
+                                         deleted_count=job.deleted, 
+                                         active_count=job.active_deleted,
+                                         archived_count=job.archived_deleted, 
+                                         days=job.days)
+                else:
+                    value = translator.t("purge_progress_value", interaction.guild_id,
+                                         scanned=job.scanned,
+                                         deleted_count=job.deleted,
+                                         failed_count=job.failed,
+                                         reports_count=job.reports_purged)
+                embed.add_field(
+                    name=translator.t("purge_results_field", interaction.guild_id),
+                    value=value,
+                    inline=False
+                )
+                return embed
+            
+            progress_message = await interaction.followup.send(
+                embed=_progress_embed("purge_in_progress", discord.Color.orange()),
+                ephemeral=True,
+                wait=True
+            )
+            last_edit = time.monotonic()
+            
+            async def _on_progress(_job):
+                # Une édition toutes les 2 secondes au plus (rate limit des webhooks)
+                nonlocal last_edit
+                if time.monotonic() - last_edit >= 2:
+                    last_edit = time.monotonic()
+                    await progress_message.edit(embed=_progress_embed("purge_in_progress", discord.Color.orange()))
             
-            deleted_count = 0
-            active_deleted = 0
-            archived_deleted = 0
-            
-            # Nettoyer les threads ACTIFS anciens d'abord
-            if hasattr(alerts_forum, 'threads'):
-                for thread in alerts_forum.threads:
-                    if thread.created_at and thread.created_at < cutoff_date:
-                        try:
-                            await thread.delete()
-                            active_deleted += 1
-                            deleted_count += 1
-                        except Exception as e:
-                            logger.debug(f"Erreur suppression thread actif {thread.id}: {e}")
-            
-            # Nettoyer les threads archivés anciens
-            async for thread in alerts_forum.archived_threads(limit=200):
-                if thread.created_at and thread.created_at < cutoff_date:
-                    try:
-                        await thread.delete()
-                        archived_deleted += 1
-                        deleted_count += 1
-                    except Exception as e:
-                        logger.debug(f"Erreur suppression thread archivé {thread.id}: {e}")
+            try:
+                await engine.run(alerts_forum, job, _on_progress)
+            except PurgeAlreadyRunning:
+                await progress_message.edit(content=translator.t("purge_already_running", interaction.guild_id), embed=None)
+                return
             
             # Nettoyer le service si disponible
             if hasattr(self.bot, 'report_service'):
-                await self.bot.report_service.cleanup_old_reports(days or 30)
-            
-            embed = discord.Embed(
-                title=translator.t("purge_cleanup_completed", interaction.guild_id),
-                description=translator.t("purge_cleanup_description", interaction.guild_id, days=days or 30),
-                color=discord.Color.green()
-            )
+                await self.bot.report_service.cleanup_old_reports(job.days)
             
-            embed.add_field(
-                name=translator.t("purge_results_field", interaction.guild_id),
-                value=translator.t("purge_results_value", interaction.guild_id, 
-                                 deleted_count=deleted_count, 
-                                 active_count=active_deleted,
-                                 archived_count=archived_deleted, 
-                                 days=days or 30),
-                inline=False
+            await progress_message.edit(
+                embed=_progress_embed("purge_cleanup_completed", discord.Color.green(), final=True)
             )
             
-            await interaction.followup.send(embed=embed, ephemeral=True)
-            
         except Exception as e:
             logger.error(f"Erreur dans /purge: {e}")
             await interaction.followup.send(
@@ -460,42 +497,27 @@ class AdminCog(commands.Cog):
         """Vérifier si l'utilisateur peut valider des signalements"""
         return self._check_admin_permissions(interaction)
     
-    async def _calculate_stats(self, alerts_forum, period_days: int) -> dict:
-        """Calculer les statistiques du forum"""
-        cutoff_date = datetime.now(timezone.utc) - timedelta(days=period_days)
-        
-        total_reports = 0
-        validated_reports = 0
+    def _calculate_stats(self, guild_id: int, period_days: int) -> dict:
+        """
+        Calculer les statistiques des signalements du serveur
         
-        try:
-            # Analyser les threads archivés
-            async for thread in alerts_forum.archived_threads(limit=100):
-                if thread.created_at and thread.created_at >= cutoff_date:
-                    total_reports += 1
-                    
-                    # Vérifier si validé (recherche simple)
-                    async for message in thread.history(limit=20):
-                        if "validé" in message.content.lower() or "✅" in message.content:
-                            validated_reports += 1
-                            break
-            
-            # Analyser les threads actifs
-            for thread in alerts_forum.threads:
-                if thread.created_at and thread.created_at >= cutoff_date:
-                    total_reports += 1
-                    
-                    async for message in thread.history(limit=20):
-                        if "validé" in message.content.lower() or "✅" in message.content:
-                            validated_reports += 1
-                            break
-            
-        except Exception as e:
-            logger.error(f"Erreur lors du calcul des statistiques: {e}")
+        Tous les nombres viennent du statut des signalements conservés par le
+        ReportService (restaurés depuis le stockage persistant), comptés par date
+        de création: total, validés et en attente sont toujours cohérents et
+        comparables au parcours du forum (/debug-reconcile-stats). Aucun appel à
+        l'API Discord. Les statistiques journalières, datées par événement,
+        ne servent qu'aux compteurs d'activité (vérifications, flags). Les
+        signalements clos sont conservés 30 jours (nettoyage planifié).
+        """
+        cutoff_date = datetime.utcnow() - timedelta(days=period_days)
+        report_service = getattr(self.bot, 'report_service', None)
+        counts = report_service.get_guild_status_counts(guild_id, since=cutoff_date) if report_service else {}
         
         return {
-            'total': total_reports,
-            'validated': validated_reports,
-            'pending': total_reports - validated_reports
+            'total': sum(counts.values()),
+            'validated': counts.get('validated', 0),
+            'pending': counts.get('pending', 0),
+            'rejected': counts.get('rejected', 0)
         }
     
     @app_commands.command(
@@ -4,7 +4,7 @@ Cog pour les commandes de debug (mode développement uniquement)
 import discord
 from discord import app_commands
 from discord.ext import commands
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import sys
 from typing import Optional
 
@@ -187,9 +187,17 @@ class DebugCog(commands.Cog):
             # Service de signalements
             if hasattr(self.bot, 'report_service') and self.bot.report_service:
                 reports_count = len(self.bot.report_service.active_reports)
+                dup_stats = self.bot.report_service.uniqueness_cache.get_stats()
+                vote_stats = self.bot.report_service.get_vote_stats()
                 embed.add_field(
                     name="📋 ReportService",
-                    value=f"✅ Actif\n{reports_count} signalements actifs",
+                    value=(
+                        f"✅ Actif\n{reports_count} signalements actifs\n"
+                        f"Doublons: {dup_stats['hits'] + dup_stats['negative_hits'] + dup_stats['bloom_skips']} hits / "
+                        f"{dup_stats['misses']} miss / {dup_stats['evictions']} évictions\n"
+                        f"Votes: {vote_stats['votes_recorded']} / {vote_stats['vote_edits']} éditions / "
+                        f"{vote_stats['auto_rejected']} auto-rejets"
+                    ),
                     inline=True
                 )
             else:
@@ -199,6 +207,41 @@ class DebugCog(commands.Cog):
                     inline=True
                 )
             
+            # Statistiques journalières (tous serveurs, 7 derniers jours)
+            if getattr(self.bot, 'stats_rollup', None):
+                totals = self.bot.stats_rollup.get_period(None, 7)['totals']
+                rollup_stats = self.bot.stats_rollup.get_stats()
+                embed.add_field(
+                    name="📈 StatsRollup",
+                    value=(
+                        f"✅ Actif\n7j: {totals['reports_created']} signalements / {totals['reports_validated']} validés / "
+                        f"{totals['checks']} vérifications\n"
+                        f"En attente: {rollup_stats['pending_local']} local / "
+                        + ("Supabase désactivé" if rollup_stats['remote_disabled'] else f"{rollup_stats['pending_remote']} Supabase")
+                    ),
+                    inline=True
+                )
+            else:
+                embed.add_field(
+                    name="📈 StatsRollup",
+                    value="❌ Non disponible",
+                    inline=True
+                )
+            
+            # Planificateur des tâches de fond (métriques par tâche)
+            if getattr(self.bot, 'scheduler', None):
+                jobs = self.bot.scheduler.get_stats()
+                lines = [
+                    f"{'🔄' if job['running'] else ('⚠️' if job['last_error'] else '✅')} {name}: "
+                    f"{job['runs']} exéc. / {job['avg_runtime_ms']:.0f} ms moy. / {job['failures']} échec(s)"
+                    for name, job in jobs.items()
+                ]
+                embed.add_field(
+                    name="⏰ Scheduler",
+                    value="\n".join(lines) or "Aucune tâche",
+                    inline=False
+                )
+            
             # Rate Limiter
             if hasattr(self.bot, 'rate_limiter') and self.bot.rate_limiter:
                 stats = self.bot.rate_limiter.get_stats()
@@ -244,13 +287,23 @@ class DebugCog(commands.Cog):
                     inline=True
                 )
             
+            # Résolution des utilisateurs (cache avant fetch_user)
+            from utils.user_resolver import user_resolver
+            resolver_stats = user_resolver.get_stats()
+            local_hits = resolver_stats['member_hits'] + resolver_stats['client_hits'] + resolver_stats['cache_hits']
+            embed.add_field(
+                name="👤 UserResolver",
+                value=f"✅ Actif\n{local_hits} hits / {resolver_stats['misses']} fetch_user\nCache: {resolver_stats['size']}/{resolver_stats['max_size']}",
+                inline=True
+            )
+            
             # Guild Service
             try:
                 from services.guild_service import guild_service
                 stats = guild_service.get_stats()
                 embed.add_field(
                     name="🏠 GuildService",
-                    value=f"✅ Actif\n{stats['configured_guilds']} serveurs configurés",
+                    value=f"✅ Actif\n{stats['configured_guilds']} serveurs configurés\nCache: {stats['cache_hits']} hits / {stats['cache_misses']} miss",
                     inline=True
                 )
             except Exception as e:
@@ -269,6 +322,89 @@ class DebugCog(commands.Cog):
                 ephemeral=True
             )
     
+    @app_commands.command(
+        name="debug-reconcile-stats",
+        description="[DEBUG] Comparer les statistiques avec le forum d'alertes"
+    )
+    async def debug_reconcile_stats_command(self, interaction: discord.Interaction, period: Optional[int] = 7):
+        """Recompter les signalements depuis le forum et comparer avec /stats"""
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            alerts_forum = discord.utils.get(
+                interaction.guild.channels,
+                name=bot_settings.alerts_channel_name
+            )
+            if not alerts_forum:
+                await interaction.followup.send("❌ Forum d'alertes non trouvé", ephemeral=True)
+                return
+            
+            forum_stats = await self._scan_forum_stats(alerts_forum, period or 7)
+            
+            admin_cog = self.bot.get_cog('AdminCog')
+            counters = admin_cog._calculate_stats(interaction.guild_id, period or 7) if admin_cog else {}
+            
+            embed = discord.Embed(
+                title="🔧 Debug - Réconciliation des statistiques",
+                description=f"Forum d'alertes vs compteurs, {period or 7} derniers jours",
+                color=discord.Color.blue(),
+                timestamp=datetime.utcnow()
+            )
+            for key, label in (('total', "📈 Signalements"), ('validated', "✅ Validés")):
+                forum_value = forum_stats[key]
+                counter_value = counters.get(key, 0)
+                marker = "✅" if forum_value == counter_value else "⚠️"
+                embed.add_field(
+                    name=label,
+                    value=f"{marker} Forum: {forum_value}\nCompteurs: {counter_value}",
+                    inline=True
+                )
+            
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            
+        except Exception as e:
+            logger.error(f"Erreur dans /debug-reconcile-stats: {e}")
+            await interaction.followup.send(
+                f"❌ Erreur: {str(e)}",
+                ephemeral=True
+            )
+    
+    async def _scan_forum_stats(self, alerts_forum, period_days: int) -> dict:
+        """
+        Compter les signalements en parcourant les threads du forum
+        
+        Un appel à l'API Discord par thread: réservé à la réconciliation ponctuelle.
+        """
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=period_days)
+        
+        total_reports = 0
+        validated_reports = 0
+        
+        async def _is_validated(thread) -> bool:
+            async for message in thread.history(limit=20):
+                if "validé" in message.content.lower() or "✅" in message.content:
+                    return True
+            return False
+        
+        try:
+            # Threads archivés puis threads actifs
+            archived = [thread async for thread in alerts_forum.archived_threads(limit=100)]
+            for thread in archived + list(alerts_forum.threads):
+                if thread.created_at and thread.created_at >= cutoff_date:
+                    total_reports += 1
+                    if await _is_validated(thread):
+                        validated_reports += 1
+            
+        except Exception as e:
+            logger.error(f"Erreur lors du parcours du forum: {e}")
+        
+        return {
+            'total': total_reports,
+            'validated': validated_reports,
+            'pending': total_reports - validated_reports
+        }
+    
     @app_commands.command(
         name="debug-config",
         description="[DEBUG] Configuration du serveur actuel"
@@ -42,11 +42,8 @@ class DMHandlerCog(commands.Cog):
         if not hasattr(self.bot, 'report_service'):
             return
         
-        # Chercher les signalements de cet utilisateur
-        user_reports = []
-        for report in self.bot.report_service.active_reports.values():
-            if report.reporter_id == message.author.id:
-                user_reports.append(report)
+        # Chercher les signalements de cet utilisateur (du plus récent au plus ancien)
+        user_reports = self.bot.report_service.get_reporter_reports(message.author.id)
         
         if not user_reports:
             return
@@ -67,7 +64,7 @@ class DMHandlerCog(commands.Cog):
                 )
             else:
                 # Prendre le plus récent
-                target_report = max(user_reports, key=lambda r: r.created_at)
+                target_report = user_reports[0]
         
         # Transférer le message vers le thread
         await self._forward_to_thread(message, target_report)
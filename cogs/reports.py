@@ -9,7 +9,7 @@ from typing import Optional
 from config.logging_config import get_logger
 from config.bot_config import REPORT_CATEGORIES
 from locales.translation_manager import translator
-from ui.views.report_views import CategorySelectView
+from ui.views.report_views import CategorySelectView, category_translation_keys, category_fallbacks
 from ui.modals.report_modals import AgisReportModal
 
 logger = get_logger('reports')
@@ -40,24 +40,30 @@ class ReportsCog(commands.Cog):
                 translator=translator
             )
             
+            # Traduire tous les textes de l'embed en une seule résolution de langue
+            texts = translator.t_many(
+                ["agis_command_title", "agis_command_description", "agis_categories_field"]
+                + category_translation_keys(),
+                interaction.guild_id,
+                fallbacks=category_fallbacks()
+            )
+            
             # Créer l'embed de présentation
             embed = discord.Embed(
-                title=translator.t("agis_command_title", interaction.guild_id),
-                description=translator.t("agis_command_description", interaction.guild_id),
+                title=texts["agis_command_title"],
+                description=texts["agis_command_description"],
                 color=discord.Color.blue()
             )
             
             # Ajouter les catégories à l'embed (traduites)
             categories_text = ""
-            for category_id, category_data in REPORT_CATEGORIES.items():
-                label_key = f"category_{category_id}"
-                desc_key = f"category_{category_id}_description"
-                label = translator.t(label_key, interaction.guild_id, fallback=category_data['label'])
-                description = translator.t(desc_key, interaction.guild_id, fallback=category_data['description'])
+            for category_id in REPORT_CATEGORIES:
+                label = texts[f"category_{category_id}"]
+                description = texts[f"category_{category_id}_description"]
                 categories_text += f"{label}\n{description}\n\n"
             
             embed.add_field(
-                name=translator.t("agis_categories_field", interaction.guild_id),
+                name=texts["agis_categories_field"],
                 value=categories_text[:1024],  # Limite Discord
                 inline=False
             )
@@ -79,18 +85,24 @@ class ReportsCog(commands.Cog):
     async def categories_command(self, interaction: discord.Interaction):
         """Afficher toutes les catégories de signalement"""
         try:
+            texts = translator.t_many(
+                ["categories_command_title", "categories_command_description",
+                 "categories_command_footer", "severity_label"]
+                + category_translation_keys(),
+                interaction.guild_id,
+                fallbacks=category_fallbacks()
+            )
+            
             embed = discord.Embed(
-                title=translator.t("categories_command_title", interaction.guild_id),
-                description=translator.t("categories_command_description", interaction.guild_id),
+                title=texts["categories_command_title"],
+                description=texts["categories_command_description"],
                 color=discord.Color.blue()
             )
             
+            severity_label = texts["severity_label"]
             for category_id, category_data in REPORT_CATEGORIES.items():
-                label_key = f"category_{category_id}"
-                desc_key = f"category_{category_id}_description"
-                label = translator.t(label_key, interaction.guild_id, fallback=category_data['label'])
-                description = translator.t(desc_key, interaction.guild_id, fallback=category_data['description'])
-                severity_label = translator.t("severity_label", interaction.guild_id)
+                label = texts[f"category_{category_id}"]
+                description = texts[f"category_{category_id}_description"]
                 
                 embed.add_field(
                     name=label,
@@ -98,7 +110,7 @@ class ReportsCog(commands.Cog):
                     inline=True
                 )
             
-            embed.set_footer(text=translator.t("categories_command_footer", interaction.guild_id))
+            embed.set_footer(text=texts["categories_command_footer"])
             
             await interaction.response.send_message(embed=embed, ephemeral=True)
             
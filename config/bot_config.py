@@ -22,6 +22,7 @@ class BotSettings:
     # Limites
     quorum_percentage: int = 80
     max_reports_per_hour: int = 3
+    max_reports_global_per_hour: int = 0  # 0 = pas de limite globale
     max_evidence_length: int = 1900
     
     # Features
@@ -32,6 +33,53 @@ class BotSettings:
     # Sécurité anti-abus
     reporter_salt_secret: str = ""
     
+    # Supabase (pool d'exécution non bloquant)
+    supabase_max_concurrency: int = 8
+    supabase_timeout: float = 10.0
+    
+    # Persistance locale (SQLite partagé par les services du bot)
+    local_db_path: str = "data/aegis.db"
+    report_store_backend: str = "sqlite"  # sqlite, supabase, none
+    
+    # Cache de détection des doublons
+    duplicate_cache_size: int = 10000
+    duplicate_cache_ttl: float = 86400.0
+    duplicate_negative_ttl: float = 300.0
+    duplicate_bloom_enabled: bool = False
+    
+    # Rate limiter: memory (par processus) ou sqlite (partagé, persistant)
+    rate_limit_backend: str = "memory"
+    
+    # Journal d'activité Supabase (envoi par lots)
+    activity_batch_size: int = 100
+    activity_flush_interval: float = 2.0
+    activity_queue_max: int = 5000
+    activity_spill_path: str = "data/activity_spill.jsonl"
+    activity_spill_max_mb: int = 50
+    server_stats_flush_interval: float = 10.0
+    
+    # Statistiques journalières matérialisées (/stats, /debug-services)
+    rollup_flush_interval: float = 30.0
+    rollup_retention_days: int = 400
+    
+    # Purge du forum d'alertes (/purge)
+    purge_concurrency: int = 4
+    
+    # Cache des utilisateurs récupérés via l'API (fetch_user)
+    user_cache_size: int = 5000
+    user_cache_ttl: float = 3600.0
+    
+    # Votes des validateurs: délai de regroupement des mises à jour du message (secondes)
+    vote_edit_delay: float = 2.0
+    
+    # Journal d'audit: politique fsync (always, interval, never), délai d'écriture, fichiers ouverts
+    audit_fsync_policy: str = "interval"
+    audit_flush_interval: float = 1.0
+    audit_max_open_files: int = 32
+    
+    # Durée de validité d'un flag (signalement validé) pour le niveau de risque
+    flag_expiry_days: int = 90
+    
     def __post_init__(self):
         """Charger les valeurs depuis les variables d'environnement"""
         self.token = os.getenv('DISCORD_TOKEN', '')
@@ -39,6 +87,32 @@ class BotSettings:
         self.test_mode_enabled = os.getenv('TEST_MODE_ENABLED', 'false').lower() == 'true'
         self.debug_enabled = os.getenv('DEBUG_ENABLED', 'false').lower() == 'true'
         self.reporter_salt_secret = os.getenv('REPORTER_SALT_SECRET', '')
+        self.supabase_max_concurrency = int(os.getenv('SUPABASE_MAX_CONCURRENCY', self.supabase_max_concurrency))
+        self.supabase_timeout = float(os.getenv('SUPABASE_TIMEOUT', self.supabase_timeout))
+        self.local_db_path = os.getenv('AEGIS_DB_PATH', self.local_db_path)
+        self.report_store_backend = os.getenv('REPORT_STORE_BACKEND', self.report_store_backend).lower()
+        self.duplicate_cache_size = int(os.getenv('DUPLICATE_CACHE_SIZE', self.duplicate_cache_size))
+        self.duplicate_cache_ttl = float(os.getenv('DUPLICATE_CACHE_TTL', self.duplicate_cache_ttl))
+        self.duplicate_negative_ttl = float(os.getenv('DUPLICATE_NEGATIVE_TTL', self.duplicate_negative_ttl))
+        self.duplicate_bloom_enabled = os.getenv('DUPLICATE_BLOOM_ENABLED', 'false').lower() == 'true'
+        self.rate_limit_backend = os.getenv('RATE_LIMIT_BACKEND', self.rate_limit_backend).lower()
+        self.activity_batch_size = int(os.getenv('ACTIVITY_BATCH_SIZE', self.activity_batch_size))
+        self.activity_flush_interval = float(os.getenv('ACTIVITY_FLUSH_INTERVAL', self.activity_flush_interval))
+        self.activity_queue_max = int(os.getenv('ACTIVITY_QUEUE_MAX', self.activity_queue_max))
+        self.activity_spill_path = os.getenv('ACTIVITY_SPILL_PATH', self.activity_spill_path)
+        self.activity_spill_max_mb = int(os.getenv('ACTIVITY_SPILL_MAX_MB', self.activity_spill_max_mb))
+        self.server_stats_flush_interval = float(os.getenv('SERVER_STATS_FLUSH_INTERVAL', self.server_stats_flush_interval))
+        self.flag_expiry_days = int(os.getenv('FLAG_EXPIRY_DAYS', self.flag_expiry_days))
+        self.rollup_flush_interval = float(os.getenv('ROLLUP_FLUSH_INTERVAL', self.rollup_flush_interval))
+        self.rollup_retention_days = int(os.getenv('ROLLUP_RETENTION_DAYS', self.rollup_retention_days))
+        self.purge_concurrency = int(os.getenv('PURGE_CONCURRENCY', self.purge_concurrency))
+        self.user_cache_size = int(os.getenv('USER_CACHE_SIZE', self.user_cache_size))
+        self.user_cache_ttl = float(os.getenv('USER_CACHE_TTL', self.user_cache_ttl))
+        self.vote_edit_delay = float(os.getenv('VOTE_EDIT_DELAY', self.vote_edit_delay))
+        self.audit_fsync_policy = os.getenv('AUDIT_FSYNC_POLICY', self.audit_fsync_policy)
+        self.audit_flush_interval = float(os.getenv('AUDIT_FLUSH_INTERVAL', self.audit_flush_interval))
+        self.audit_max_open_files = int(os.getenv('AUDIT_MAX_OPEN_FILES', self.audit_max_open_files))
+        self.max_reports_global_per_hour = int(os.getenv('MAX_REPORTS_GLOBAL_PER_HOUR', self.max_reports_global_per_hour))
 
 
 # Configuration des catégories de signalement
@@ -110,6 +184,10 @@ def validate_config() -> bool:
         print("❌ QUORUM_PERCENTAGE must be between 1 and 100")
         return False
     
+    if bot_settings.audit_fsync_policy not in ("always", "interval", "never"):
+        print("❌ AUDIT_FSYNC_POLICY must be always, interval or never")
+        return False
+    
     if not bot_settings.reporter_salt_secret:
         print("❌ REPORTER_SALT_SECRET missing - required for reporter anonymity")
         print("   Generate with: python -c \"import secrets; print(secrets.token_hex(32))\"")
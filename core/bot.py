@@ -1,6 +1,7 @@
 """
 Classe principale du bot Aegis (version refactorisée)
 """
+import asyncio
 import discord
 from discord.ext import commands
 from typing import Optional, Dict, Any
@@ -8,12 +9,24 @@ from typing import Optional, Dict, Any
 from config.bot_config import bot_settings
 from config.logging_config import get_logger
 from services.report_service import ReportService
+from services.purge_service import ThreadPurgeEngine
+from services.scheduler import JobScheduler
+from database.report_store import create_report_store
+from database.stats_rollup import StatsRollup
 from utils.security import SecurityValidator
-from utils.rate_limiter import RateLimiter
+from utils.rate_limiter import RateLimiter, create_rate_limit_backend
+from utils.member_index import member_index
+from utils.audit_logger import audit_logger
+from ui.views.validation_views import ReportActionButton, LegacyReportActionButton, close_expired_report
 from locales.translation_manager import translator
 
 logger = get_logger('bot')
 
+# Intervalles des tâches planifiées (secondes)
+VOTE_EXPIRY_INTERVAL = 60
+REPORT_CLEANUP_INTERVAL = 24 * 3600
+SUMMARY_INTERVAL = 3600
+
 
 class AegisBot(commands.Bot):
     """Bot Aegis principal - Version refactorisée"""
@@ -36,6 +49,9 @@ class AegisBot(commands.Bot):
         self.report_service: Optional[ReportService] = None
         self.security_validator: Optional[SecurityValidator] = None
         self.rate_limiter: Optional[RateLimiter] = None
+        self.stats_rollup: Optional[StatsRollup] = None
+        self.purge_engine: Optional[ThreadPurgeEngine] = None
+        self.scheduler: Optional[JobScheduler] = None
         
         # État du bot
         self.is_ready = False
@@ -46,10 +62,16 @@ class AegisBot(commands.Bot):
         try:
             
             # Initialiser les services
+            from services.guild_service import guild_service
+            
             self.security_validator = SecurityValidator()
             self.rate_limiter = RateLimiter(
                 max_actions=bot_settings.max_reports_per_hour,
-                time_window=3600  # 1 heure
+                time_window=3600,  # 1 heure
+                backend=create_rate_limit_backend(),
+                global_max_actions=bot_settings.max_reports_global_per_hour or None,
+                # Limites par utilisateur et par serveur lues dans la config (en cache) du serveur
+                limits_resolver=guild_service.get_rate_limits
             )
             
             # Intégrer Supabase si activé avec nouvelle structure
@@ -66,17 +88,52 @@ class AegisBot(commands.Bot):
                 except Exception as e:
                     logger.error(f"❌ Erreur intégration Supabase: {e}")
             
+            # Stockage persistant des signalements (reprise après redémarrage)
+            report_store = create_report_store(db_client)
+            if report_store and not await report_store.open():
+                report_store = None
+            
+            # Compteurs journaliers matérialisés (/stats, /debug-services), écrits par le planificateur
+            self.stats_rollup = StatsRollup(
+                db_path=bot_settings.local_db_path,
+                push_deltas=db_client.push_daily_stats if db_client else None,
+                flush_interval=None,
+                retention_days=bot_settings.rollup_retention_days
+            )
+            await self.stats_rollup.open()
+            
             # Service de signalements
             self.report_service = ReportService(
                 db_client=db_client,
                 validator=self.security_validator,
-                rate_limiter=self.rate_limiter
+                rate_limiter=self.rate_limiter,
+                store=report_store,
+                rollup=self.stats_rollup,
+                # Quorum et délai d'auto-rejet lus dans la config (en cache) du serveur
+                thresholds_resolver=guild_service.get_validation_thresholds,
+                vote_edit_delay=bot_settings.vote_edit_delay
+            )
+            await self.report_service.warm_start()
+            await self.report_service.seed_duplicate_filter()
+            
+            # Purges du forum (reprise des purges interrompues)
+            self.purge_engine = ThreadPurgeEngine(
+                bot_settings.local_db_path,
+                report_service=self.report_service,
+                concurrency=bot_settings.purge_concurrency
             )
+            await self.purge_engine.open()
             
             # Service de configuration des guildes
-            from services.guild_service import guild_service
             self.guild_service = guild_service
             
+            # Boutons de validation persistants (un seul gestionnaire, signalement résolu au clic)
+            self.add_dynamic_items(ReportActionButton, LegacyReportActionButton)
+            
+            # Tâches de fond (démarrées dans on_ready, une fois connecté)
+            self.scheduler = JobScheduler(bot_settings.local_db_path)
+            self._register_jobs()
+            
             
             # Charger les cogs (extensions)
             await self._load_cogs()
@@ -113,6 +170,10 @@ class AegisBot(commands.Bot):
         self.startup_time = datetime.utcnow()
         self.is_ready = True
         
+        # Tâches de fond (sans effet si déjà démarré: on_ready est rappelé à chaque reconnexion)
+        if self.scheduler:
+            await self.scheduler.start()
+        
         
         # Synchroniser les commandes slash
         try:
@@ -145,6 +206,47 @@ class AegisBot(commands.Bot):
                 else:
                     print(f"✅ Permissions OK sur {guild.name}")
     
+    def _register_jobs(self):
+        """Déclarer les tâches périodiques (hors du chemin des requêtes)"""
+        self.scheduler.add_job("vote_expiry", VOTE_EXPIRY_INTERVAL, self._expire_votes, first_delay=0)
+        self.scheduler.add_job("report_cleanup", REPORT_CLEANUP_INTERVAL, self.report_service.cleanup_old_reports)
+        self.scheduler.add_job("stats_rollup_flush", bot_settings.rollup_flush_interval, self._flush_rollup)
+        self.scheduler.add_job("services_summary", SUMMARY_INTERVAL, self._log_summary)
+        
+        # Le nettoyage du rate limiter ne se fait plus pendant check_rate_limit
+        self.rate_limiter.scheduled_cleanup = True
+        self.scheduler.add_job("rate_limiter_cleanup", self.rate_limiter.cleanup_interval, self._cleanup_rate_limiter)
+    
+    async def _expire_votes(self):
+        """Rejeter les signalements restés sans consensus et mettre à jour leur post"""
+        for report in await self.report_service.expire_pending_votes():
+            await close_expired_report(self, report)
+    
+    async def _flush_rollup(self):
+        await self.stats_rollup.flush()
+        self.stats_rollup.prune()
+    
+    async def _cleanup_rate_limiter(self):
+        if not self.rate_limiter.backend.blocking:
+            # Backend mémoire (non thread-safe): nettoyage rapide sur la boucle
+            self.rate_limiter.cleanup()
+        else:
+            # Backend SQLite: requête bloquante, exécutée hors de la boucle d'événements
+            await asyncio.to_thread(self.rate_limiter.cleanup)
+    
+    async def _log_summary(self):
+        """Résumé périodique de l'activité des services"""
+        votes = self.report_service.get_vote_stats()
+        today = self.stats_rollup.get_period(days=1)['totals']
+        jobs = self.scheduler.get_stats()
+        failures = sum(job['failures'] for job in jobs.values())
+        logger.info(
+            f"📊 Résumé: {len(self.report_service.active_reports)} signalements actifs, "
+            f"{today['reports_created']} créés / {today['checks']} vérifications aujourd'hui, "
+            f"{votes['votes_recorded']} votes, {votes['auto_rejected']} auto-rejets, "
+            f"{failures} échec(s) de tâches planifiées"
+        )
+    
     async def on_guild_join(self, guild: discord.Guild):
         """Événement: Bot rejoint un serveur"""
         logger.info(f"➕ Nouveau serveur rejoint: {guild.name} (ID: {guild.id})")
@@ -156,6 +258,23 @@ class AegisBot(commands.Bot):
     async def on_guild_remove(self, guild: discord.Guild):
         """Événement: Bot quitte un serveur"""
         logger.info(f"➖ Serveur quitté: {guild.name} (ID: {guild.id})")
+        member_index.drop_guild(guild.id)
+    
+    async def on_member_join(self, member: discord.Member):
+        """Événement: Nouveau membre (index des noms)"""
+        member_index.on_member_join(member)
+    
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        """Événement: Pseudo modifié (index des noms)"""
+        member_index.on_member_update(before, after)
+    
+    async def on_member_remove(self, member: discord.Member):
+        """Événement: Membre parti (index des noms)"""
+        member_index.on_member_remove(member)
+    
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        """Événement: Nom d'utilisateur modifié (index des noms)"""
+        member_index.on_user_update(before, after)
     
     async def on_app_command_error(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
         """Gestionnaire d'erreurs pour les commandes slash"""
@@ -183,9 +302,30 @@ class AegisBot(commands.Bot):
         """Fermeture propre du bot"""
         logger.info("🔌 Fermeture du bot...")
         
+        # Arrêter les tâches de fond avant de fermer les services qu'elles utilisent
+        if self.scheduler:
+            await self.scheduler.close()
+        
         # Nettoyer les ressources si nécessaire
         if self.report_service:
-            await self.report_service.cleanup_old_reports()
+            await self.report_service.close()
+            
+            # Écrit les compteurs journaliers (local + Supabase) avant de fermer le client
+            if self.stats_rollup:
+                await self.stats_rollup.close()
+            
+            # Envoie aussi les activités Supabase encore en file avant de libérer le pool
+            if self.report_service.db and hasattr(self.report_service.db, 'close'):
+                await self.report_service.db.close()
+        
+        if self.rate_limiter:
+            self.rate_limiter.close()
+        
+        if self.purge_engine:
+            await self.purge_engine.close()
+        
+        # Écrit les entrées d'audit encore en mémoire
+        await audit_logger.close()
         
         await super().close()
         logger.info("✅ Bot fermé proprement")
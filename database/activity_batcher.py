@@ -0,0 +1,281 @@
+"""
+Journalisation par lots de la table activity
+
+Les événements (check, report, validation...) sont mis en file et insérés en
+une seule requête par lot, hors du chemin des commandes Discord. Si la base est
+indisponible, les lignes sont conservées dans un fichier local (taille bornée)
+puis rejouées par lots; la position du rejeu est enregistrée après chaque lot,
+un arrêt pendant le rejeu ne perd aucune ligne.
+"""
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config.logging_config import get_logger
+
+logger = get_logger('activity')
+
+
+class ActivityBatcher:
+    """File d'attente des événements d'activité avec insertion groupée"""
+    
+    def __init__(self,
+                 insert_batch: Callable[[List[Dict[str, Any]]], Awaitable[Any]],
+                 batch_size: int = 100,
+                 flush_interval: float = 2.0,
+                 max_queue: int = 5000,
+                 spill_path: Optional[str] = "data/activity_spill.jsonl",
+                 backpressure_timeout: float = 0.5,
+                 max_spill_bytes: int = 50 * 1024 * 1024):
+        """
+        Args:
+            insert_batch: Coroutine d'insertion d'une liste de lignes (lève une exception en cas d'échec)
+            batch_size: Taille déclenchant un envoi immédiat
+            flush_interval: Délai maximum avant l'envoi d'un lot incomplet (secondes)
+            max_queue: Taille maximum de la file en mémoire
+            spill_path: Fichier local de secours (None = lignes perdues si la base est indisponible)
+            backpressure_timeout: Attente maximum quand la file est pleine avant débordement sur disque
+            max_spill_bytes: Taille maximum du fichier de secours (au-delà, les lignes sont perdues et comptées)
+        """
+        self.insert_batch = insert_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.spill_path = Path(spill_path) if spill_path else None
+        # Fichier en cours de rejeu et position (octets) du prochain lot à réinsérer
+        self.replay_path = self.spill_path.with_suffix('.replay') if self.spill_path else None
+        self.offset_path = Path(f"{self.replay_path}.offset") if self.replay_path else None
+        self.backpressure_timeout = backpressure_timeout
+        self.max_spill_bytes = max_spill_bytes
+        
+        self._queue: List[Dict[str, Any]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        
+        # Métriques
+        self.enqueued = 0
+        self.flushed = 0
+        self.batches = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.dropped = 0
+    
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._space = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+    
+    async def log(self, row: Dict[str, Any]):
+        """
+        Ajouter un événement à la file
+        
+        Quand la file est pleine, attend brièvement un envoi (backpressure) puis
+        déborde sur le fichier local plutôt que de bloquer la commande.
+        """
+        if self._closed:
+            await self._spill([row])
+            return
+        
+        self._ensure_started()
+        
+        if len(self._queue) >= self.max_queue:
+            self._space.clear()
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._space.wait(), self.backpressure_timeout)
+            except asyncio.TimeoutError:
+                pass
+            if len(self._queue) >= self.max_queue:
+                await self._spill([row])
+                return
+        
+        self._queue.append(row)
+        self.enqueued += 1
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+    
+    async def _run(self):
+        """Boucle d'envoi: par taille de lot ou au bout de flush_interval"""
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+    
+    async def flush(self) -> int:
+        """
+        Envoyer tout le contenu de la file
+        
+        Returns:
+            Nombre de lignes insérées
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        
+        inserted = 0
+        async with self._flush_lock:
+            while self._queue:
+                batch = self._queue[:self.batch_size]
+                del self._queue[:self.batch_size]
+                if self._space is not None:
+                    self._space.set()
+                try:
+                    await self.insert_batch(batch)
+                except Exception as e:
+                    logger.warning(f"⚠️ Envoi de {len(batch)} activité(s) impossible, sauvegarde locale: {e}")
+                    pending = batch + self._queue
+                    self._queue.clear()
+                    await self._spill(pending)
+                    return inserted
+                inserted += len(batch)
+                self.flushed += len(batch)
+                self.batches += 1
+            
+            # La base répond: rejouer les lignes sauvegardées localement
+            if inserted:
+                await self._replay_spill()
+        return inserted
+    
+    async def _spill(self, rows: List[Dict[str, Any]]):
+        """Sauvegarder des lignes dans le fichier local de secours"""
+        if not rows:
+            return
+        if self.spill_path is None:
+            self.dropped += len(rows)
+            return
+        
+        def _write() -> int:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            size = self.spill_path.stat().st_size if self.spill_path.exists() else 0
+            lines = []
+            for row in rows:
+                line = (json.dumps(row, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+                if size + len(line) > self.max_spill_bytes:
+                    break
+                size += len(line)
+                lines.append(line)
+            if lines:
+                with open(self.spill_path, 'ab') as f:
+                    f.write(b"".join(lines))
+            return len(lines)
+        
+        try:
+            written = await asyncio.to_thread(_write)
+        except Exception as e:
+            self.dropped += len(rows)
+            logger.error(f"❌ Sauvegarde locale des activités impossible ({len(rows)} perdues): {e}")
+            return
+        
+        self.spilled += written
+        if written < len(rows):
+            self.dropped += len(rows) - written
+            logger.error(
+                f"❌ Fichier d'activités en attente plein ({self.max_spill_bytes} octets), "
+                f"{len(rows) - written} activité(s) perdue(s)"
+            )
+    
+    def _take_spill_sync(self) -> bool:
+        """
+        Préparer le fichier à rejouer
+        
+        Un fichier de rejeu laissé par un arrêt précédent est repris tel quel;
+        sinon le fichier de secours devient le fichier de rejeu.
+        
+        Returns:
+            True s'il y a un fichier à rejouer
+        """
+        if self.replay_path.exists():
+            return True
+        if not self.spill_path.exists():
+            return False
+        os.replace(self.spill_path, self.replay_path)
+        self.offset_path.unlink(missing_ok=True)
+        return True
+    
+    def _read_chunk_sync(self) -> Tuple[List[Dict[str, Any]], int]:
+        """Lire le prochain lot du fichier de rejeu à partir de la position enregistrée"""
+        offset = int(self.offset_path.read_text()) if self.offset_path.exists() else 0
+        rows = []
+        with open(self.replay_path, 'rb') as f:
+            f.seek(offset)
+            while len(rows) < self.batch_size:
+                line = f.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if line:
+                    try:
+                        rows.append(json.loads(line))
+                    except ValueError:
+                        pass
+            return rows, f.tell()
+    
+    def _commit_chunk_sync(self, offset: int, done: bool):
+        """Enregistrer la position du rejeu (ou supprimer le fichier une fois rejoué)"""
+        if done:
+            self.replay_path.unlink(missing_ok=True)
+            self.offset_path.unlink(missing_ok=True)
+        else:
+            self.offset_path.write_text(str(offset))
+    
+    async def _replay_spill(self):
+        """Réinsérer les lignes du fichier de secours, lot par lot"""
+        if self.spill_path is None:
+            return
+        
+        replayed = 0
+        try:
+            # Reprendre un rejeu interrompu avant de prendre le fichier de secours
+            while await asyncio.to_thread(self._take_spill_sync):
+                while True:
+                    rows, offset = await asyncio.to_thread(self._read_chunk_sync)
+                    done = len(rows) < self.batch_size
+                    if rows:
+                        try:
+                            await self.insert_batch(rows)
+                        except Exception as e:
+                            # Le fichier et sa position sont conservés pour le prochain rejeu
+                            logger.warning(f"⚠️ Rejeu des activités interrompu: {e}")
+                            return
+                        self.replayed += len(rows)
+                        replayed += len(rows)
+                    await asyncio.to_thread(self._commit_chunk_sync, offset, done)
+                    if done:
+                        break
+        except Exception as e:
+            logger.error(f"❌ Lecture du fichier d'activités en attente impossible: {e}")
+        finally:
+            if replayed:
+                logger.info(f"♻️ {replayed} activité(s) en attente réinsérée(s)")
+    
+    async def close(self):
+        """Arrêter la boucle et envoyer les événements restants (fin du bot)"""
+        self._closed = True
+        if self._task is not None and not self._task.done():
+            self._wakeup.set()
+            try:
+                await self._task
+            except Exception:
+                pass
+        await self.flush()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Statistiques de la file d'activité"""
+        return {
+            'queued': len(self._queue),
+            'enqueued': self.enqueued,
+            'flushed': self.flushed,
+            'batches': self.batches,
+            'spilled': self.spilled,
+            'replayed': self.replayed,
+            'dropped': self.dropped
+        }
@@ -0,0 +1,224 @@
+"""
+Stockage persistant des signalements actifs
+
+Permet à ReportService de retrouver ses signalements après un redémarrage
+(validation depuis le forum, transfert des MP) sans interroger Discord.
+"""
+import asyncio
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from config.logging_config import get_logger
+from config.bot_config import bot_settings
+from database.models.report import Report
+
+logger = get_logger('report_store')
+
+
+class ReportStore:
+    """Interface commune des backends de stockage des signalements"""
+
+    name = "none"
+
+    async def open(self) -> bool:
+        """Initialiser le backend (création des tables, connexion...)"""
+        return True
+
+    async def save_report(self, report: Report):
+        """Insérer ou mettre à jour un signalement"""
+        raise NotImplementedError
+
+    async def delete_reports(self, report_ids: List[str]):
+        """Supprimer des signalements"""
+        raise NotImplementedError
+
+    async def load_reports(self) -> List[Report]:
+        """Charger tous les signalements conservés (démarrage à chaud)"""
+        raise NotImplementedError
+
+    async def close(self):
+        """Libérer les ressources du backend"""
+        pass
+
+
+class SQLiteReportStore(ReportStore):
+    """
+    Backend local SQLite (mode WAL)
+
+    C'est le seul backend qui conserve reporter_id: le fichier reste local
+    au bot, ce qui permet le transfert des MP après un redémarrage.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self._connection: Optional[sqlite3.Connection] = None
+        # Un seul thread: sqlite3 n'accepte qu'un écrivain à la fois
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report_store")
+
+    async def _run(self, func, *args):
+        """Exécuter une opération SQLite hors de la boucle d'événements"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS reports (
+                    id TEXT PRIMARY KEY,
+                    guild_id INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at TEXT,
+                    data TEXT NOT NULL
+                )
+                """
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_reports_status ON reports(status)")
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _save_sync(self, report: Report):
+        connection = self._connect()
+        connection.execute(
+            "INSERT OR REPLACE INTO reports (id, guild_id, status, created_at, data) VALUES (?, ?, ?, ?, ?)",
+            (
+                report.id,
+                report.guild_id,
+                report.status,
+                report.created_at.isoformat() if report.created_at else None,
+                json.dumps(report.to_dict(include_reporter_id=True), ensure_ascii=False)
+            )
+        )
+        connection.commit()
+
+    def _delete_sync(self, report_ids: List[str]):
+        connection = self._connect()
+        connection.executemany("DELETE FROM reports WHERE id = ?", [(report_id,) for report_id in report_ids])
+        connection.commit()
+
+    def _load_sync(self) -> List[Report]:
+        connection = self._connect()
+        reports = []
+        for (data,) in connection.execute("SELECT data FROM reports"):
+            try:
+                reports.append(Report.from_dict(json.loads(data)))
+            except Exception as e:
+                logger.warning(f"Signalement persisté illisible ignoré: {e}")
+        return reports
+
+    async def open(self) -> bool:
+        try:
+            await self._run(self._connect)
+            return True
+        except Exception as e:
+            logger.error(f"❌ Erreur ouverture du stockage SQLite {self.db_path}: {e}")
+            return False
+
+    async def save_report(self, report: Report):
+        await self._run(self._save_sync, report)
+
+    async def delete_reports(self, report_ids: List[str]):
+        if report_ids:
+            await self._run(self._delete_sync, list(report_ids))
+
+    async def load_reports(self) -> List[Report]:
+        return await self._run(self._load_sync)
+
+    async def close(self):
+        def _close():
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+        await self._run(_close)
+        self._executor.shutdown(wait=True)
+
+
+class SupabaseReportStore(ReportStore):
+    """
+    Backend Supabase (table report_states)
+
+    reporter_id n'est jamais envoyé en base: les signalements restaurés depuis
+    ce backend ne permettent plus le transfert des MP vers le forum.
+    """
+
+    name = "supabase"
+
+    def __init__(self, db_client, table: str = "report_states"):
+        self.db = db_client
+        self.table = table
+
+    async def open(self) -> bool:
+        return bool(self.db and self.db.is_connected)
+
+    async def save_report(self, report: Report):
+        data = report.to_dict(include_reporter_id=False)
+        await self.db._execute(self.db.client.table(self.table).upsert({
+            "id": report.id,
+            "guild_id": report.guild_id,
+            "status": report.status,
+            "created_at": data["created_at"],
+            "payload": data
+        }))
+
+    async def delete_reports(self, report_ids: List[str]):
+        if report_ids:
+            await self.db._execute(self.db.client.table(self.table).delete().in_("id", list(report_ids)))
+
+    async def load_reports(self, page_size: int = 1000) -> List[Report]:
+        """
+        Charger les signalements par pages (PostgREST plafonne chaque réponse)
+
+        Les signalements en attente sont chargés en premier, puis les autres;
+        chaque parcours est trié par id pour que les pages ne se chevauchent pas.
+        """
+        reports = []
+        for pending in (True, False):
+            start = 0
+            while True:
+                query = self.db.client.table(self.table).select("payload")
+                query = query.eq("status", "pending") if pending else query.neq("status", "pending")
+                result = await self.db._execute(query.order("id").range(start, start + page_size - 1))
+                rows = result.data or []
+                for row in rows:
+                    try:
+                        reports.append(Report.from_dict(row["payload"]))
+                    except Exception as e:
+                        logger.warning(f"Signalement Supabase illisible ignoré: {e}")
+                if len(rows) < page_size:
+                    break
+                start += page_size
+        return reports
+
+
+def create_report_store(db_client=None) -> Optional[ReportStore]:
+    """
+    Créer le backend de stockage configuré (REPORT_STORE_BACKEND)
+
+    Args:
+        db_client: Client Supabase connecté (optionnel)
+
+    Returns:
+        Backend de stockage ou None si la persistance est désactivée
+    """
+    backend = bot_settings.report_store_backend
+
+    if backend == "none":
+        return None
+
+    if backend == "supabase":
+        if db_client and getattr(db_client, 'is_connected', False):
+            return SupabaseReportStore(db_client)
+        logger.warning("⚠️ Stockage Supabase demandé mais Supabase non connecté, repli sur SQLite")
+
+    return SQLiteReportStore(bot_settings.local_db_path)
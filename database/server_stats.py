@@ -0,0 +1,149 @@
+"""
+Agrégation des compteurs de la table servers
+
+Les incréments (signalements, vérifications, flags) sont cumulés en mémoire par
+serveur puis envoyés périodiquement en une seule écriture atomique côté base.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config.logging_config import get_logger
+
+logger = get_logger('server_stats')
+
+# Compteurs de la table servers gérés par l'agrégateur
+COUNTERS = ("total_reports", "total_checks", "flags_found")
+
+
+class PartialFlushError(Exception):
+    """Levée par flush_deltas quand seule une partie des serveurs a été écrite"""
+    
+    def __init__(self, failed_rows: List[Dict[str, Any]], error: Exception):
+        super().__init__(f"{len(failed_rows)} serveur(s) non écrit(s): {error}")
+        self.failed_rows = failed_rows
+
+
+class ServerStatsAggregator:
+    """Cumul des incréments de statistiques par serveur avec envoi groupé"""
+    
+    def __init__(self,
+                 flush_deltas: Callable[[List[Dict[str, Any]]], Awaitable[Any]],
+                 flush_interval: float = 10.0):
+        """
+        Args:
+            flush_deltas: Coroutine recevant la liste des incréments par serveur
+                (guild_id, guild_name, total_reports, total_checks, flags_found);
+                lève une exception en cas d'échec (tout est conservé) ou
+                PartialFlushError (seuls les serveurs non écrits sont conservés)
+            flush_interval: Délai entre deux envois (secondes)
+        """
+        self.flush_deltas = flush_deltas
+        self.flush_interval = flush_interval
+        
+        # {guild_id: {"guild_name": ..., "total_reports": n, ...}}
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+        
+        # Métriques
+        self.increments = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+    
+    def increment(self, guild_id: int, guild_name: Optional[str] = None, **deltas: int):
+        """
+        Cumuler des incréments pour un serveur (sans accès à la base)
+        
+        Args:
+            guild_id: ID du serveur
+            guild_name: Nom du serveur (conservé pour la création de la ligne)
+            **deltas: total_reports, total_checks et/ou flags_found
+        """
+        entry = self._pending.get(guild_id)
+        if entry is None:
+            entry = {"guild_name": guild_name, **{counter: 0 for counter in COUNTERS}}
+            self._pending[guild_id] = entry
+        elif guild_name:
+            entry["guild_name"] = guild_name
+        
+        for counter, value in deltas.items():
+            if counter not in COUNTERS:
+                raise ValueError(f"Compteur inconnu: {counter}")
+            entry[counter] += value
+        
+        self.increments += 1
+        if not self._closed and (self._task is None or self._task.done()):
+            self._stop = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+    
+    def pending(self, guild_id: int) -> Dict[str, int]:
+        """Incréments pas encore envoyés pour un serveur"""
+        entry = self._pending.get(guild_id, {})
+        return {counter: entry.get(counter, 0) for counter in COUNTERS}
+    
+    async def _run(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._stop.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+    
+    async def flush(self) -> int:
+        """
+        Envoyer les incréments cumulés
+        
+        Returns:
+            Nombre de serveurs mis à jour
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            
+            batch, self._pending = self._pending, {}
+            rows = [{"guild_id": guild_id, **entry} for guild_id, entry in batch.items()]
+            try:
+                await self.flush_deltas(rows)
+            except Exception as e:
+                # Remettre les incréments en attente pour le prochain envoi
+                self.failed_flushes += 1
+                if isinstance(e, PartialFlushError):
+                    # Les serveurs déjà écrits ne doivent pas être comptés deux fois
+                    failed = {row["guild_id"] for row in e.failed_rows}
+                    batch = {guild_id: entry for guild_id, entry in batch.items() if guild_id in failed}
+                for guild_id, entry in batch.items():
+                    current = self._pending.get(guild_id)
+                    if current is None:
+                        self._pending[guild_id] = entry
+                    else:
+                        for counter in COUNTERS:
+                            current[counter] += entry[counter]
+                        current["guild_name"] = current["guild_name"] or entry["guild_name"]
+                logger.warning(f"⚠️ Envoi des statistiques serveur reporté ({len(batch)} serveur(s)): {e}")
+                return len(rows) - len(batch)
+            
+            self.flushes += 1
+            return len(rows)
+    
+    async def close(self):
+        """Arrêter l'envoi périodique et envoyer les incréments restants"""
+        self._closed = True
+        if self._task is not None and not self._task.done():
+            # Pas d'annulation: un envoi en cours doit se terminer
+            self._stop.set()
+            await self._task
+        await self.flush()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Statistiques de l'agrégateur"""
+        return {
+            'pending_guilds': len(self._pending),
+            'increments': self.increments,
+            'flushes': self.flushes,
+            'failed_flushes': self.failed_flushes
+        }
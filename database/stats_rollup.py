@@ -0,0 +1,316 @@
+"""
+Statistiques journalières matérialisées par serveur
+
+Les compteurs (signalements créés, validés, rejetés, vérifications, flags
+trouvés) sont incrémentés au fil des événements, par serveur, par jour et par
+catégorie. Ils sont conservés en mémoire pour les requêtes, écrits dans le
+fichier SQLite local et envoyés périodiquement à Supabase: /stats et
+/debug-services n'ont plus à recalculer depuis les données brutes.
+"""
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config.logging_config import get_logger
+
+logger = get_logger('stats_rollup')
+
+# Compteurs maintenus par jour
+METRICS = ("reports_created", "reports_validated", "reports_rejected", "checks", "flags_found")
+
+# Statut d'un signalement -> compteur incrémenté
+STATUS_METRICS = {
+    "validated": "reports_validated",
+    "rejected": "reports_rejected"
+}
+
+# Pseudo-serveur cumulant tous les serveurs (statistiques globales)
+GLOBAL_GUILD_ID = 0
+
+# Clé: (guild_id, jour ISO, compteur, catégorie ou "" pour le total)
+RollupKey = Tuple[int, str, str, str]
+
+
+class RemoteStatsDisabled(Exception):
+    """Levée par push_deltas quand l'envoi distant est impossible durablement (fonction SQL absente)"""
+
+
+class StatsRollup:
+    """Compteurs journaliers par serveur et par catégorie"""
+    
+    def __init__(self,
+                 db_path: Optional[str] = "data/aegis.db",
+                 push_deltas: Optional[Callable[[List[Dict[str, Any]]], Awaitable[Any]]] = None,
+                 flush_interval: Optional[float] = 30.0,
+                 retention_days: int = 400):
+        """
+        Args:
+            db_path: Fichier SQLite local (None = compteurs en mémoire uniquement)
+            push_deltas: Coroutine recevant les incréments à envoyer à Supabase
+                (guild_id, day, metric, category, value); lève une exception en cas d'échec
+                (incréments conservés) ou RemoteStatsDisabled (envoi distant désactivé)
+            flush_interval: Délai entre deux écritures des incréments (secondes);
+                None = pas de boucle interne, flush() et prune() appelés par le planificateur
+            retention_days: Nombre de jours conservés en mémoire et en local
+        """
+        self.db_path = Path(db_path) if db_path else None
+        self.push_deltas = push_deltas
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        
+        # {(guild_id, jour): {(compteur, catégorie): valeur}}
+        self._days: Dict[Tuple[int, str], Dict[Tuple[str, str], int]] = {}
+        # Incréments pas encore écrits en local / envoyés à Supabase
+        self._pending_local: Dict[RollupKey, int] = {}
+        self._pending_remote: Dict[RollupKey, int] = {}
+        
+        self._connection: Optional[sqlite3.Connection] = None
+        # Un seul thread: sqlite3 n'accepte qu'un écrivain à la fois
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stats_rollup")
+        self._task: Optional[asyncio.Task] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+        
+        # Métriques
+        self.events = 0
+        self.flushes = 0
+        self.failed_pushes = 0
+        self.remote_disabled = False
+    
+    async def _run_sync(self, func, *args):
+        """Exécuter une opération SQLite hors de la boucle d'événements"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS daily_rollups (
+                    guild_id INTEGER NOT NULL,
+                    day TEXT NOT NULL,
+                    metric TEXT NOT NULL,
+                    category TEXT NOT NULL DEFAULT '',
+                    value INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (guild_id, day, metric, category)
+                )
+                """
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+    
+    def _load_sync(self, since: str) -> List[Tuple[int, str, str, str, int]]:
+        connection = self._connect()
+        connection.execute("DELETE FROM daily_rollups WHERE day < ?", (since,))
+        connection.commit()
+        return connection.execute(
+            "SELECT guild_id, day, metric, category, value FROM daily_rollups WHERE day >= ?", (since,)
+        ).fetchall()
+    
+    def _write_sync(self, rows: List[Tuple[int, str, str, str, int]]):
+        connection = self._connect()
+        connection.executemany(
+            """
+            INSERT INTO daily_rollups (guild_id, day, metric, category, value) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (guild_id, day, metric, category) DO UPDATE SET value = value + excluded.value
+            """,
+            rows
+        )
+        connection.commit()
+    
+    async def open(self) -> int:
+        """
+        Charger les compteurs conservés localement (au démarrage du bot)
+        
+        Returns:
+            Nombre de lignes chargées
+        """
+        if self.db_path is None:
+            return 0
+        
+        since = (datetime.utcnow().date() - timedelta(days=self.retention_days)).isoformat()
+        try:
+            rows = await self._run_sync(self._load_sync, since)
+        except Exception as e:
+            logger.error(f"❌ Erreur chargement des statistiques journalières {self.db_path}: {e}")
+            return 0
+        
+        for guild_id, day, metric, category, value in rows:
+            counters = self._days.setdefault((guild_id, day), {})
+            counters[(metric, category)] = counters.get((metric, category), 0) + value
+        return len(rows)
+    
+    def record(self, guild_id: int, metric: str, category: Optional[str] = None,
+               amount: int = 1, when: Optional[datetime] = None):
+        """
+        Incrémenter un compteur (sans accès disque ni réseau)
+        
+        Args:
+            guild_id: ID du serveur
+            metric: Compteur (voir METRICS)
+            category: Catégorie du signalement (optionnel)
+            amount: Valeur de l'incrément
+            when: Date de l'événement (par défaut maintenant)
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Compteur inconnu: {metric}")
+        
+        day = (when or datetime.utcnow()).date().isoformat()
+        for target in (guild_id, GLOBAL_GUILD_ID):
+            self._add(target, day, metric, "", amount)
+            if category:
+                self._add(target, day, metric, category, amount)
+        
+        self.events += 1
+        if self.flush_interval and not self._closed and (self._task is None or self._task.done()):
+            self._stop = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+    
+    def _add(self, guild_id: int, day: str, metric: str, category: str, amount: int):
+        counters = self._days.setdefault((guild_id, day), {})
+        counters[(metric, category)] = counters.get((metric, category), 0) + amount
+        key = (guild_id, day, metric, category)
+        if self.db_path is not None:
+            self._pending_local[key] = self._pending_local.get(key, 0) + amount
+        # Les totaux globaux sont recalculables côté base: seuls les serveurs sont envoyés
+        if self.push_deltas is not None and not self.remote_disabled and guild_id != GLOBAL_GUILD_ID:
+            self._pending_remote[key] = self._pending_remote.get(key, 0) + amount
+    
+    def get_period(self, guild_id: Optional[int] = None, days: int = 7) -> Dict[str, Any]:
+        """
+        Compteurs cumulés sur les derniers jours
+        
+        Coût proportionnel au nombre de jours de la fenêtre, pas au volume d'activité.
+        
+        Args:
+            guild_id: ID du serveur (None = tous les serveurs)
+            days: Taille de la fenêtre en jours (aujourd'hui inclus)
+        
+        Returns:
+            {"totals": {compteur: n}, "by_category": {catégorie: {compteur: n}}, "period_days": days}
+        """
+        target = GLOBAL_GUILD_ID if guild_id is None else guild_id
+        totals = {metric: 0 for metric in METRICS}
+        by_category: Dict[str, Dict[str, int]] = {}
+        
+        today = datetime.utcnow().date()
+        for offset in range(max(days, 1)):
+            counters = self._days.get((target, (today - timedelta(days=offset)).isoformat()))
+            if not counters:
+                continue
+            for (metric, category), value in counters.items():
+                if category:
+                    per_category = by_category.setdefault(category, {})
+                    per_category[metric] = per_category.get(metric, 0) + value
+                else:
+                    totals[metric] += value
+        
+        return {"totals": totals, "by_category": by_category, "period_days": days}
+    
+    async def _run(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._stop.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+            self.prune()
+    
+    async def flush(self) -> int:
+        """
+        Écrire les incréments en attente (SQLite local puis Supabase)
+        
+        Returns:
+            Nombre de lignes écrites localement
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        
+        async with self._flush_lock:
+            written = 0
+            if self._pending_local:
+                batch, self._pending_local = self._pending_local, {}
+                rows = [key + (value,) for key, value in batch.items()]
+                try:
+                    await self._run_sync(self._write_sync, rows)
+                    written = len(rows)
+                except Exception as e:
+                    self._merge(self._pending_local, batch)
+                    logger.error(f"❌ Écriture des statistiques journalières impossible: {e}")
+            
+            if self._pending_remote:
+                batch, self._pending_remote = self._pending_remote, {}
+                deltas = [
+                    {"guild_id": guild_id, "day": day, "metric": metric, "category": category, "value": value}
+                    for (guild_id, day, metric, category), value in batch.items()
+                ]
+                try:
+                    await self.push_deltas(deltas)
+                except RemoteStatsDisabled as e:
+                    # Les compteurs restent en local; plus rien n'est mis en attente pour Supabase
+                    self.remote_disabled = True
+                    logger.warning(f"⚠️ Envoi des statistiques journalières désactivé: {e}")
+                except Exception as e:
+                    # Remettre les incréments en attente pour le prochain envoi
+                    self.failed_pushes += 1
+                    self._merge(self._pending_remote, batch)
+                    logger.warning(f"⚠️ Envoi des statistiques journalières reporté ({len(deltas)} ligne(s)): {e}")
+            
+            self.flushes += 1
+            return written
+    
+    @staticmethod
+    def _merge(target: Dict[RollupKey, int], batch: Dict[RollupKey, int]):
+        for key, value in batch.items():
+            target[key] = target.get(key, 0) + value
+    
+    def prune(self) -> int:
+        """
+        Oublier en mémoire les jours au-delà de la rétention
+        
+        Returns:
+            Nombre de jours supprimés
+        """
+        since = (datetime.utcnow().date() - timedelta(days=self.retention_days)).isoformat()
+        expired = [key for key in self._days if key[1] < since]
+        for key in expired:
+            del self._days[key]
+        return len(expired)
+    
+    async def close(self):
+        """Arrêter l'écriture périodique et écrire les incréments restants"""
+        self._closed = True
+        if self._task is not None and not self._task.done():
+            # Pas d'annulation: une écriture en cours doit se terminer
+            self._stop.set()
+            await self._task
+        await self.flush()
+        
+        def _close():
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+        
+        await self._run_sync(_close)
+        self._executor.shutdown(wait=True)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Statistiques du service de compteurs journaliers"""
+        return {
+            'tracked_days': len(self._days),
+            'events': self.events,
+            'pending_local': len(self._pending_local),
+            'pending_remote': len(self._pending_remote),
+            'flushes': self.flushes,
+            'failed_pushes': self.failed_pushes,
+            'remote_disabled': self.remote_disabled
+        }
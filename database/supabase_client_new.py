@@ -1,20 +1,102 @@
 # Client Supabase pour la nouvelle structure de base de données
 import os
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Any
 from supabase import create_client, Client
 from config.logging_config import get_logger
 from config.bot_config import bot_settings
+from database.activity_batcher import ActivityBatcher
+from database.server_stats import ServerStatsAggregator, PartialFlushError, COUNTERS
+from database.stats_rollup import RemoteStatsDisabled
 
 logger = get_logger('supabase')
 
+# Colonnes renvoyées par check_user (projection: pas de select("*"))
+USER_SUMMARY_COLUMNS = "user_id,total_flags,active_flags,risk_level,last_flagged_at,last_flagged_guild,expires_at"
+REPORT_SUMMARY_COLUMNS = "id,category,reason,guild_name,created_at"
+GUILD_STATS_COLUMNS = "guild_id,total_reports,total_checks,flags_found,first_seen,last_active"
+
 class SupabaseClientNew:
     """Client pour interactions avec la nouvelle structure DB Supabase"""
     
-    def __init__(self):
+    def __init__(self, max_concurrency: Optional[int] = None, timeout: Optional[float] = None):
         self.client: Optional[Client] = None
         self.is_connected = False
         
+        # Le SDK supabase est synchrone: chaque requête est exécutée dans un pool
+        # de threads borné pour ne jamais bloquer la boucle d'événements discord.py
+        self.max_concurrency = max_concurrency or bot_settings.supabase_max_concurrency
+        self.timeout = timeout or bot_settings.supabase_timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        
+        # Journal d'activité envoyé par lots hors du chemin des commandes
+        self.activity = ActivityBatcher(
+            self._insert_activity_batch,
+            batch_size=bot_settings.activity_batch_size,
+            flush_interval=bot_settings.activity_flush_interval,
+            max_queue=bot_settings.activity_queue_max,
+            spill_path=bot_settings.activity_spill_path,
+            max_spill_bytes=bot_settings.activity_spill_max_mb * 1024 * 1024
+        )
+        # Compteurs de la table servers cumulés puis envoyés en une écriture atomique
+        self.server_stats = ServerStatsAggregator(
+            self._flush_server_stats,
+            flush_interval=bot_settings.server_stats_flush_interval
+        )
+        # Passent à False si les fonctions SQL de performance ne sont pas déployées
+        self._summary_rpc_available = True
+        self._increment_rpc_available = True
+        self._guild_stats_rpc_available = True
+        self._daily_stats_rpc_available = True
+        self._validate_rpc_available = True
+    
+    async def _execute(self, query, timeout: Optional[float] = None):
+        """
+        Exécuter une requête Supabase sans bloquer la boucle d'événements
+        
+        Args:
+            query: Requête construite (objet possédant une méthode execute())
+            timeout: Délai maximum en secondes (défaut: self.timeout)
+            
+        Returns:
+            Résultat de query.execute()
+            
+        Raises:
+            asyncio.TimeoutError: Si la requête dépasse le délai (attente du pool incluse)
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="supabase"
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        try:
+            return await asyncio.wait_for(self._run_in_executor(query), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ Requête Supabase expirée après {timeout or self.timeout}s")
+            raise
+    
+    async def _run_in_executor(self, query):
+        """Exécuter query.execute() dans le pool en respectant la limite de concurrence"""
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            return await loop.run_in_executor(self._executor, query.execute)
+    
+    async def close(self):
+        """Envoyer les compteurs et activités en attente puis libérer le pool de threads"""
+        await self.server_stats.close()
+        await self.activity.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._semaphore = None
+        self.is_connected = False
+        
     async def connect(self) -> bool:
         """Se connecter à Supabase"""
         if not bot_settings.supabase_enabled:
@@ -32,7 +114,7 @@ class SupabaseClientNew:
             self.client = create_client(supabase_url, supabase_key)
             
             # Test de connexion avec nouvelle structure
-            test_query = self.client.table("reports").select("id").limit(1).execute()
+            test_query = await self._execute(self.client.table("reports").select("id").limit(1))
             
             self.is_connected = True
             logger.info("✅ Connexion Supabase établie")
@@ -43,19 +125,31 @@ class SupabaseClientNew:
             self.is_connected = False
             return False
     
-    async def check_user(self, user_id: int, guild_id: int, guild_name: str = None) -> Optional[Dict]:
-        """Vérifier un utilisateur avec la nouvelle structure DB"""
+    async def check_user(self, user_id: int, guild_id: int, guild_name: str = None,
+                         report_limit: int = 5) -> Optional[Dict]:
+        """
+        Vérifier un utilisateur avec la nouvelle structure DB
+        
+        Un seul aller-retour grâce à la fonction SQL check_user_summary (profil +
+        derniers signalements validés). Le log d'activité est écrit en arrière-plan.
+        
+        Args:
+            user_id: ID Discord de l'utilisateur
+            guild_id: ID du serveur demandeur
+            guild_name: Nom du serveur demandeur
+            report_limit: Nombre maximum de signalements récents renvoyés
+        """
         if not self.is_connected:
             return None
             
         try:
-            # Log de l'activité check
+            # Log de l'activité check (mis en file, hors chemin critique)
             await self._log_activity("check", user_id, None, guild_id, {"checked_user": user_id})
+            await self._update_server_stats(guild_id, guild_name, "check")
             
-            # Chercher l'utilisateur dans la table users
-            user_result = self.client.table("users").select("*").eq("user_id", user_id).execute()
+            user_data, reports = await self._fetch_user_summary(user_id, report_limit)
             
-            if not user_result.data:
+            if not user_data:
                 # Utilisateur propre (pas dans la DB)
                 return {
                     "is_flagged": False,
@@ -67,11 +161,6 @@ class SupabaseClientNew:
                     "expires_at": None
                 }
             
-            user_data = user_result.data[0]
-            
-            # Récupérer les rapports récents pour cet utilisateur
-            reports_result = self.client.table("reports").select("*").eq("target_user_id", user_id).eq("status", "validated").execute()
-            
             return {
                 "is_flagged": user_data.get("total_flags", 0) > 0,
                 "risk_level": user_data.get("risk_level", "clean"),
@@ -80,13 +169,59 @@ class SupabaseClientNew:
                 "last_flagged_at": user_data.get("last_flagged_at"),
                 "last_flagged_guild": user_data.get("last_flagged_guild"),
                 "expires_at": user_data.get("expires_at"),
-                "reports": reports_result.data if reports_result.data else []
+                "reports": reports
             }
             
         except Exception as e:
             logger.error(f"❌ Erreur check_user: {e}")
             return None
     
+    async def _fetch_user_summary(self, user_id: int, report_limit: int):
+        """
+        Récupérer le profil d'un utilisateur et ses derniers signalements validés
+        
+        active_flags et risk_level sont recalculés à la lecture (signalements
+        validés depuis moins de FLAG_EXPIRY_DAYS jours): les valeurs de la table
+        users ne sont à jour qu'au moment de la dernière validation.
+        
+        Returns:
+            (ligne users ou None, liste de signalements projetés)
+        """
+        if self._summary_rpc_available:
+            try:
+                result = await self._execute(self.client.rpc(
+                    "check_user_summary",
+                    {
+                        "user_id_param": user_id,
+                        "report_limit": report_limit,
+                        "flag_expiry_days": bot_settings.flag_expiry_days
+                    }
+                ))
+                data = result.data or {}
+                return data.get("user"), data.get("reports") or []
+            except asyncio.TimeoutError:
+                raise
+            except Exception as e:
+                if not self._is_missing_function(e, "check_user_summary"):
+                    raise
+                self._summary_rpc_available = False
+                logger.warning("⚠️ Fonction check_user_summary absente, repli sur deux requêtes parallèles")
+        
+        user_result, reports_result = await asyncio.gather(
+            self._execute(self.client.table("users").select(USER_SUMMARY_COLUMNS).eq("user_id", user_id).limit(1)),
+            self._execute(
+                self.client.table("reports").select(REPORT_SUMMARY_COLUMNS)
+                .eq("target_user_id", user_id).eq("status", "validated")
+                .order("created_at", desc=True).limit(report_limit)
+            )
+        )
+        user_data = user_result.data[0] if user_result.data else None
+        if user_data and user_data.get("total_flags"):
+            since = datetime.utcnow() - timedelta(days=bot_settings.flag_expiry_days)
+            active_flags = await self._count_validated_reports(user_id, since=since.isoformat())
+            user_data = {**user_data, "active_flags": active_flags, "risk_level": self._risk_level(active_flags)}
+        return user_data, reports_result.data or []
+    
     async def add_report(self, target_user_id: int, target_username: str, reason: str, 
                         category: str, guild_id: int, guild_name: str, 
                         reporter_hash: str, uniqueness_hash: str) -> Optional[Dict]:
@@ -113,7 +248,7 @@ class SupabaseClientNew:
                 "status": "pending"
             }
             
-            result = self.client.table("reports").insert(report_data).execute()
+            result = await self._execute(self.client.table("reports").insert(report_data))
             
             if result.data:
                 # Log de l'activité
@@ -134,53 +269,150 @@ class SupabaseClientNew:
             logger.error(f"❌ Erreur add_report: {e}")
             return {"success": False, "error": str(e)}
     
-    async def validate_report(self, report_id: str, validator_id: int, status: str) -> bool:
-        """Valider ou rejeter un signalement"""
+    async def check_duplicate_report(self, uniqueness_hash: str) -> Optional[str]:
+        """
+        Chercher un signalement existant avec le même hash d'unicité
+        
+        Les erreurs sont propagées pour que l'appelant ne mette pas en cache
+        un faux résultat négatif.
+        """
+        if not self.is_connected:
+            return None
+        
+        result = await self._execute(
+            self.client.table("reports").select("id").eq("uniqueness_hash", uniqueness_hash).limit(1)
+        )
+        return result.data[0]["id"] if result.data else None
+    
+    async def load_uniqueness_hashes(self, page_size: int = 1000) -> List[str]:
+        """
+        Charger tous les hash d'unicité connus (initialisation du filtre de doublons)
+        
+        Les pages sont triées par id: sans ordre stable, PostgreSQL peut renvoyer
+        des pages qui se chevauchent et omettre des lignes, et un hash omis
+        laisserait passer un doublon (le filtre le considérerait comme inconnu).
+        """
+        if not self.is_connected:
+            return []
+        
+        hashes = []
+        start = 0
+        while True:
+            result = await self._execute(
+                self.client.table("reports").select("uniqueness_hash").order("id").range(start, start + page_size - 1)
+            )
+            rows = result.data or []
+            hashes.extend(row["uniqueness_hash"] for row in rows if row.get("uniqueness_hash"))
+            if len(rows) < page_size:
+                return hashes
+            start += page_size
+    
+    async def validate_report(self, report_id: Optional[str], validator_id: int, status: str,
+                              uniqueness_hash: Optional[str] = None) -> bool:
+        """
+        Valider ou rejeter un signalement
+        
+        Une seule opération: statut, recalcul des flags de l'utilisateur visé et
+        journalisation exécutés une seule fois. Avec la fonction SQL
+        validate_report_and_flags, tout est fait en une transaction et un
+        aller-retour.
+        
+        Args:
+            report_id: ID Supabase du signalement (None: recherche par hash d'unicité)
+            validator_id: ID du validateur
+            status: validated ou rejected
+            uniqueness_hash: Hash d'unicité du signalement (repli si l'ID est inconnu)
+        """
         if not self.is_connected:
             return False
+        if not report_id and not uniqueness_hash:
+            return False
             
         try:
+            if self._validate_rpc_available:
+                try:
+                    result = await self._execute(self.client.rpc("validate_report_and_flags", {
+                        "report_id_param": report_id,
+                        "uniqueness_hash_param": uniqueness_hash,
+                        "validator_id_param": validator_id,
+                        "status_param": status,
+                        "flag_expiry_days": bot_settings.flag_expiry_days
+                    }))
+                    report = result.data
+                    if not report:
+                        return False
+                    if report.get("risk_level"):
+                        logger.info(f"Signalement {report['id']} {status} - niveau {report['risk_level']} "
+                                    f"({report.get('active_flags', 0)} flags actifs)")
+                    await self._after_validation(report, validator_id, status)
+                    return True
+                except asyncio.TimeoutError:
+                    raise
+                except Exception as e:
+                    if not self._is_missing_function(e, "validate_report_and_flags"):
+                        raise
+                    self._validate_rpc_available = False
+                    logger.warning("⚠️ Fonction validate_report_and_flags absente, repli sur plusieurs requêtes")
+            
             # Mettre à jour le statut du rapport
-            result = self.client.table("reports").update({
+            query = self.client.table("reports").update({
                 "status": status,
                 "validated_by": validator_id,
                 "validated_at": "now()"
-            }).eq("id", report_id).execute()
-            
-            if result.data and status == "validated":
-                # Si validé, mettre à jour l'utilisateur flagué
-                report = result.data[0]
-                await self._update_user_flags(
-                    report["target_user_id"], 
-                    report["target_username"],
-                    report["guild_name"]
-                )
-            
-            # Log de l'activité
-            await self._log_activity(status, validator_id, None, result.data[0]["guild_id"] if result.data else 0, {
-                "report_id": report_id,
-                "target_user_id": result.data[0]["target_user_id"] if result.data else 0
             })
+            query = query.eq("id", report_id) if report_id else query.eq("uniqueness_hash", uniqueness_hash)
+            result = await self._execute(query)
+            if not result.data:
+                return False
             
-            return bool(result.data)
+            report = result.data[0]
+            if report.get("target_user_id"):
+                if status == "validated":
+                    await self._update_user_flags(report["target_user_id"], report["target_username"], report["guild_name"])
+                elif status == "rejected":
+                    # Un signalement validé puis rejeté ne doit plus compter
+                    await self._update_user_flags(
+                        report["target_user_id"],
+                        report["target_username"],
+                        report["guild_name"],
+                        flagged=False
+                    )
+            
+            await self._after_validation(report, validator_id, status)
+            return True
             
         except Exception as e:
             logger.error(f"❌ Erreur validate_report: {e}")
             return False
+    
+    async def _after_validation(self, report: Dict[str, Any], validator_id: int, status: str):
+        """Journal d'activité et statistiques serveur d'une validation (envois groupés, sans aller-retour)"""
+        if status == "validated":
+            await self._update_server_stats(report["guild_id"], report.get("guild_name"), "flag")
+        await self._log_activity(status, validator_id, None, report.get("guild_id") or 0, {
+            "report_id": report.get("id"),
+            "target_user_id": report.get("target_user_id") or 0
+        })
 
     async def update_report(self, report) -> bool:
         """Compatibilité: met à jour un rapport à partir de l'objet Report.
-        Redirige vers validate_report du nouveau client.
+        Redirige vers validate_report du nouveau client (ID Supabase conservé dans
+        metadata['db_report_id'], sinon hash d'unicité).
         """
         try:
             if not self.is_connected:
                 return False
-            report_id = getattr(report, 'id', None)
             status = getattr(report, 'status', 'pending')
-            validator_id = getattr(report, 'validated_by', 0) or 0
-            if not report_id:
+            if status not in ("validated", "rejected"):
                 return False
-            return await self.validate_report(report_id=report_id, validator_id=validator_id, status=status)
+            metadata = getattr(report, 'metadata', None) or {}
+            validator_id = getattr(report, 'validated_by', 0) or 0
+            return await self.validate_report(
+                report_id=metadata.get('db_report_id'),
+                validator_id=validator_id,
+                status=status,
+                uniqueness_hash=getattr(report, 'uniqueness_hash', None)
+            )
         except Exception as e:
             logger.error(f"Erreur update_report (shim compat): {e}")
             return False
@@ -189,47 +421,35 @@ class SupabaseClientNew:
                                    reason: str, category: str,
                                    guild_id: int, guild_name: str) -> dict:
         """Compat: méthode legacy appelée par certaines vues.
-        Le flux officiel passe par validate_report; on renvoie un succès neutre
-        pour éviter les doubles insertions et garder la compatibilité UI.
+        Le flux officiel passe par validate_report, qui recalcule déjà les flags:
+        rien n'est réécrit ici pour ne pas doubler les requêtes.
         """
-        try:
-            logger.info("Compat add_validated_report: géré via validate_report/update_report.")
-            # Optionnel: recalculer les flags utilisateur si ID fourni
-            if user_id:
-                await self._update_user_flags(user_id=user_id, username=username, guild_name=guild_name)
-            return {"success": True, "new_level": "", "new_active_flags": 0}
-        except Exception as e:
-            logger.error(f"Erreur compat add_validated_report: {e}")
-            return {"success": False, "error": str(e)}
+        logger.debug("Compat add_validated_report: géré via validate_report/update_report.")
+        return {"success": True, "new_level": "", "new_active_flags": 0}
 
     async def get_guild_stats(self, guild_id: int, days: int = 30) -> Optional[Dict]:
-        """Obtenir les statistiques d'un serveur"""
+        """
+        Obtenir les statistiques d'un serveur
+        
+        Le comptage de l'activité par action est fait par la base (fonction
+        guild_stats_summary): la réponse a une taille constante quel que soit
+        le volume d'activité.
+        """
         if not self.is_connected:
             return None
             
         try:
-            # Stats du serveur depuis la table servers
-            server_result = self.client.table("servers").select("*").eq("guild_id", guild_id).execute()
-            
-            # Stats d'activité récente
-            from datetime import datetime, timedelta
             since_date = (datetime.utcnow() - timedelta(days=days)).isoformat()
+            server_data, activity_counts = await self._fetch_guild_stats(guild_id, since_date)
             
-            activity_result = self.client.table("activity").select("*").eq("guild_id", guild_id).gte("created_at", since_date).execute()
-            
-            # Compter par type d'action
-            activity_counts = {}
-            for activity in activity_result.data if activity_result.data else []:
-                action = activity.get("action", "unknown")
-                activity_counts[action] = activity_counts.get(action, 0) + 1
-            
-            server_data = server_result.data[0] if server_result.data else {}
+            # Inclure les incréments pas encore envoyés
+            pending = self.server_stats.pending(guild_id)
             
             return {
                 "guild_id": guild_id,
-                "total_reports": server_data.get("total_reports", 0),
-                "total_checks": server_data.get("total_checks", 0),
-                "flags_found": server_data.get("flags_found", 0),
+                "total_reports": (server_data.get("total_reports") or 0) + pending["total_reports"],
+                "total_checks": (server_data.get("total_checks") or 0) + pending["total_checks"],
+                "flags_found": (server_data.get("flags_found") or 0) + pending["flags_found"],
                 "first_seen": server_data.get("first_seen"),
                 "last_active": server_data.get("last_active"),
                 "recent_activity": activity_counts,
@@ -240,25 +460,83 @@ class SupabaseClientNew:
             logger.error(f"❌ Erreur get_guild_stats: {e}")
             return None
     
-    async def _update_user_flags(self, user_id: int, username: str, guild_name: str):
-        """Mettre à jour les flags d'un utilisateur après validation"""
+    async def _fetch_guild_stats(self, guild_id: int, since_date: str):
+        """
+        Récupérer la ligne servers et le nombre d'activités par action
+        
+        Returns:
+            (ligne servers ou {}, {action: nombre})
+        """
+        if self._guild_stats_rpc_available:
+            try:
+                result = await self._execute(self.client.rpc(
+                    "guild_stats_summary",
+                    {"guild_id_param": guild_id, "since_param": since_date}
+                ))
+                data = result.data or {}
+                activity_counts = {action: int(count) for action, count in (data.get("activity") or {}).items()}
+                return data.get("server") or {}, activity_counts
+            except asyncio.TimeoutError:
+                raise
+            except Exception as e:
+                if not self._is_missing_function(e, "guild_stats_summary"):
+                    raise
+                self._guild_stats_rpc_available = False
+                logger.warning("⚠️ Fonction guild_stats_summary absente, repli sur le comptage local")
+        
+        server_result, activity_result = await asyncio.gather(
+            self._execute(self.client.table("servers").select(GUILD_STATS_COLUMNS).eq("guild_id", guild_id)),
+            self._execute(self.client.table("activity").select("action").eq("guild_id", guild_id).gte("created_at", since_date))
+        )
+        
+        # Compter par type d'action
+        activity_counts = {}
+        for activity in activity_result.data if activity_result.data else []:
+            action = activity.get("action", "unknown")
+            activity_counts[action] = activity_counts.get(action, 0) + 1
+        
+        server_data = server_result.data[0] if server_result.data else {}
+        return server_data, activity_counts
+    
+    async def _count_validated_reports(self, user_id: int, since: Optional[str] = None) -> int:
+        """Nombre exact de signalements validés d'un utilisateur (sans télécharger les lignes)"""
+        query = (
+            self.client.table("reports").select("id", count="exact", head=True)
+            .eq("target_user_id", user_id).eq("status", "validated")
+        )
+        if since:
+            query = query.gte("validated_at", since)
+        result = await self._execute(query)
+        return result.count or 0
+    
+    async def _update_user_flags(self, user_id: int, username: str, guild_name: str, flagged: bool = True):
+        """
+        Mettre à jour les flags d'un utilisateur après validation ou rejet
+        
+        Les flags actifs sont les signalements validés depuis moins de
+        FLAG_EXPIRY_DAYS jours; le niveau de risque en dépend.
+        
+        Args:
+            user_id: ID Discord de l'utilisateur signalé
+            username: Nom de l'utilisateur
+            guild_name: Serveur à l'origine du flag
+            flagged: False pour un rejet (le flag n'est pas daté de maintenant)
+        """
         try:
-            # Compter les rapports validés pour cet utilisateur
-            reports_result = self.client.table("reports").select("*").eq("target_user_id", user_id).eq("status", "validated").execute()
-            
-            total_flags = len(reports_result.data) if reports_result.data else 0
-            
-            # Calculer le niveau de risque
-            if total_flags == 0:
-                risk_level = "clean"
-            elif total_flags == 1:
-                risk_level = "low"
-            elif total_flags <= 3:
-                risk_level = "medium"
-            elif total_flags <= 5:
-                risk_level = "high"
-            else:
-                risk_level = "critical"
+            now = datetime.utcnow()
+            expiry = timedelta(days=bot_settings.flag_expiry_days)
+            
+            # Deux comptages exacts en parallèle (total et non expirés)
+            total_flags, active_flags = await asyncio.gather(
+                self._count_validated_reports(user_id),
+                self._count_validated_reports(user_id, since=(now - expiry).isoformat())
+            )
+            
+            if not flagged and total_flags == 0:
+                # Rejet sans historique: pas de ligne users à créer
+                return
+            
+            risk_level = self._risk_level(active_flags)
             
             # Upsert dans la table users
             user_data = {
@@ -266,62 +544,175 @@ class SupabaseClientNew:
                 "username": username,
                 "risk_level": risk_level,
                 "total_flags": total_flags,
-                "active_flags": total_flags,  # Pour l'instant tous actifs
-                "last_flagged_at": "now()",
-                "last_flagged_guild": guild_name,
+                "active_flags": active_flags,
                 "updated_at": "now()"
             }
+            if flagged:
+                user_data.update({
+                    "last_flagged_at": "now()",
+                    "last_flagged_guild": guild_name,
+                    "expires_at": (now + expiry).isoformat()
+                })
             
-            self.client.table("users").upsert(user_data).execute()
+            await self._execute(self.client.table("users").upsert(user_data))
             
         except Exception as e:
             logger.error(f"❌ Erreur _update_user_flags: {e}")
     
+    @staticmethod
+    def _risk_level(active_flags: int) -> str:
+        """Niveau de risque selon le nombre de flags actifs (même barème que les fonctions SQL)"""
+        if active_flags == 0:
+            return "clean"
+        if active_flags == 1:
+            return "low"
+        if active_flags <= 3:
+            return "medium"
+        if active_flags <= 5:
+            return "high"
+        return "critical"
+    
+    @staticmethod
+    def _is_missing_function(error: Exception, function_name: str) -> bool:
+        """
+        Erreur PostgREST PGRST202: fonction SQL inconnue (schéma de performance non appliqué)
+        
+        Seul ce cas désactive le chemin RPC: une erreur d'exécution de la fonction
+        (dont le message peut citer son nom) doit remonter.
+        """
+        if getattr(error, "code", None) == "PGRST202":
+            return True
+        message = str(error)
+        return "PGRST202" in message or (
+            "Could not find the function" in message and function_name in message
+        )
+    
     async def _update_server_stats(self, guild_id: int, guild_name: str, action: str):
-        """Mettre à jour les statistiques du serveur"""
+        """Mettre à jour les statistiques du serveur (cumulées, envoyées périodiquement)"""
+        counter = {"report": "total_reports", "check": "total_checks", "flag": "flags_found"}.get(action)
+        if counter is None:
+            return
+        
         try:
-            # Récupérer ou créer l'entrée serveur
-            server_result = self.client.table("servers").select("*").eq("guild_id", guild_id).execute()
-            
-            if server_result.data:
-                # Mettre à jour
-                updates = {"last_active": "now()"}
-                if action == "report":
-                    updates["total_reports"] = server_result.data[0].get("total_reports", 0) + 1
-                elif action == "check":
-                    updates["total_checks"] = server_result.data[0].get("total_checks", 0) + 1
-                
-                self.client.table("servers").update(updates).eq("guild_id", guild_id).execute()
-            else:
-                # Créer nouvelle entrée
-                server_data = {
-                    "guild_id": guild_id,
-                    "guild_name": guild_name,
-                    "total_reports": 1 if action == "report" else 0,
-                    "total_checks": 1 if action == "check" else 0,
-                    "flags_found": 0
-                }
-                self.client.table("servers").insert(server_data).execute()
-                
+            self.server_stats.increment(guild_id, guild_name, **{counter: 1})
         except Exception as e:
             logger.error(f"❌ Erreur _update_server_stats: {e}")
     
+    async def _flush_server_stats(self, rows: List[Dict[str, Any]]):
+        """
+        Appliquer les incréments cumulés à la table servers
+        
+        Une seule requête atomique (increment_server_stats) pour tous les serveurs;
+        les erreurs remontent à l'agrégateur qui conserve les incréments.
+        
+        Sans la fonction SQL, le repli lit puis réécrit chaque serveur: il n'est
+        pas atomique et deux processus (shards) qui écrivent le même serveur en
+        même temps peuvent perdre des incréments. Les serveurs en échec sont
+        signalés par PartialFlushError pour que seuls ceux-ci soient renvoyés.
+        """
+        if not self.is_connected:
+            raise ConnectionError("Supabase non connecté")
+        
+        if self._increment_rpc_available:
+            try:
+                await self._execute(self.client.rpc("increment_server_stats", {"deltas": rows}))
+                return
+            except Exception as e:
+                if not self._is_missing_function(e, "increment_server_stats"):
+                    raise
+                self._increment_rpc_available = False
+                logger.warning("⚠️ Fonction increment_server_stats absente, repli sur lecture + écriture par serveur")
+        
+        failed_rows = []
+        last_error = None
+        for row in rows:
+            try:
+                server_result = await self._execute(self.client.table("servers").select(",".join(COUNTERS)).eq("guild_id", row["guild_id"]))
+                
+                if server_result.data:
+                    current = server_result.data[0]
+                    updates = {counter: (current.get(counter) or 0) + row[counter] for counter in COUNTERS}
+                    updates["last_active"] = "now()"
+                    await self._execute(self.client.table("servers").update(updates).eq("guild_id", row["guild_id"]))
+                else:
+                    server_data = {"guild_id": row["guild_id"], "guild_name": row["guild_name"] or "Unknown"}
+                    server_data.update({counter: row[counter] for counter in COUNTERS})
+                    await self._execute(self.client.table("servers").insert(server_data))
+            except Exception as e:
+                failed_rows.append(row)
+                last_error = e
+        
+        if failed_rows:
+            raise PartialFlushError(failed_rows, last_error)
+    
+    async def delete_reports_by_hashes(self, uniqueness_hashes: List[str], chunk_size: int = 100) -> int:
+        """
+        Supprimer des signalements par hash d'unicité (purge du forum)
+        
+        Args:
+            uniqueness_hashes: Hash d'unicité des signalements à supprimer
+            chunk_size: Nombre de hash par requête (longueur d'URL bornée)
+            
+        Returns:
+            Nombre de lignes supprimées
+        """
+        if not self.is_connected or not uniqueness_hashes:
+            return 0
+        
+        deleted = 0
+        for start in range(0, len(uniqueness_hashes), chunk_size):
+            chunk = uniqueness_hashes[start:start + chunk_size]
+            result = await self._execute(self.client.table("reports").delete().in_("uniqueness_hash", chunk))
+            deleted += len(result.data or [])
+        return deleted
+    
+    async def push_daily_stats(self, deltas: List[Dict[str, Any]]):
+        """
+        Appliquer les incréments des statistiques journalières (table guild_daily_stats)
+        
+        Une seule requête atomique (increment_daily_stats); les erreurs remontent
+        au service de compteurs qui conserve les incréments. Sans la fonction SQL
+        (PGRST202 uniquement), RemoteStatsDisabled est levée: les compteurs
+        restent uniquement locaux.
+        """
+        if not self.is_connected:
+            raise ConnectionError("Supabase non connecté")
+        if not self._daily_stats_rpc_available:
+            raise RemoteStatsDisabled("fonction increment_daily_stats absente")
+        
+        try:
+            await self._execute(self.client.rpc("increment_daily_stats", {"deltas": deltas}))
+        except Exception as e:
+            if not self._is_missing_function(e, "increment_daily_stats"):
+                raise
+            self._daily_stats_rpc_available = False
+            logger.warning("⚠️ Fonction increment_daily_stats absente, statistiques journalières conservées localement")
+            raise RemoteStatsDisabled("fonction increment_daily_stats absente") from e
+    
     async def _log_activity(self, action: str, user_id: Optional[int], username: Optional[str], 
                           guild_id: int, result: Dict):
-        """Logger une activité dans la table activity"""
+        """Logger une activité dans la table activity (envoi groupé en arrière-plan)"""
         try:
             activity_data = {
                 "action": action,
                 "user_id": user_id,
                 "username": username,
                 "guild_id": guild_id,
-                "result": result
+                "result": result,
+                # Horodatage de l'événement, pas de l'envoi du lot
+                "created_at": datetime.utcnow().isoformat()
             }
             
-            self.client.table("activity").insert(activity_data).execute()
+            await self.activity.log(activity_data)
             
         except Exception as e:
             logger.error(f"❌ Erreur _log_activity: {e}")
+    
+    async def _insert_activity_batch(self, rows: List[Dict[str, Any]]):
+        """Insérer un lot d'activités (les erreurs remontent au batcher)"""
+        if not self.is_connected:
+            raise ConnectionError("Supabase non connecté")
+        await self._execute(self.client.table("activity").insert(rows))
 
 # Instance globale
 supabase_client_new = SupabaseClientNew()
@@ -0,0 +1,272 @@
+-- Extensions de performance du schéma Supabase pour Aegis Bot
+-- Ce fichier complète la structure reports / users / servers / activity
+-- À exécuter dans l'éditeur SQL Supabase
+
+-- ====================================
+-- 1. État persistant des signalements actifs
+-- ====================================
+
+-- Utilisée par SupabaseReportStore (REPORT_STORE_BACKEND=supabase)
+-- Le payload ne contient JAMAIS l'ID Discord du rapporteur
+CREATE TABLE IF NOT EXISTS report_states (
+    id TEXT PRIMARY KEY,
+    guild_id BIGINT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    created_at TIMESTAMP WITH TIME ZONE,
+    payload JSONB NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_report_states_guild_status ON report_states(guild_id, status);
+
+ALTER TABLE report_states ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Allow service role access" ON report_states FOR ALL USING (true);
+
+COMMENT ON TABLE report_states IS 'État des signalements actifs pour la reprise après redémarrage du bot';
+
+-- ====================================
+-- 2. Vérification d'un utilisateur en un seul aller-retour
+-- ====================================
+
+-- Utilisée par SupabaseClientNew.check_user: profil + derniers signalements validés
+-- Colonnes projetées et nombre de signalements borné
+-- active_flags et risk_level sont recalculés à la lecture: un flag expire sans
+-- attendre une nouvelle validation (users ne contient que la dernière valeur écrite)
+DROP FUNCTION IF EXISTS check_user_summary(BIGINT, INTEGER);
+
+CREATE OR REPLACE FUNCTION check_user_summary(
+    user_id_param BIGINT,
+    report_limit INTEGER DEFAULT 5,
+    flag_expiry_days INTEGER DEFAULT 90
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'user', (
+            SELECT to_jsonb(u) FROM (
+                SELECT users.user_id, users.total_flags, a.active AS active_flags,
+                       CASE
+                           WHEN a.active = 0 THEN 'clean'
+                           WHEN a.active = 1 THEN 'low'
+                           WHEN a.active <= 3 THEN 'medium'
+                           WHEN a.active <= 5 THEN 'high'
+                           ELSE 'critical'
+                       END AS risk_level,
+                       users.last_flagged_at, users.last_flagged_guild, users.expires_at
+                FROM users
+                CROSS JOIN LATERAL (
+                    SELECT COUNT(*)::INTEGER AS active
+                    FROM reports
+                    WHERE target_user_id = user_id_param AND status = 'validated'
+                      AND validated_at >= NOW() - make_interval(days => flag_expiry_days)
+                ) a
+                WHERE users.user_id = user_id_param
+                LIMIT 1
+            ) u
+        ),
+        'reports', COALESCE((
+            SELECT jsonb_agg(to_jsonb(r)) FROM (
+                SELECT id, category, reason, guild_name, created_at
+                FROM reports
+                WHERE target_user_id = user_id_param AND status = 'validated'
+                ORDER BY created_at DESC
+                LIMIT report_limit
+            ) r
+        ), '[]'::jsonb)
+    );
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_reports_target_status_created ON reports(target_user_id, status, created_at DESC);
+
+COMMENT ON FUNCTION check_user_summary IS 'Résumé de risque et signalements validés récents d''un utilisateur (un seul aller-retour)';
+
+-- ====================================
+-- 3. Incréments atomiques des statistiques serveur
+-- ====================================
+
+-- Utilisée par SupabaseClientNew._flush_server_stats
+-- deltas: [{"guild_id": 1, "guild_name": "...", "total_reports": 2, "total_checks": 5, "flags_found": 0}, ...]
+-- L'incrément est calculé par PostgreSQL: aucun incrément perdu en cas d'écritures concurrentes
+CREATE OR REPLACE FUNCTION increment_server_stats(deltas JSONB)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO servers (guild_id, guild_name, total_reports, total_checks, flags_found, last_active)
+    SELECT d.guild_id, COALESCE(d.guild_name, 'Unknown'),
+           COALESCE(d.total_reports, 0), COALESCE(d.total_checks, 0), COALESCE(d.flags_found, 0), NOW()
+    FROM jsonb_to_recordset(deltas) AS d(
+        guild_id BIGINT, guild_name TEXT, total_reports INTEGER, total_checks INTEGER, flags_found INTEGER
+    )
+    ON CONFLICT (guild_id) DO UPDATE SET
+        guild_name = COALESCE(NULLIF(EXCLUDED.guild_name, 'Unknown'), servers.guild_name),
+        total_reports = COALESCE(servers.total_reports, 0) + EXCLUDED.total_reports,
+        total_checks = COALESCE(servers.total_checks, 0) + EXCLUDED.total_checks,
+        flags_found = COALESCE(servers.flags_found, 0) + EXCLUDED.flags_found,
+        last_active = NOW();
+$$;
+
+COMMENT ON FUNCTION increment_server_stats IS 'Applique en une requête les incréments cumulés de plusieurs serveurs';
+
+-- ====================================
+-- 4. Comptage des flags actifs
+-- ====================================
+
+-- Utilisé par SupabaseClientNew._update_user_flags (count exact sur les signalements validés non expirés)
+CREATE INDEX IF NOT EXISTS idx_reports_target_status_validated ON reports(target_user_id, status, validated_at);
+
+-- ====================================
+-- 5. Statistiques d'un serveur agrégées côté base
+-- ====================================
+
+-- Utilisée par SupabaseClientNew.get_guild_stats (/stats)
+-- Renvoie la ligne servers et le nombre d'activités par action: taille constante
+CREATE OR REPLACE FUNCTION guild_stats_summary(
+    guild_id_param BIGINT,
+    since_param TIMESTAMP WITH TIME ZONE
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'server', (SELECT to_jsonb(s) FROM servers s WHERE s.guild_id = guild_id_param LIMIT 1),
+        'activity', COALESCE((
+            SELECT jsonb_object_agg(a.action, a.total) FROM (
+                SELECT COALESCE(action, 'unknown') AS action, COUNT(*) AS total
+                FROM activity
+                WHERE guild_id = guild_id_param AND created_at >= since_param
+                GROUP BY 1
+            ) a
+        ), '{}'::jsonb)
+    );
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_activity_guild_created ON activity(guild_id, created_at);
+
+-- ====================================
+-- 6. Statistiques journalières par serveur
+-- ====================================
+
+-- Alimentée par StatsRollup (database/stats_rollup.py) via increment_daily_stats
+-- category = '' pour le total du compteur, sinon la catégorie du signalement
+CREATE TABLE IF NOT EXISTS guild_daily_stats (
+    guild_id BIGINT NOT NULL,
+    day DATE NOT NULL,
+    metric TEXT NOT NULL,
+    category TEXT NOT NULL DEFAULT '',
+    value BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, day, metric, category)
+);
+
+CREATE INDEX IF NOT EXISTS idx_guild_daily_stats_day ON guild_daily_stats(day);
+
+-- deltas: [{"guild_id": 1, "day": "2024-01-31", "metric": "checks", "category": "", "value": 3}, ...]
+CREATE OR REPLACE FUNCTION increment_daily_stats(deltas JSONB)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO guild_daily_stats (guild_id, day, metric, category, value)
+    SELECT d.guild_id, d.day, d.metric, COALESCE(d.category, ''), d.value
+    FROM jsonb_to_recordset(deltas) AS d(guild_id BIGINT, day DATE, metric TEXT, category TEXT, value BIGINT)
+    ON CONFLICT (guild_id, day, metric, category) DO UPDATE SET
+        value = guild_daily_stats.value + EXCLUDED.value;
+$$;
+
+COMMENT ON FUNCTION increment_daily_stats IS 'Applique en une requête les incréments des statistiques journalières';
+
+-- ====================================
+-- 7. Validation d'un signalement en une transaction
+-- ====================================
+
+-- Utilisée par SupabaseClientNew.validate_report
+-- Statut + recalcul des flags de l'utilisateur visé en un seul aller-retour;
+-- mêmes règles que _update_user_flags (flags actifs = validés depuis moins de flag_expiry_days jours)
+-- Le signalement est retrouvé par son ID Supabase, ou à défaut par son hash d'unicité
+CREATE OR REPLACE FUNCTION validate_report_and_flags(
+    report_id_param TEXT,
+    uniqueness_hash_param TEXT,
+    validator_id_param BIGINT,
+    status_param TEXT,
+    flag_expiry_days INTEGER DEFAULT 90
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    r reports%ROWTYPE;
+    total INTEGER := 0;
+    active INTEGER := 0;
+    level TEXT := NULL;
+BEGIN
+    UPDATE reports SET status = status_param, validated_by = validator_id_param, validated_at = NOW()
+    WHERE id = (
+        SELECT id FROM reports
+        WHERE (report_id_param IS NOT NULL AND id::TEXT = report_id_param)
+           OR (report_id_param IS NULL AND uniqueness_hash = uniqueness_hash_param)
+        LIMIT 1
+    )
+    RETURNING * INTO r;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    IF COALESCE(r.target_user_id, 0) <> 0 THEN
+        SELECT COUNT(*),
+               COUNT(*) FILTER (WHERE validated_at >= NOW() - make_interval(days => flag_expiry_days))
+        INTO total, active
+        FROM reports
+        WHERE target_user_id = r.target_user_id AND status = 'validated';
+
+        level := CASE
+            WHEN active = 0 THEN 'clean'
+            WHEN active = 1 THEN 'low'
+            WHEN active <= 3 THEN 'medium'
+            WHEN active <= 5 THEN 'high'
+            ELSE 'critical'
+        END;
+
+        IF status_param = 'validated' THEN
+            INSERT INTO users (user_id, username, risk_level, total_flags, active_flags,
+                               last_flagged_at, last_flagged_guild, expires_at, updated_at)
+            VALUES (r.target_user_id, r.target_username, level, total, active,
+                    NOW(), r.guild_name, NOW() + make_interval(days => flag_expiry_days), NOW())
+            ON CONFLICT (user_id) DO UPDATE SET
+                username = EXCLUDED.username,
+                risk_level = EXCLUDED.risk_level,
+                total_flags = EXCLUDED.total_flags,
+                active_flags = EXCLUDED.active_flags,
+                last_flagged_at = EXCLUDED.last_flagged_at,
+                last_flagged_guild = EXCLUDED.last_flagged_guild,
+                expires_at = EXCLUDED.expires_at,
+                updated_at = NOW();
+        ELSIF total > 0 THEN
+            -- Rejet: le flag n'est pas daté de maintenant
+            INSERT INTO users (user_id, username, risk_level, total_flags, active_flags, updated_at)
+            VALUES (r.target_user_id, r.target_username, level, total, active, NOW())
+            ON CONFLICT (user_id) DO UPDATE SET
+                username = EXCLUDED.username,
+                risk_level = EXCLUDED.risk_level,
+                total_flags = EXCLUDED.total_flags,
+                active_flags = EXCLUDED.active_flags,
+                updated_at = NOW();
+        END IF;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'id', r.id,
+        'guild_id', r.guild_id,
+        'guild_name', r.guild_name,
+        'target_user_id', r.target_user_id,
+        'total_flags', total,
+        'active_flags', active,
+        'risk_level', level
+    );
+END;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_reports_uniqueness_hash ON reports(uniqueness_hash);
+
+COMMENT ON FUNCTION validate_report_and_flags IS 'Valide ou rejette un signalement et recalcule les flags de l''utilisateur en une transaction';
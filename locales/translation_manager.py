@@ -2,23 +2,110 @@
 Gestionnaire de traductions modulaire pour Aegis
 """
 import json
+import time
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterable, Tuple, Set, Callable
 
 from config.logging_config import get_logger
 
 logger = get_logger('translations')
 
 
+class TranslationCatalog:
+    """
+    Catalogue compilé d'une langue
+    
+    Le repli sur la langue par défaut est fusionné au chargement et les
+    templates contenant des variables sont séparés des textes statiques:
+    get() se résume à une recherche dans un dictionnaire.
+    """
+    
+    def __init__(self, language: str, entries: Dict[str, str], reported_keys: Set[str] = None):
+        self.language = language
+        
+        # Textes sans variable (retournés tels quels)
+        self._plain: Dict[str, str] = {}
+        # Templates avec variables: {clé: (texte brut, format_map lié)}
+        self._templates: Dict[str, Tuple[str, Callable[[Dict[str, Any]], str]]] = {}
+        
+        # Clés déjà signalées (partagé entre catalogues pour ne logger qu'une fois)
+        self._reported_keys = reported_keys if reported_keys is not None else set()
+        
+        for key, value in entries.items():
+            if not isinstance(value, str) or not value:
+                continue
+            if '{' in value:
+                self._templates[key] = (value, value.format_map)
+            else:
+                self._plain[key] = value
+    
+    def get(self, key: str, fallback: str = None, **kwargs) -> str:
+        """
+        Obtenir un texte traduit
+        
+        Args:
+            key: Clé de traduction
+            fallback: Texte par défaut si traduction introuvable
+            **kwargs: Variables pour formatage
+            
+        Returns:
+            Texte traduit
+        """
+        text = self._plain.get(key)
+        if text is not None:
+            return text
+        
+        template = self._templates.get(key)
+        if template is not None:
+            raw, format_map = template
+            if not kwargs:
+                return raw
+            try:
+                return format_map(kwargs)
+            except (KeyError, IndexError, ValueError) as e:
+                self._report_once(key, f"Variable manquante dans traduction '{key}': {e}")
+                return raw
+        
+        if fallback:
+            return fallback
+        
+        self._report_once(key, f"Traduction non trouvée: {key} (langue: {self.language})")
+        return key
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._plain or key in self._templates
+    
+    def __len__(self) -> int:
+        return len(self._plain) + len(self._templates)
+    
+    def _report_once(self, key: str, message: str):
+        """Logger un avertissement une seule fois par clé et par langue"""
+        report_key = f"{self.language}:{key}"
+        if report_key not in self._reported_keys:
+            self._reported_keys.add(report_key)
+            logger.warning(message)
+
+
 class TranslationManager:
     """Gestionnaire centralisé des traductions"""
     
-    def __init__(self, locales_dir: str = "locales"):
+    def __init__(self, locales_dir: str = "locales", language_cache_ttl: float = 30.0):
         self.locales_dir = Path(locales_dir)
         self.translations: Dict[str, Dict[str, str]] = {}
         self.default_language = "en"
         self.available_languages = []
         
+        # Cache de la langue résolue par serveur: {guild_id: (langue, expiration monotonic)}
+        # Invalidé par GuildService lors d'un changement de langue; le TTL
+        # garantit la prise en compte des modifications externes du fichier
+        self._guild_languages: Dict[int, Tuple[str, float]] = {}
+        self.language_cache_ttl = language_cache_ttl
+        self._guild_listener_registered = False
+        
+        # Catalogues compilés par langue (repli sur la langue par défaut inclus)
+        self._catalogs: Dict[str, TranslationCatalog] = {}
+        self._reported_keys: Set[str] = set()
+        
         # Charger toutes les traductions
         self._load_all_translations()
     
@@ -46,9 +133,55 @@ class TranslationManager:
             if not self.translations:
                 logger.error("Aucune traduction chargée !")
             
+            self._compile_catalogs()
+            
         except Exception as e:
             logger.error(f"Erreur lors du chargement des traductions: {e}")
     
+    def _compile_catalogs(self):
+        """Compiler un catalogue par langue et signaler les clés manquantes une seule fois"""
+        default_entries = self.translations.get(self.default_language, {})
+        catalogs = {}
+        
+        for language, translations in self.translations.items():
+            merged = dict(default_entries)
+            merged.update({key: value for key, value in translations.items() if value})
+            catalogs[language] = TranslationCatalog(language, merged, self._reported_keys)
+            
+            if language != self.default_language:
+                missing = [key for key, value in default_entries.items() if value and not translations.get(key)]
+                if missing:
+                    logger.warning(
+                        f"{len(missing)} traduction(s) manquante(s) pour {language}, "
+                        f"repli sur {self.default_language}: {', '.join(sorted(missing)[:10])}"
+                        f"{'...' if len(missing) > 10 else ''}"
+                    )
+        
+        if self.default_language not in catalogs:
+            catalogs[self.default_language] = TranslationCatalog(self.default_language, {}, self._reported_keys)
+        
+        self._catalogs = catalogs
+    
+    def catalog(self, guild_id: int = None, language: str = None) -> TranslationCatalog:
+        """
+        Obtenir le catalogue compilé d'un serveur
+        
+        Le catalogue peut être conservé pendant toute la durée d'une interaction:
+        la langue n'est résolue qu'une fois.
+        
+        Args:
+            guild_id: ID du serveur (pour déterminer la langue)
+            language: Langue forcée (optionnel)
+            
+        Returns:
+            Catalogue de la langue (catalogue par défaut si langue inconnue)
+        """
+        target_language = language or self._get_guild_language(guild_id) or self.default_language
+        catalog = self._catalogs.get(target_language) or self._catalogs.get(self.default_language)
+        if catalog is None:
+            catalog = TranslationCatalog(self.default_language, {}, self._reported_keys)
+        return catalog
+    
     def t(self, key: str, guild_id: int = None, language: str = None, fallback: str = None, **kwargs) -> str:
         """
         Traduire une clé
@@ -64,45 +197,31 @@ class TranslationManager:
             Texte traduit
         """
         try:
-            # Déterminer la langue à utiliser
-            target_language = language or self._get_guild_language(guild_id) or self.default_language
-            
-            # Récupérer la traduction
-            if target_language in self.translations:
-                translation = self.translations[target_language].get(key)
-                if translation:
-                    # Formater avec les variables fournies
-                    if kwargs:
-                        try:
-                            return translation.format(**kwargs)
-                        except KeyError as e:
-                            logger.warning(f"Variable manquante dans traduction '{key}': {e}")
-                            return translation
-                    return translation
-            
-            # Fallback vers la langue par défaut
-            if target_language != self.default_language and self.default_language in self.translations:
-                translation = self.translations[self.default_language].get(key)
-                if translation:
-                    if kwargs:
-                        try:
-                            return translation.format(**kwargs)
-                        except KeyError:
-                            return translation
-                    return translation
-            
-            # Utiliser le fallback fourni
-            if fallback:
-                return fallback
-                
-            # En dernier recours, retourner la clé
-            logger.warning(f"Traduction non trouvée: {key} (langue: {target_language})")
-            return key
+            return self.catalog(guild_id, language).get(key, fallback, **kwargs)
             
         except Exception as e:
             logger.error(f"Erreur lors de la traduction de '{key}': {e}")
             return fallback or key
     
+    def t_many(self, keys: Iterable[str], guild_id: int = None, language: str = None,
+               fallbacks: Dict[str, str] = None) -> Dict[str, str]:
+        """
+        Traduire plusieurs clés en ne résolvant la langue qu'une seule fois
+        
+        Args:
+            keys: Clés de traduction
+            guild_id: ID du serveur (pour déterminer la langue)
+            language: Langue forcée (optionnel)
+            fallbacks: Textes par défaut par clé (optionnel)
+            
+        Returns:
+            Dict {clé: texte traduit}
+        """
+        catalog = self.catalog(guild_id, language)
+        fallbacks = fallbacks or {}
+        
+        return {key: catalog.get(key, fallbacks.get(key)) for key in keys}
+    
     def _get_guild_language(self, guild_id: int) -> Optional[str]:
         """
         Obtenir la langue configurée pour un serveur
@@ -115,18 +234,47 @@ class TranslationManager:
         """
         if not guild_id:
             return None
+        
+        guild_id = int(guild_id)
+        now = time.monotonic()
+        cached = self._guild_languages.get(guild_id)
+        if cached is not None and cached[1] > now:
+            return cached[0]
             
         try:
             # Import dynamique pour éviter les dépendances circulaires
             from services.guild_service import guild_service
             
+            if not self._guild_listener_registered:
+                guild_service.add_update_listener(self._on_guild_config_updated)
+                self._guild_listener_registered = True
+            
             config = guild_service.get_guild_config(guild_id)
-            return config.get('language', self.default_language)
+            language = config.get('language', self.default_language)
+            self._guild_languages[guild_id] = (language, now + self.language_cache_ttl)
+            return language
             
         except Exception as e:
             logger.debug(f"Impossible de récupérer la langue pour guild {guild_id}: {e}")
             return None
     
+    def _on_guild_config_updated(self, guild_id: int, updates: Optional[Dict[str, Any]]):
+        """Invalider la langue en cache quand la configuration d'un serveur change"""
+        if updates is None or 'language' in updates:
+            self._guild_languages.pop(guild_id, None)
+    
+    def invalidate_guild_language(self, guild_id: int = None):
+        """
+        Invalider la langue en cache
+        
+        Args:
+            guild_id: ID du serveur (tous si None)
+        """
+        if guild_id is None:
+            self._guild_languages.clear()
+        else:
+            self._guild_languages.pop(int(guild_id), None)
+    
     def get_available_languages(self) -> Dict[str, str]:
         """
         Obtenir la liste des langues disponibles
@@ -155,12 +303,17 @@ class TranslationManager:
             self.translations[language] = {}
             
         self.translations[language][key] = value
+        if language not in self.available_languages:
+            self.available_languages.append(language)
+        self._compile_catalogs()
         logger.debug(f"Traduction ajoutée: {language}.{key}")
     
     def reload_translations(self):
         """Recharger toutes les traductions"""
         self.translations.clear()
         self.available_languages.clear()
+        self._catalogs.clear()
+        self._reported_keys.clear()
         self._load_all_translations()
         logger.info("Traductions rechargées")
     
@@ -169,7 +322,8 @@ class TranslationManager:
         stats = {
             'languages': len(self.available_languages),
             'total_keys': sum(len(translations) for translations in self.translations.values()),
-            'languages_loaded': list(self.available_languages)
+            'languages_loaded': list(self.available_languages),
+            'cached_guild_languages': len(self._guild_languages)
         }
         
         for lang in self.available_languages:
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark du rate limiter en mémoire
+
+Mesure le coût d'une vérification et la mémoire occupée par utilisateur suivi.
+
+Usage:
+    python scripts/benchmarks/bench_rate_limiter.py [--keys 1000000] [--checks 200000]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.rate_limiter import RateLimiter, MemoryRateLimitBackend
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du rate limiter en mémoire")
+    parser.add_argument("--keys", type=int, default=1_000_000, help="Nombre d'utilisateurs suivis")
+    parser.add_argument("--checks", type=int, default=200_000, help="Vérifications mesurées")
+    parser.add_argument("--max-actions", type=int, default=3, help="Limite par utilisateur")
+    args = parser.parse_args()
+
+    limiter = RateLimiter(max_actions=args.max_actions, time_window=3600, backend=MemoryRateLimitBackend())
+    guild_id = 123456789012345678
+    base_user = 100000000000000000
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(args.keys):
+        limiter.check_rate_limit(base_user + i, guild_id)
+    fill_seconds = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Vérifications sur des clés existantes (chemin chaud)
+    step = max(1, args.keys // args.checks)
+    start = time.perf_counter()
+    for i in range(args.checks):
+        limiter.check_rate_limit(base_user + (i * step) % args.keys, guild_id)
+    check_seconds = time.perf_counter() - start
+
+    stats = limiter.get_stats()
+    print(f"[OK] Clés suivies: {stats['active_users']:,}")
+    print(f"[OK] Remplissage (sous tracemalloc): {fill_seconds:.2f}s ({fill_seconds / args.keys * 1e6:.2f} µs/clé)")
+    print(f"[OK] Vérification: {check_seconds / args.checks * 1e6:.2f} µs/appel")
+    print(f"[OK] Mémoire: {current / 1024 / 1024:.1f} Mo ({current / args.keys:.0f} octets/utilisateur)")
+
+
+if __name__ == "__main__":
+    main()
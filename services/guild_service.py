@@ -3,7 +3,8 @@ Service de gestion des configurations de serveurs (guildes)
 """
 import json
 import os
-from typing import Dict, Any, Optional, List
+import time
+from typing import Dict, Any, Optional, List, Tuple, Callable
 from pathlib import Path
 
 from config.logging_config import get_logger
@@ -14,10 +15,23 @@ logger = get_logger('guild_service')
 class GuildService:
     """Service pour la gestion des configurations de serveurs"""
     
-    def __init__(self, config_dir: str = "guild_configs"):
+    def __init__(self, config_dir: str = "guild_configs", revalidate_interval: float = 5.0):
         self.config_dir = Path(config_dir)
         self.old_config_file = "guild_configs.json"
         
+        # Cache des configurations parsées
+        # Structure: {guild_id: (config, mtime_ns du fichier, dernière vérification monotonic)}
+        self._cache: Dict[str, Tuple[Dict[str, Any], int, float]] = {}
+        # Intervalle minimum entre deux vérifications du mtime (modifications externes)
+        self.revalidate_interval = revalidate_interval
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_invalidations = 0
+        
+        # Callbacks notifiés à chaque changement de configuration
+        # Signature: callback(guild_id, updates) - updates=None si tout peut avoir changé
+        self._update_listeners: List[Callable[[int, Optional[Dict[str, Any]]], None]] = []
+        
         # Créer le dossier s'il n'existe pas
         self.config_dir.mkdir(exist_ok=True)
         
@@ -63,14 +77,105 @@ class GuildService:
         return None
     
     def _save_guild_config(self, guild_id: str, config: Dict[str, Any]):
-        """Sauvegarde la configuration d'un serveur"""
+        """Sauvegarde la configuration d'un serveur (write-through vers le cache)"""
         config_path = self._get_config_path(guild_id)
         
         try:
             with open(config_path, 'w', encoding='utf-8') as f:
                 json.dump(config, f, indent=2, ensure_ascii=False)
+            self._cache[guild_id] = (config, config_path.stat().st_mtime_ns, time.monotonic())
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde de la config {guild_id}: {e}")
+            self._cache.pop(guild_id, None)
+    
+    def _get_cached_config(self, guild_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtenir la configuration depuis le cache, en rechargeant le fichier
+        s'il a été modifié depuis l'extérieur
+        
+        Args:
+            guild_id: ID du serveur (chaîne)
+            
+        Returns:
+            Configuration ou None si aucun fichier n'existe
+        """
+        now = time.monotonic()
+        entry = self._cache.get(guild_id)
+        
+        if entry is not None:
+            config, mtime_ns, checked_at = entry
+            if now - checked_at < self.revalidate_interval:
+                self.cache_hits += 1
+                return config
+            
+            # Revalidation périodique via le mtime du fichier
+            try:
+                current_mtime = self._get_config_path(guild_id).stat().st_mtime_ns
+            except FileNotFoundError:
+                current_mtime = None
+            
+            if current_mtime == mtime_ns:
+                self._cache[guild_id] = (config, mtime_ns, now)
+                self.cache_hits += 1
+                return config
+            
+            # Fichier modifié ou supprimé à l'extérieur
+            self.cache_invalidations += 1
+            del self._cache[guild_id]
+            self._notify_listeners(guild_id, None)
+        
+        self.cache_misses += 1
+        config_path = self._get_config_path(guild_id)
+        try:
+            mtime_ns = config_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        
+        config = self._load_guild_config(guild_id)
+        if config is not None:
+            self._cache[guild_id] = (config, mtime_ns, now)
+        return config
+    
+    def invalidate_cache(self, guild_id: Optional[int] = None):
+        """
+        Vider le cache des configurations
+        
+        Args:
+            guild_id: ID du serveur à invalider (tous si None)
+        """
+        if guild_id is None:
+            guild_ids = list(self._cache.keys())
+            self._cache.clear()
+        else:
+            guild_ids = [str(guild_id)]
+            self._cache.pop(str(guild_id), None)
+        
+        for guild_str in guild_ids:
+            self._notify_listeners(guild_str, None)
+    
+    def add_update_listener(self, callback: Callable[[int, Optional[Dict[str, Any]]], None]):
+        """
+        Enregistrer un callback appelé quand la configuration d'un serveur change
+        
+        Args:
+            callback: Fonction (guild_id, updates) - updates vaut None si la
+                      configuration entière doit être considérée comme modifiée
+        """
+        if callback not in self._update_listeners:
+            self._update_listeners.append(callback)
+    
+    def _notify_listeners(self, guild_id: str, updates: Optional[Dict[str, Any]]):
+        """Notifier les callbacks d'un changement de configuration"""
+        try:
+            guild_int = int(guild_id)
+        except (TypeError, ValueError):
+            return
+        
+        for callback in self._update_listeners:
+            try:
+                callback(guild_int, updates)
+            except Exception as e:
+                logger.error(f"Erreur dans un listener de configuration: {e}")
     
     def get_guild_config(self, guild_id: int) -> Dict[str, Any]:
         """
@@ -80,10 +185,12 @@ class GuildService:
             guild_id: ID du serveur Discord
             
         Returns:
-            Configuration du serveur (ou configuration par défaut)
+            Configuration du serveur (ou configuration par défaut).
+            L'objet retourné est partagé avec le cache: toute modification
+            doit passer par update_guild_config.
         """
         guild_str = str(guild_id)
-        config = self._load_guild_config(guild_str)
+        config = self._get_cached_config(guild_str)
         
         if config is None:
             # Créer la config par défaut
@@ -105,6 +212,7 @@ class GuildService:
         config = self.get_guild_config(guild_id)  # Charge ou crée la config
         config.update(updates)
         self._save_guild_config(guild_str, config)
+        self._notify_listeners(guild_str, updates)
         logger.info(f"Configuration mise à jour pour guild {guild_id}: {list(updates.keys())}")
     
     def list_configured_guilds(self) -> List[str]:
@@ -216,6 +324,34 @@ class GuildService:
         config = self.get_guild_config(guild_id)
         return config.get('language', 'fr')
     
+    def get_rate_limits(self, guild_id: int) -> Dict[str, int]:
+        """
+        Obtenir les limites de signalements d'un serveur
+        
+        Args:
+            guild_id: ID du serveur Discord
+            
+        Returns:
+            Dictionnaire rate_limits complété par les valeurs par défaut
+        """
+        limits = dict(self.get_default_config()['rate_limits'])
+        limits.update(self.get_guild_config(guild_id).get('rate_limits', {}))
+        return limits
+    
+    def get_validation_thresholds(self, guild_id: int) -> Dict[str, int]:
+        """
+        Obtenir les seuils de validation (quorum) d'un serveur
+        
+        Args:
+            guild_id: ID du serveur Discord
+            
+        Returns:
+            Dictionnaire validation_thresholds complété par les valeurs par défaut
+        """
+        thresholds = dict(self.get_default_config()['validation_thresholds'])
+        thresholds.update(self.get_guild_config(guild_id).get('validation_thresholds', {}))
+        return thresholds
+    
     def set_guild_language(self, guild_id: int, language: str):
         """
         Définir la langue pour un serveur
@@ -241,6 +377,9 @@ class GuildService:
         guild_str = str(guild_id)
         config_path = self._get_config_path(guild_str)
         
+        self._cache.pop(guild_str, None)
+        self._notify_listeners(guild_str, None)
+        
         try:
             if config_path.exists():
                 config_path.unlink()
@@ -263,7 +402,7 @@ class GuildService:
         
         # Compter les guildes réellement configurées
         for guild_id in configured_guilds:
-            config = self._load_guild_config(guild_id)
+            config = self._get_cached_config(guild_id)
             if config and config.get('configured', False):
                 configured_count += 1
         
@@ -271,7 +410,11 @@ class GuildService:
             'total_configs': len(configured_guilds),
             'configured_guilds': configured_count,
             'unconfigured_guilds': len(configured_guilds) - configured_count,
-            'config_directory': str(self.config_dir)
+            'config_directory': str(self.config_dir),
+            'cache_size': len(self._cache),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'cache_invalidations': self.cache_invalidations
         }
 
 
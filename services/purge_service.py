@@ -0,0 +1,298 @@
+"""
+Service de purge des threads du forum d'alertes
+
+Parcourt tous les threads archivés page par page, supprime les threads trop
+anciens avec une concurrence bornée et purge les signalements correspondants
+(stockage local et Supabase). L'avancement est enregistré dans le fichier
+SQLite local: une purge interrompue reprend là où elle s'était arrêtée.
+"""
+import asyncio
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+
+import discord
+
+from config.logging_config import get_logger
+
+logger = get_logger('purge_service')
+
+# Tentatives de suppression d'un thread en cas de 429 non absorbé par discord.py
+MAX_DELETE_ATTEMPTS = 3
+
+
+class PurgeAlreadyRunning(Exception):
+    """Une purge est déjà en cours sur ce serveur"""
+
+
+@dataclass
+class PurgeJob:
+    """Avancement d'une purge (un seul travail par serveur)"""
+    
+    guild_id: int
+    forum_id: int
+    cutoff: str  # ISO, threads créés avant cette date
+    days: int
+    phase: str = "active"  # active, archived, done
+    cursor: Optional[str] = None  # archive_timestamp ISO du dernier thread archivé traité
+    scanned: int = 0
+    active_scanned: bool = False  # threads actifs déjà comptés dans scanned (reprise)
+    active_deleted: int = 0
+    archived_deleted: int = 0
+    failed: int = 0
+    reports_purged: int = 0
+    resumed: bool = False
+    
+    @property
+    def deleted(self) -> int:
+        return self.active_deleted + self.archived_deleted
+    
+    @property
+    def is_done(self) -> bool:
+        return self.phase == "done"
+
+
+class ThreadPurgeEngine:
+    """Moteur de purge concurrente et reprenable des threads d'un forum"""
+    
+    def __init__(self, db_path: str, report_service=None, concurrency: int = 4, batch_size: int = 50):
+        """
+        Args:
+            db_path: Fichier SQLite local (avancement des purges)
+            report_service: ReportService dont les signalements liés aux threads supprimés sont purgés
+            concurrency: Nombre maximum de suppressions simultanées
+            batch_size: Nombre de threads supprimés entre deux sauvegardes de l'avancement
+        """
+        self.db_path = Path(db_path)
+        self.report_service = report_service
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        
+        self._connection: Optional[sqlite3.Connection] = None
+        # Un seul thread: sqlite3 n'accepte qu'un écrivain à la fois
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="purge_jobs")
+        self._running: set = set()
+    
+    async def _run_sync(self, func, *args):
+        """Exécuter une opération SQLite hors de la boucle d'événements"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS purge_jobs (
+                    guild_id INTEGER PRIMARY KEY,
+                    data TEXT NOT NULL
+                )
+                """
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+    
+    def _load_sync(self) -> List[PurgeJob]:
+        connection = self._connect()
+        jobs = []
+        for (data,) in connection.execute("SELECT data FROM purge_jobs"):
+            try:
+                jobs.append(PurgeJob(**json.loads(data)))
+            except Exception as e:
+                logger.warning(f"Purge persistée illisible ignorée: {e}")
+        return jobs
+    
+    def _save_sync(self, job: PurgeJob):
+        connection = self._connect()
+        if job.is_done:
+            connection.execute("DELETE FROM purge_jobs WHERE guild_id = ?", (job.guild_id,))
+        else:
+            connection.execute(
+                "INSERT OR REPLACE INTO purge_jobs (guild_id, data) VALUES (?, ?)",
+                (job.guild_id, json.dumps(asdict(job)))
+            )
+        connection.commit()
+    
+    async def open(self) -> List[PurgeJob]:
+        """
+        Initialiser le stockage et lister les purges interrompues (au démarrage)
+        
+        Returns:
+            Purges à reprendre
+        """
+        try:
+            jobs = await self._run_sync(self._load_sync)
+        except Exception as e:
+            logger.error(f"❌ Erreur ouverture des purges persistées {self.db_path}: {e}")
+            return []
+        
+        if jobs:
+            logger.info(f"🧹 {len(jobs)} purge(s) interrompue(s), reprise au prochain /purge")
+        return jobs
+    
+    async def get_job(self, guild_id: int) -> Optional[PurgeJob]:
+        """Purge en cours (ou interrompue) d'un serveur"""
+        for job in await self._run_sync(self._load_sync):
+            if job.guild_id == guild_id:
+                return job
+        return None
+    
+    async def start(self, guild_id: int, forum_id: int, cutoff: datetime, days: int) -> PurgeJob:
+        """
+        Créer une purge, ou reprendre la purge interrompue du même forum
+        
+        Args:
+            guild_id: ID du serveur
+            forum_id: ID du forum d'alertes
+            cutoff: Les threads créés avant cette date sont supprimés
+            days: Critère d'âge affiché
+        """
+        job = await self.get_job(guild_id)
+        if job and job.forum_id == forum_id:
+            job.resumed = True
+            return job
+        
+        job = PurgeJob(guild_id=guild_id, forum_id=forum_id, cutoff=cutoff.isoformat(), days=days)
+        await self._run_sync(self._save_sync, job)
+        return job
+    
+    async def run(self, forum, job: PurgeJob,
+                  on_progress: Optional[Callable[[PurgeJob], Awaitable[None]]] = None) -> PurgeJob:
+        """
+        Exécuter (ou reprendre) une purge jusqu'au bout
+        
+        Args:
+            forum: Forum d'alertes Discord
+            job: Purge retournée par start()
+            on_progress: Coroutine appelée après chaque lot supprimé
+            
+        Raises:
+            PurgeAlreadyRunning: Si une purge est déjà en cours sur ce serveur
+        """
+        if job.guild_id in self._running:
+            raise PurgeAlreadyRunning(f"Une purge est déjà en cours sur le serveur {job.guild_id}")
+        
+        self._running.add(job.guild_id)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        cutoff = datetime.fromisoformat(job.cutoff)
+        
+        async def _checkpoint():
+            await self._run_sync(self._save_sync, job)
+            if on_progress:
+                try:
+                    await on_progress(job)
+                except Exception as e:
+                    logger.debug(f"Affichage de l'avancement de la purge impossible: {e}")
+        
+        try:
+            if job.phase == "active":
+                threads = [thread for thread in forum.threads if thread.created_at and thread.created_at < cutoff]
+                if not job.active_scanned:
+                    # À la reprise, les threads restants ont déjà été comptés
+                    job.scanned += len(threads)
+                    job.active_scanned = True
+                for start in range(0, len(threads), self.batch_size):
+                    batch = threads[start:start + self.batch_size]
+                    deleted = await self._delete_batch(batch, semaphore)
+                    job.active_deleted += len(deleted)
+                    job.failed += len(batch) - len(deleted)
+                    await self._purge_reports(job, deleted)
+                    await _checkpoint()
+                job.phase = "archived"
+                await _checkpoint()
+            
+            if job.phase == "archived":
+                before = datetime.fromisoformat(job.cursor) if job.cursor else None
+                batch = []
+                # limit=None: toutes les pages, discord.py pagine par archive_timestamp
+                async for thread in forum.archived_threads(limit=None, before=before):
+                    job.scanned += 1
+                    if thread.created_at and thread.created_at < cutoff:
+                        batch.append(thread)
+                    if len(batch) >= self.batch_size:
+                        await self._flush_archived(job, batch, semaphore)
+                        job.cursor = thread.archive_timestamp.isoformat()
+                        batch = []
+                        await _checkpoint()
+                if batch:
+                    await self._flush_archived(job, batch, semaphore)
+                job.phase = "done"
+                await _checkpoint()
+            
+            logger.info(
+                f"🧹 Purge terminée sur guild {job.guild_id}: {job.deleted} thread(s) supprimé(s), "
+                f"{job.failed} échec(s), {job.reports_purged} signalement(s) purgé(s)"
+            )
+            return job
+        finally:
+            self._running.discard(job.guild_id)
+    
+    async def _flush_archived(self, job: PurgeJob, batch: list, semaphore: asyncio.Semaphore):
+        deleted = await self._delete_batch(batch, semaphore)
+        job.archived_deleted += len(deleted)
+        job.failed += len(batch) - len(deleted)
+        await self._purge_reports(job, deleted)
+    
+    async def _delete_batch(self, threads: list, semaphore: asyncio.Semaphore) -> list:
+        """
+        Supprimer un lot de threads avec une concurrence bornée
+        
+        Returns:
+            Threads effectivement supprimés
+        """
+        results = await asyncio.gather(*(self._delete_thread(thread, semaphore) for thread in threads))
+        return [thread for thread, ok in zip(threads, results) if ok]
+    
+    async def _delete_thread(self, thread, semaphore: asyncio.Semaphore) -> bool:
+        """
+        Supprimer un thread
+        
+        discord.py respecte déjà les buckets de rate limit (en-têtes X-RateLimit-*);
+        un 429 qui remonte malgré tout est réessayé après le délai indiqué.
+        """
+        async with semaphore:
+            for attempt in range(MAX_DELETE_ATTEMPTS):
+                try:
+                    await thread.delete()
+                    return True
+                except discord.NotFound:
+                    # Déjà supprimé (purge reprise après une coupure)
+                    return True
+                except discord.HTTPException as e:
+                    if e.status == 429 and attempt + 1 < MAX_DELETE_ATTEMPTS:
+                        await asyncio.sleep(getattr(e, 'retry_after', None) or 1.0 * (attempt + 1))
+                        continue
+                    logger.debug(f"Erreur suppression thread {thread.id}: {e}")
+                    return False
+                except Exception as e:
+                    logger.debug(f"Erreur suppression thread {thread.id}: {e}")
+                    return False
+            return False
+    
+    async def _purge_reports(self, job: PurgeJob, threads: list):
+        """Purger les signalements liés aux threads supprimés (local et Supabase)"""
+        if not self.report_service or not threads:
+            return
+        
+        try:
+            job.reports_purged += await self.report_service.purge_thread_reports(thread.id for thread in threads)
+        except Exception as e:
+            logger.error(f"Erreur purge des signalements liés aux threads: {e}")
+    
+    async def close(self):
+        """Libérer le stockage local"""
+        def _close():
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+        
+        await self._run_sync(_close)
+        self._executor.shutdown(wait=True)
@@ -1,31 +1,228 @@
 """
 Service de gestion des signalements
 """
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Set, Iterable, Callable, Awaitable, Tuple
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+import asyncio
+import heapq
 import uuid
 
 from config.logging_config import get_logger
-from config.bot_config import ERROR_MESSAGES
+from config.bot_config import ERROR_MESSAGES, bot_settings
 from utils.security import SecurityValidator
 from utils.rate_limiter import RateLimiter
 from utils.anonymous_hasher import anonymous_hasher
+from utils.uniqueness_cache import UniquenessCache
 from database.models.report import Report
+from database.report_store import ReportStore
+from database.stats_rollup import StatsRollup, STATUS_METRICS
 
 logger = get_logger('report_service')
 
+# Seuils utilisés si aucun résolveur de configuration n'est fourni
+DEFAULT_VALIDATION_THRESHOLDS = {
+    "quorum_percentage": 80,
+    "min_validators": 2,
+    "validation_timeout_hours": 24
+}
+
+# Décisions possibles d'un validateur
+VOTE_DECISIONS = ("validated", "rejected")
+
+
+@dataclass
+class VoteOutcome:
+    """Résultat d'un vote de validateur"""
+    
+    report_id: str
+    status: str  # statut du signalement après le vote
+    approvals: int
+    rejections: int
+    required: int  # nombre minimum de votes (min_validators)
+    changed: bool  # le vote a modifié le décompte (False: vote identique déjà enregistré)
+    decided: bool  # ce vote a atteint le quorum et clos le signalement
+
 
 class ReportService:
     """Service principal pour la gestion des signalements"""
     
-    def __init__(self, db_client=None, validator: SecurityValidator = None, rate_limiter: RateLimiter = None):
+    def __init__(self, db_client=None, validator: SecurityValidator = None, rate_limiter: RateLimiter = None,
+                 store: Optional[ReportStore] = None, rollup: Optional[StatsRollup] = None,
+                 thresholds_resolver: Optional[Callable[[int], Dict[str, int]]] = None,
+                 vote_edit_delay: float = 2.0):
         self.db = db_client
         self.validator = validator or SecurityValidator()
         self.rate_limiter = rate_limiter or RateLimiter()
         self.active_reports: Dict[str, Report] = {}
         
-        # Cache des hash d'unicité pour détection de doublons rapide
-        self.uniqueness_cache: Dict[str, str] = {}  # {uniqueness_hash: report_id}
+        # Stockage persistant (None = signalements en mémoire uniquement)
+        self.store = store
+        
+        # Compteurs journaliers (/stats)
+        self.rollup = rollup
+        
+        # Cache borné des vérifications de doublons (positives et négatives)
+        self.uniqueness_cache = UniquenessCache(
+            max_size=bot_settings.duplicate_cache_size,
+            ttl=bot_settings.duplicate_cache_ttl,
+            negative_ttl=bot_settings.duplicate_negative_ttl
+        )
+        
+        # Index secondaires (évitent de parcourir active_reports)
+        self._by_guild_status: Dict[int, Dict[str, Set[str]]] = {}  # {guild_id: {status: {report_id}}}
+        self._by_target_id: Dict[int, Set[str]] = {}
+        self._by_target_name: Dict[str, Set[str]] = {}  # clé: nom normalisé
+        self._by_reporter: Dict[int, Set[str]] = {}
+        self._by_uniqueness: Dict[str, str] = {}  # {uniqueness_hash: report_id}
+        self._by_thread: Dict[int, str] = {}  # {thread_id: report_id}
+        
+        # Votes des validateurs: seuils par serveur (config en cache) et échéances d'auto-rejet
+        self.thresholds_resolver = thresholds_resolver
+        self.vote_edit_delay = vote_edit_delay
+        self._vote_deadlines: List[Tuple[datetime, str]] = []  # tas (échéance, report_id)
+        self._vote_timeouts: Dict[int, float] = {}  # {guild_id: délai (heures) des échéances du tas}
+        self._vote_refreshers: Dict[str, Callable[[Report], Awaitable[Any]]] = {}
+        self._vote_refresh_tasks: Dict[str, asyncio.Task] = {}
+        self.votes_recorded = 0
+        self.vote_edits = 0
+        self.auto_rejected = 0
+    
+    @staticmethod
+    def _normalize_username(username: Optional[str]) -> str:
+        """Normaliser un nom d'utilisateur pour les recherches"""
+        return (username or "").strip().lower()
+    
+    @staticmethod
+    def _index_add(index: Dict, key, report_id: str):
+        index.setdefault(key, set()).add(report_id)
+    
+    @staticmethod
+    def _index_discard(index: Dict, key, report_id: str):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(report_id)
+            if not ids:
+                del index[key]
+    
+    def _add_to_indexes(self, report: Report):
+        """Ajouter un signalement à active_reports et aux index secondaires"""
+        previous = self.active_reports.get(report.id)
+        if previous is not None:
+            self._remove_from_indexes(previous)
+        
+        self.active_reports[report.id] = report
+        self._index_add(self._by_guild_status.setdefault(report.guild_id, {}), report.status, report.id)
+        if report.target_user_id:
+            self._index_add(self._by_target_id, report.target_user_id, report.id)
+        self._index_add(self._by_target_name, self._normalize_username(report.target_username), report.id)
+        if report.reporter_id:
+            self._index_add(self._by_reporter, report.reporter_id, report.id)
+        if report.uniqueness_hash:
+            self._by_uniqueness[report.uniqueness_hash] = report.id
+        if report.thread_id:
+            self._by_thread[report.thread_id] = report.id
+    
+    def _remove_from_indexes(self, report: Report):
+        """Retirer un signalement de active_reports et des index secondaires"""
+        self.active_reports.pop(report.id, None)
+        statuses = self._by_guild_status.get(report.guild_id)
+        if statuses is not None:
+            self._index_discard(statuses, report.status, report.id)
+            if not statuses:
+                del self._by_guild_status[report.guild_id]
+        if report.target_user_id:
+            self._index_discard(self._by_target_id, report.target_user_id, report.id)
+        self._index_discard(self._by_target_name, self._normalize_username(report.target_username), report.id)
+        if report.reporter_id:
+            self._index_discard(self._by_reporter, report.reporter_id, report.id)
+        if report.uniqueness_hash and self._by_uniqueness.get(report.uniqueness_hash) == report.id:
+            del self._by_uniqueness[report.uniqueness_hash]
+        if report.thread_id and self._by_thread.get(report.thread_id) == report.id:
+            del self._by_thread[report.thread_id]
+    
+    def _set_status(self, report: Report, status: str):
+        """Changer le statut d'un signalement en gardant l'index guild/statut cohérent"""
+        statuses = self._by_guild_status.setdefault(report.guild_id, {})
+        self._index_discard(statuses, report.status, report.id)
+        report.status = status
+        self._index_add(statuses, status, report.id)
+    
+    def _reports_from_ids(self, report_ids: Iterable[str]) -> List[Report]:
+        """Convertir des IDs en signalements triés du plus récent au plus ancien"""
+        reports = [self.active_reports[report_id] for report_id in report_ids if report_id in self.active_reports]
+        return sorted(reports, key=lambda r: r.created_at, reverse=True)
+    
+    async def warm_start(self) -> int:
+        """
+        Recharger les signalements persistés (au démarrage du bot)
+        
+        Returns:
+            Nombre de signalements restaurés
+        """
+        if not self.store:
+            return 0
+        
+        try:
+            reports = await self.store.load_reports()
+        except Exception as e:
+            logger.error(f"❌ Erreur lors du chargement des signalements persistés: {e}")
+            return 0
+        
+        for report in reports:
+            self._add_to_indexes(report)
+            if report.is_pending:
+                self._track_vote_deadline(report)
+        
+        pending_count = sum(1 for report in reports if report.is_pending)
+        logger.info(f"♻️ {len(reports)} signalement(s) restauré(s) ({pending_count} en attente)")
+        return len(reports)
+    
+    async def seed_duplicate_filter(self) -> int:
+        """
+        Construire le filtre de Bloom des doublons depuis la base (au démarrage)
+        
+        Returns:
+            Nombre de hash chargés depuis la base
+        """
+        if not bot_settings.duplicate_bloom_enabled:
+            return 0
+        if not (self.db and getattr(self.db, 'is_connected', False) and hasattr(self.db, 'load_uniqueness_hashes')):
+            return 0
+        
+        try:
+            hashes = await self.db.load_uniqueness_hashes()
+        except Exception as e:
+            # Sans filtre, chaque signalement inconnu reste vérifié en base
+            logger.warning(f"Filtre de doublons non initialisé: {e}")
+            return 0
+        
+        count = self.uniqueness_cache.seed_bloom(list(hashes) + list(self._by_uniqueness))
+        logger.info(f"🧮 Filtre de doublons initialisé avec {count} hash")
+        return count
+    
+    async def _persist(self, report: Report):
+        """Sauvegarder un signalement dans le stockage persistant"""
+        if not self.store:
+            return
+        
+        try:
+            await self.store.save_report(report)
+        except Exception as e:
+            logger.error(f"Erreur persistance du signalement {report.id}: {e}")
+    
+    async def close(self):
+        """Fermer le stockage persistant"""
+        for task in list(self._vote_refresh_tasks.values()):
+            task.cancel()
+        self._vote_refresh_tasks.clear()
+        self._vote_refreshers.clear()
+        
+        if self.store:
+            try:
+                await self.store.close()
+            except Exception as e:
+                logger.error(f"Erreur fermeture du stockage des signalements: {e}")
         
     async def create_report(self, 
                           user_id: int, 
@@ -58,7 +255,7 @@ class ReportService:
                 return None
             
             # 2. Vérifier le rate limiting
-            if not self.rate_limiter.check_rate_limit(user_id, guild_id):
+            if not await self.rate_limiter.check_rate_limit_async(user_id, guild_id):
                 logger.warning(f"Rate limit dépassé pour user {user_id} sur guild {guild_id}")
                 return None
             
@@ -100,14 +297,17 @@ class ReportService:
                 uniqueness_hash=uniqueness_hash
             )
             
-            # 7. Sauvegarder localement
-            self.active_reports[report.id] = report
-            self.uniqueness_cache[uniqueness_hash] = report.id
+            # 7. Indexer localement
+            self._add_to_indexes(report)
+            self._track_vote_deadline(report)
+            self.uniqueness_cache.put(uniqueness_hash, report.id)
+            if self.rollup:
+                self.rollup.record(guild_id, "reports_created", category)
             
             # 8. Enregistrer dans la DB (SANS l'ID du reporter)
             if self.db and hasattr(self.db, 'add_report'):
                 # Utiliser la nouvelle méthode add_report
-                await self.db.add_report(
+                db_result = await self.db.add_report(
                     target_user_id=target_user_id,
                     target_username=target_username,
                     reason=reason,
@@ -117,6 +317,12 @@ class ReportService:
                     reporter_hash=reporter_hash,
                     uniqueness_hash=uniqueness_hash
                 )
+                # L'ID Supabase diffère de l'ID local: conservé pour la validation
+                if isinstance(db_result, dict) and db_result.get("report_id"):
+                    report.metadata["db_report_id"] = db_result["report_id"]
+            
+            # 9. Sauvegarder localement (avec l'ID Supabase)
+            await self._persist(report)
             
             logger.info(f"✅ Signalement anonyme créé: {report.id} dans guild {guild_id}")
             logger.debug(f"Hash reporter: {reporter_hash[:8]}... Hash unicité: {uniqueness_hash[:8]}...")
@@ -130,6 +336,11 @@ class ReportService:
         """Récupérer un signalement par ID"""
         return self.active_reports.get(report_id)
     
+    def get_report_by_thread(self, thread_id: int) -> Optional[Report]:
+        """Signalement associé à un thread du forum d'alertes"""
+        report_id = self._by_thread.get(thread_id)
+        return self.active_reports.get(report_id) if report_id else None
+    
     async def update_report_status(self, report_id: str, status: str, validator_id: int = None) -> bool:
         """
         Mettre à jour le statut d'un signalement
@@ -146,12 +357,17 @@ class ReportService:
             report = self.active_reports.get(report_id)
             if not report:
                 return False
-                
-            report.status = status
+            
+            previous_status = report.status
+            self._set_status(report, status)
             if validator_id:
                 report.validated_by = validator_id
                 report.validated_at = datetime.utcnow()
             
+            await self._persist(report)
+            if self.rollup and status != previous_status and status in STATUS_METRICS:
+                self.rollup.record(report.guild_id, STATUS_METRICS[status], report.category)
+            
             # Mettre à jour en DB
             if self.db and hasattr(self.db, 'update_report'):
                 await self.db.update_report(report)
@@ -163,6 +379,225 @@ class ReportService:
             logger.error(f"Erreur lors de la mise à jour du signalement {report_id}: {e}")
             return False
     
+    async def set_report_thread(self, report_id: str, thread_id: int) -> bool:
+        """
+        Associer le thread du forum à un signalement
+        
+        Args:
+            report_id: ID du signalement
+            thread_id: ID du thread Discord
+            
+        Returns:
+            True si succès
+        """
+        report = self.active_reports.get(report_id)
+        if not report:
+            return False
+        
+        report.thread_id = thread_id
+        self._by_thread[thread_id] = report.id
+        await self._persist(report)
+        return True
+    
+    def get_validation_thresholds(self, guild_id: int) -> Dict[str, int]:
+        """Seuils de validation d'un serveur (configuration en cache, valeurs par défaut sinon)"""
+        thresholds = dict(DEFAULT_VALIDATION_THRESHOLDS)
+        if self.thresholds_resolver:
+            try:
+                thresholds.update(self.thresholds_resolver(guild_id))
+            except Exception as e:
+                logger.warning(f"Seuils de validation indisponibles pour guild {guild_id}: {e}")
+        return thresholds
+    
+    @staticmethod
+    def _quorum_status(approvals: int, rejections: int, thresholds: Dict[str, int]) -> str:
+        """
+        Statut résultant d'un décompte de votes
+        
+        Une décision est prise dès que min_validators votes sont exprimés et qu'un
+        camp réunit au moins quorum_percentage % des votes; sinon le signalement
+        reste en attente (auto-rejet à l'échéance).
+        """
+        total = approvals + rejections
+        if total == 0 or total < max(1, int(thresholds.get("min_validators", 1))):
+            return "pending"
+        quorum = int(thresholds.get("quorum_percentage", 100))
+        if approvals * 100 >= quorum * total:
+            return "validated"
+        if rejections * 100 >= quorum * total:
+            return "rejected"
+        return "pending"
+    
+    @staticmethod
+    def get_vote_counts(report: Report) -> Tuple[int, int]:
+        """Nombre de validations et de refus enregistrés pour un signalement"""
+        counts = report.metadata.get("vote_counts") or {}
+        return counts.get("validated", 0), counts.get("rejected", 0)
+    
+    async def record_vote(self, report_id: str, validator_id: int, decision: str) -> Optional[VoteOutcome]:
+        """
+        Enregistrer le vote d'un validateur et appliquer le quorum du serveur
+        
+        Idempotent: un même vote répété ne change rien; un validateur qui change
+        d'avis remplace son vote précédent. Le décompte est tenu à jour à chaque
+        vote (metadata['vote_counts']): l'évaluation du quorum ne parcourt pas les votes.
+        
+        Args:
+            report_id: ID du signalement
+            validator_id: ID Discord du validateur
+            decision: validated ou rejected
+            
+        Returns:
+            Résultat du vote, ou None si le signalement est introuvable
+        """
+        if decision not in VOTE_DECISIONS:
+            raise ValueError(f"Vote inconnu: {decision}")
+        
+        report = self.active_reports.get(report_id)
+        if not report:
+            return None
+        
+        thresholds = self.get_validation_thresholds(report.guild_id)
+        required = int(thresholds.get("min_validators", 1))
+        if not report.is_pending:
+            approvals, rejections = self.get_vote_counts(report)
+            return VoteOutcome(report_id, report.status, approvals, rejections, required, False, False)
+        
+        votes = report.metadata.setdefault("votes", {})  # clés str: metadata est sérialisé en JSON
+        counts = report.metadata.setdefault("vote_counts", {"validated": 0, "rejected": 0})
+        key = str(validator_id)
+        previous = votes.get(key)
+        changed = previous != decision
+        if changed:
+            if previous in counts:
+                counts[previous] -= 1
+            votes[key] = decision
+            counts[decision] = counts.get(decision, 0) + 1
+            self.votes_recorded += 1
+        
+        approvals, rejections = self.get_vote_counts(report)
+        status = self._quorum_status(approvals, rejections, thresholds)
+        if status != "pending":
+            # Le message est redessiné par l'appelant avec la décision finale
+            self._cancel_vote_refresh(report_id)
+            await self.update_report_status(report_id, status, validator_id=validator_id)
+            logger.info(f"Quorum atteint pour {report_id}: {status} ({approvals} pour, {rejections} contre)")
+            return VoteOutcome(report_id, status, approvals, rejections, required, changed, True)
+        
+        if changed:
+            await self._persist(report)
+        return VoteOutcome(report_id, "pending", approvals, rejections, required, changed, False)
+    
+    def schedule_vote_refresh(self, report_id: str, refresh: Callable[[Report], Awaitable[Any]]):
+        """
+        Redessiner le message d'un signalement après un vote, avec anti-rebond
+        
+        Les votes reçus pendant vote_edit_delay secondes ne produisent qu'une
+        seule modification du message (la dernière fonction fournie est utilisée).
+        
+        Args:
+            report_id: ID du signalement
+            refresh: Coroutine recevant le signalement à afficher
+        """
+        self._vote_refreshers[report_id] = refresh
+        if report_id not in self._vote_refresh_tasks:
+            self._vote_refresh_tasks[report_id] = asyncio.create_task(self._run_vote_refresh(report_id))
+    
+    async def _run_vote_refresh(self, report_id: str):
+        try:
+            await asyncio.sleep(self.vote_edit_delay)
+        finally:
+            self._vote_refresh_tasks.pop(report_id, None)
+            refresh = self._vote_refreshers.pop(report_id, None)
+        
+        report = self.active_reports.get(report_id)
+        if refresh is None or report is None or not report.is_pending:
+            return
+        try:
+            await refresh(report)
+            self.vote_edits += 1
+        except Exception as e:
+            logger.debug(f"Mise à jour du décompte des votes impossible pour {report_id}: {e}")
+    
+    def _cancel_vote_refresh(self, report_id: str):
+        task = self._vote_refresh_tasks.pop(report_id, None)
+        if task is not None:
+            task.cancel()
+        self._vote_refreshers.pop(report_id, None)
+    
+    def _track_vote_deadline(self, report: Report):
+        """Programmer l'auto-rejet d'un signalement en attente (tas unique, pas de minuteur par signalement)"""
+        hours = self.get_validation_thresholds(report.guild_id).get("validation_timeout_hours", 0)
+        self._vote_timeouts.setdefault(report.guild_id, hours or 0)
+        if hours and hours > 0:
+            heapq.heappush(self._vote_deadlines, (report.created_at + timedelta(hours=hours), report.id))
+    
+    def _reschedule_shortened_deadlines(self):
+        """
+        Avancer les échéances des serveurs dont le délai a été raccourci (ou activé)
+        
+        Le tas ne peut pas avancer une entrée: les signalements en attente du
+        serveur y sont ajoutés avec la nouvelle échéance, l'ancienne entrée est
+        ignorée à son retrait (signalement déjà rejeté). Un délai allongé est
+        géré au retrait de l'entrée.
+        """
+        for guild_id, statuses in self._by_guild_status.items():
+            pending = statuses.get("pending")
+            if not pending:
+                continue
+            hours = self.get_validation_thresholds(guild_id).get("validation_timeout_hours", 0) or 0
+            previous = self._vote_timeouts.get(guild_id, 0)
+            self._vote_timeouts[guild_id] = hours
+            if hours <= 0 or (0 < previous <= hours):
+                continue
+            
+            for report_id in pending:
+                report = self.active_reports.get(report_id)
+                if report is not None:
+                    heapq.heappush(self._vote_deadlines, (report.created_at + timedelta(hours=hours), report_id))
+    
+    async def expire_pending_votes(self, now: Optional[datetime] = None) -> List[Report]:
+        """
+        Rejeter les signalements restés sans consensus après validation_timeout_hours
+        
+        Seules les échéances dépassées sont retirées du tas; l'échéance est
+        recalculée avec la configuration actuelle du serveur avant le rejet.
+        Un délai raccourci depuis la création est pris en compte à l'appel suivant.
+        
+        Args:
+            now: Date de référence (par défaut maintenant)
+            
+        Returns:
+            Signalements rejetés automatiquement
+        """
+        now = now or datetime.utcnow()
+        self._reschedule_shortened_deadlines()
+        expired = []
+        while self._vote_deadlines and self._vote_deadlines[0][0] <= now:
+            _, report_id = heapq.heappop(self._vote_deadlines)
+            report = self.active_reports.get(report_id)
+            if not report or not report.is_pending:
+                continue
+            
+            hours = self.get_validation_thresholds(report.guild_id).get("validation_timeout_hours", 0)
+            if not hours or hours <= 0:
+                continue
+            deadline = report.created_at + timedelta(hours=hours)
+            if deadline > now:
+                # Délai allongé depuis la création: reprogrammer
+                heapq.heappush(self._vote_deadlines, (deadline, report_id))
+                continue
+            
+            self._cancel_vote_refresh(report_id)
+            report.metadata["auto_rejected"] = True
+            if await self.update_report_status(report_id, "rejected"):
+                self.auto_rejected += 1
+                expired.append(report)
+        
+        if expired:
+            logger.info(f"⌛ {len(expired)} signalement(s) rejeté(s) automatiquement (pas de consensus)")
+        return expired
+    
     async def get_guild_reports(self, guild_id: int, status: str = None) -> List[Report]:
         """
         Récupérer tous les signalements d'un serveur
@@ -174,12 +609,71 @@ class ReportService:
         Returns:
             Liste des signalements
         """
-        reports = [r for r in self.active_reports.values() if r.guild_id == guild_id]
+        statuses = self._by_guild_status.get(guild_id, {})
+        
+        if status:
+            return self._reports_from_ids(statuses.get(status, ()))
+        
+        return self._reports_from_ids(
+            report_id for report_ids in statuses.values() for report_id in report_ids
+        )
+    
+    def get_guild_status_counts(self, guild_id: int, since: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Compter les signalements d'un serveur par statut (index, sans accès Discord)
+        
+        Args:
+            guild_id: ID du serveur
+            since: Ne compter que les signalements créés depuis cette date (optionnel)
+            
+        Returns:
+            {statut: nombre}
+        """
+        counts = {}
+        for status, report_ids in self._by_guild_status.get(guild_id, {}).items():
+            if since is None:
+                count = len(report_ids)
+            else:
+                count = sum(1 for report_id in report_ids if self.active_reports[report_id].created_at >= since)
+            if count:
+                counts[status] = count
+        return counts
+    
+    def get_reports_for_target(self, target_user_id: Optional[int] = None,
+                               usernames: Iterable[str] = (), status: Optional[str] = None) -> List[Report]:
+        """
+        Récupérer les signalements visant un utilisateur (tous serveurs)
         
+        Args:
+            target_user_id: ID Discord de l'utilisateur signalé (optionnel)
+            usernames: Noms possibles de l'utilisateur (nom, pseudo...)
+            status: Filtrer par statut (optionnel)
+            
+        Returns:
+            Liste des signalements, du plus récent au plus ancien
+        """
+        report_ids: Set[str] = set()
+        if target_user_id:
+            report_ids |= self._by_target_id.get(target_user_id, set())
+        for username in usernames:
+            report_ids |= self._by_target_name.get(self._normalize_username(username), set())
+        
+        reports = self._reports_from_ids(report_ids)
         if status:
             reports = [r for r in reports if r.status == status]
+        return reports
+    
+    def get_reporter_reports(self, reporter_id: int) -> List[Report]:
+        """
+        Récupérer les signalements faits par un utilisateur (transfert des MP)
+        
+        Args:
+            reporter_id: ID Discord du rapporteur
             
-        return sorted(reports, key=lambda r: r.created_at, reverse=True)
+        Returns:
+            Liste des signalements, du plus récent au plus ancien
+        """
+        return self._reports_from_ids(self._by_reporter.get(reporter_id, ()))
     
     def _generate_report_id(self) -> str:
         """Générer un ID unique pour un signalement"""
@@ -209,12 +703,53 @@ class ReportService:
             if report.created_at < cutoff_date and report.status in ['validated', 'rejected']
         ]
         
-        for report_id in old_reports:
-            del self.active_reports[report_id]
-            
+        await self._forget_reports(old_reports)
+        
         if old_reports:
             logger.info(f"Nettoyage: {len(old_reports)} anciens signalements supprimés")
     
+    async def _forget_reports(self, report_ids: List[str]) -> List[Report]:
+        """Retirer des signalements des index, du cache de doublons et du stockage local"""
+        reports = [self.active_reports[report_id] for report_id in report_ids if report_id in self.active_reports]
+        for report in reports:
+            self._remove_from_indexes(report)
+            if report.uniqueness_hash:
+                self.uniqueness_cache.discard(report.uniqueness_hash)
+        
+        if reports and self.store:
+            try:
+                await self.store.delete_reports([report.id for report in reports])
+            except Exception as e:
+                logger.error(f"Erreur suppression des signalements persistés: {e}")
+        return reports
+    
+    async def purge_thread_reports(self, thread_ids: Iterable[int]) -> int:
+        """
+        Purger les signalements liés à des threads supprimés (/purge)
+        
+        Contrairement au nettoyage périodique, les lignes Supabase correspondantes
+        sont aussi supprimées.
+        
+        Args:
+            thread_ids: IDs des threads du forum supprimés
+            
+        Returns:
+            Nombre de signalements purgés localement
+        """
+        report_ids = [self._by_thread[thread_id] for thread_id in thread_ids if thread_id in self._by_thread]
+        reports = await self._forget_reports(report_ids)
+        
+        hashes = [report.uniqueness_hash for report in reports if report.uniqueness_hash]
+        if hashes and self.db and hasattr(self.db, 'delete_reports_by_hashes'):
+            try:
+                await self.db.delete_reports_by_hashes(hashes)
+            except Exception as e:
+                logger.error(f"Erreur suppression Supabase des signalements purgés: {e}")
+        
+        if reports:
+            logger.info(f"🧹 Purge: {len(reports)} signalement(s) supprimé(s)")
+        return len(reports)
+    
     async def _check_duplicate_report(self, uniqueness_hash: str) -> Optional[str]:
         """
         Vérifier si un signalement avec le même hash d'unicité existe déjà
@@ -225,21 +760,29 @@ class ReportService:
         Returns:
             ID du rapport existant ou None si pas de doublon
         """
-        # Vérifier dans le cache local
-        cached_report_id = self.uniqueness_cache.get(uniqueness_hash)
-        if cached_report_id and cached_report_id in self.active_reports:
+        # Signalements actifs (index local, toujours à jour)
+        active_report_id = self._by_uniqueness.get(uniqueness_hash)
+        if active_report_id:
+            return active_report_id
+        
+        # Résultats déjà connus (positifs, négatifs ou absents du filtre de Bloom)
+        found, cached_report_id = self.uniqueness_cache.lookup(uniqueness_hash)
+        if found:
             return cached_report_id
         
         # Vérifier dans la base de données si disponible
         if self.db and hasattr(self.db, 'check_duplicate_report'):
             try:
                 existing_report_id = await self.db.check_duplicate_report(uniqueness_hash)
-                if existing_report_id:
-                    # Mettre à jour le cache
-                    self.uniqueness_cache[uniqueness_hash] = existing_report_id
-                    return existing_report_id
             except Exception as e:
+                # Pas de mise en cache: la prochaine tentative interrogera à nouveau la base
                 logger.error(f"Erreur vérification doublon en DB: {e}")
+                return None
+            
+            if existing_report_id:
+                self.uniqueness_cache.put(uniqueness_hash, existing_report_id)
+                return existing_report_id
+            self.uniqueness_cache.put_negative(uniqueness_hash)
         
         return None
     
@@ -253,13 +796,23 @@ class ReportService:
         Returns:
             True si c'est un doublon
         """
-        return uniqueness_hash in self.uniqueness_cache
+        return uniqueness_hash in self._by_uniqueness or self.uniqueness_cache.contains_duplicate(uniqueness_hash)
+    
+    def get_vote_stats(self) -> Dict[str, int]:
+        """Statistiques des votes de validation"""
+        return {
+            'votes_recorded': self.votes_recorded,
+            'vote_edits': self.vote_edits,
+            'auto_rejected': self.auto_rejected,
+            'pending_deadlines': len(self._vote_deadlines)
+        }
     
     def get_anti_abuse_stats(self) -> Dict[str, Any]:
         """Statistiques du système anti-abus"""
         return {
             'total_reports': len(self.active_reports),
             'uniqueness_cache_size': len(self.uniqueness_cache),
+            'uniqueness_cache': self.uniqueness_cache.get_stats(),
             'anonymous_hasher_configured': anonymous_hasher.is_configured(),
             'anonymous_hasher_info': anonymous_hasher.get_security_info()
         }
@@ -0,0 +1,283 @@
+"""
+Planificateur central des tâches périodiques d'Aegis
+
+Un seul tas (prochaine exécution, tâche) et une seule boucle asyncio pilotent
+les travaux de fond: nettoyage des signalements et du rate limiter, auto-rejet
+des votes, écriture des compteurs journaliers, résumés. Rien n'est exécuté sur
+le chemin des requêtes. La date de prochaine exécution de chaque tâche est
+enregistrée dans le fichier SQLite local: un redémarrage ne relance pas les
+tâches quotidiennes et ne fait pas oublier celles qui étaient dues.
+"""
+import asyncio
+import heapq
+import itertools
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config.logging_config import get_logger
+
+logger = get_logger('scheduler')
+
+
+@dataclass
+class ScheduledJob:
+    """Tâche périodique et ses métriques d'exécution"""
+    
+    name: str
+    interval: float  # secondes entre deux exécutions
+    func: Callable[[], Awaitable[Any]]
+    next_run: float = 0.0  # horodatage (time.time()) de la prochaine exécution
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0  # exécutions sautées car la précédente n'était pas terminée
+    total_runtime: float = 0.0
+    last_runtime: float = 0.0
+    max_runtime: float = 0.0
+    last_run: Optional[float] = None
+    last_error: Optional[str] = None
+    running: bool = False
+    
+    @property
+    def avg_runtime(self) -> float:
+        return self.total_runtime / self.runs if self.runs else 0.0
+
+
+class JobScheduler:
+    """Planificateur à tas unique des tâches périodiques"""
+    
+    def __init__(self, db_path: Optional[str] = "data/aegis.db"):
+        """
+        Args:
+            db_path: Fichier SQLite local des prochaines exécutions (None = pas de persistance)
+        """
+        self.db_path = Path(db_path) if db_path else None
+        self.jobs: Dict[str, ScheduledJob] = {}
+        
+        # Tas (prochaine exécution, ordre d'ajout, nom); les entrées périmées sont ignorées au retrait
+        self._heap: List[Tuple[float, int, str]] = []
+        self._counter = itertools.count()
+        self._running_tasks: Dict[str, asyncio.Task] = {}
+        
+        self._connection: Optional[sqlite3.Connection] = None
+        # Un seul thread: sqlite3 n'accepte qu'un écrivain à la fois
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scheduler")
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._closed = False
+    
+    async def _run_sync(self, func, *args):
+        """Exécuter une opération SQLite hors de la boucle d'événements"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS scheduler_jobs (
+                    name TEXT PRIMARY KEY,
+                    next_run REAL NOT NULL,
+                    last_run REAL
+                )
+                """
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+    
+    def _load_sync(self) -> Dict[str, Tuple[float, Optional[float]]]:
+        connection = self._connect()
+        return {
+            name: (next_run, last_run)
+            for name, next_run, last_run in connection.execute("SELECT name, next_run, last_run FROM scheduler_jobs")
+        }
+    
+    def _save_sync(self, rows: List[Tuple[str, float, Optional[float]]]):
+        connection = self._connect()
+        connection.executemany(
+            "INSERT OR REPLACE INTO scheduler_jobs (name, next_run, last_run) VALUES (?, ?, ?)",
+            rows
+        )
+        connection.commit()
+    
+    def add_job(self, name: str, interval: float, func: Callable[[], Awaitable[Any]],
+                first_delay: Optional[float] = None):
+        """
+        Déclarer une tâche périodique (avant start())
+        
+        Args:
+            name: Nom unique de la tâche (clé de persistance)
+            interval: Secondes entre deux exécutions
+            func: Coroutine sans argument
+            first_delay: Délai avant la première exécution sans date persistée (défaut: interval)
+        """
+        if interval <= 0:
+            raise ValueError(f"Intervalle invalide pour la tâche {name}: {interval}")
+        job = ScheduledJob(name=name, interval=interval, func=func)
+        job.next_run = time.time() + (interval if first_delay is None else first_delay)
+        self.jobs[name] = job
+        if self._task is not None:
+            self._push(job)
+    
+    def _push(self, job: ScheduledJob):
+        heapq.heappush(self._heap, (job.next_run, next(self._counter), job.name))
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    async def start(self):
+        """Reprendre les dates persistées et lancer la boucle du planificateur"""
+        if self._task is not None:
+            return
+        
+        if self.db_path is not None:
+            try:
+                persisted = await self._run_sync(self._load_sync)
+            except Exception as e:
+                logger.error(f"❌ Erreur chargement du planificateur {self.db_path}: {e}")
+                persisted = {}
+            for name, (next_run, last_run) in persisted.items():
+                job = self.jobs.get(name)
+                if job is not None:
+                    # Une tâche en retard pendant l'arrêt est exécutée dès le démarrage
+                    job.next_run = next_run
+                    job.last_run = last_run
+        
+        self._heap = []
+        for job in self.jobs.values():
+            self._push(job)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"⏰ Planificateur démarré ({len(self.jobs)} tâche(s))")
+    
+    async def _run(self):
+        while not self._closed:
+            if not self._heap:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            
+            next_run, _, name = self._heap[0]
+            delay = next_run - time.time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                # Réveil (nouvelle tâche, fermeture) ou échéance: réévaluer le haut du tas
+                continue
+            
+            heapq.heappop(self._heap)
+            job = self.jobs.get(name)
+            if job is None or job.next_run != next_run:
+                continue
+            self._dispatch(job)
+    
+    def _dispatch(self, job: ScheduledJob):
+        """Lancer une tâche due et programmer la suivante"""
+        now = time.time()
+        # Pas de rattrapage en rafale après une longue interruption
+        job.next_run = max(job.next_run + job.interval, now + job.interval * 0.5)
+        self._push(job)
+        
+        if job.running:
+            job.skipped += 1
+            logger.warning(f"⏰ Tâche {job.name} encore en cours, exécution sautée")
+            return
+        self._running_tasks[job.name] = asyncio.create_task(self._execute(job))
+    
+    async def _execute(self, job: ScheduledJob):
+        job.running = True
+        started = time.perf_counter()
+        try:
+            await job.func()
+            job.last_error = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.error(f"❌ Erreur tâche planifiée {job.name}: {e}")
+        finally:
+            runtime = time.perf_counter() - started
+            job.running = False
+            job.runs += 1
+            job.last_run = time.time()
+            job.last_runtime = runtime
+            job.total_runtime += runtime
+            job.max_runtime = max(job.max_runtime, runtime)
+            self._running_tasks.pop(job.name, None)
+        
+        await self._persist([job])
+    
+    async def _persist(self, jobs: List[ScheduledJob]):
+        if self.db_path is None or not jobs:
+            return
+        try:
+            await self._run_sync(self._save_sync, [(job.name, job.next_run, job.last_run) for job in jobs])
+        except Exception as e:
+            logger.error(f"Erreur persistance du planificateur: {e}")
+    
+    async def run_now(self, name: str) -> bool:
+        """
+        Exécuter immédiatement une tâche (sans modifier sa prochaine exécution)
+        
+        Returns:
+            False si la tâche est inconnue ou déjà en cours
+        """
+        job = self.jobs.get(name)
+        if job is None or job.running:
+            return False
+        await self._execute(job)
+        return True
+    
+    async def close(self, timeout: float = 10.0):
+        """Arrêter la boucle, attendre les tâches en cours et enregistrer les prochaines exécutions"""
+        self._closed = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+        
+        running = list(self._running_tasks.values())
+        if running:
+            # Une tâche en cours (écriture, nettoyage) doit se terminer proprement
+            done, pending = await asyncio.wait(running, timeout=timeout)
+            for task in pending:
+                task.cancel()
+        
+        await self._persist(list(self.jobs.values()))
+        
+        def _close():
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+        
+        await self._run_sync(_close)
+        self._executor.shutdown(wait=True)
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Métriques par tâche"""
+        now = time.time()
+        return {
+            job.name: {
+                'interval': job.interval,
+                'next_run_in': max(0.0, job.next_run - now),
+                'runs': job.runs,
+                'failures': job.failures,
+                'skipped': job.skipped,
+                'avg_runtime_ms': job.avg_runtime * 1000,
+                'max_runtime_ms': job.max_runtime * 1000,
+                'last_runtime_ms': job.last_runtime * 1000,
+                'last_error': job.last_error,
+                'running': job.running
+            }
+            for job in self.jobs.values()
+        }
@@ -0,0 +1,20 @@
+"""
+Fixture partagée: service de hachage anonyme configuré pour les tests unitaires
+"""
+import pytest
+
+from utils.anonymous_hasher import anonymous_hasher
+from config.bot_config import bot_settings
+
+
+def configure_hasher():
+    """Configurer un salt secret suffisant et forcer la ré-initialisation du hasher"""
+    bot_settings.reporter_salt_secret = "a" * 64
+    anonymous_hasher._initialized = False
+    assert anonymous_hasher.is_configured() is True
+
+
+@pytest.fixture(autouse=True)
+def hasher_configured():
+    """À importer dans un module de tests pour l'appliquer à tous ses tests"""
+    configure_hasher()
@@ -0,0 +1,120 @@
+"""
+Tests unitaires pour l'envoi groupé du journal d'activité.
+"""
+import asyncio
+
+import pytest
+
+from database.activity_batcher import ActivityBatcher
+
+
+class FakeSink:
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+
+    async def insert(self, rows):
+        if self.fail:
+            raise ConnectionError("down")
+        self.batches.append(list(rows))
+
+
+@pytest.mark.asyncio
+async def test_events_are_coalesced_by_size(tmp_path):
+    sink = FakeSink()
+    batcher = ActivityBatcher(sink.insert, batch_size=3, flush_interval=10, spill_path=str(tmp_path / "spill.jsonl"))
+
+    for i in range(7):
+        await batcher.log({"n": i})
+    await asyncio.sleep(0.01)
+    # Le seuil de taille a déclenché l'envoi sans attendre flush_interval
+    assert [len(b) for b in sink.batches] == [3, 3, 1]
+
+    await batcher.close()
+    assert batcher.get_stats()['flushed'] == 7
+    assert batcher.get_stats()['batches'] == 3
+
+
+@pytest.mark.asyncio
+async def test_flush_interval_sends_partial_batch(tmp_path):
+    sink = FakeSink()
+    batcher = ActivityBatcher(sink.insert, batch_size=100, flush_interval=0.02, spill_path=str(tmp_path / "spill.jsonl"))
+    await batcher.log({"n": 1})
+    await asyncio.sleep(0.1)
+    assert sink.batches == [[{"n": 1}]]
+    await batcher.close()
+
+
+@pytest.mark.asyncio
+async def test_spill_file_is_replayed_when_db_recovers(tmp_path):
+    sink = FakeSink()
+    spill = tmp_path / "spill.jsonl"
+    batcher = ActivityBatcher(sink.insert, batch_size=10, flush_interval=10, spill_path=str(spill))
+
+    sink.fail = True
+    await batcher.log({"n": 1})
+    await batcher.log({"n": 2})
+    assert await batcher.flush() == 0
+    assert spill.exists()
+
+    sink.fail = False
+    await batcher.log({"n": 3})
+    await batcher.close()
+
+    rows = [row for batch in sink.batches for row in batch]
+    assert sorted(row["n"] for row in rows) == [1, 2, 3]
+    assert not spill.exists()
+    assert batcher.get_stats()['replayed'] == 2
+
+
+@pytest.mark.asyncio
+async def test_full_queue_overflows_to_disk(tmp_path):
+    sink = FakeSink()
+    sink.fail = True
+    spill = tmp_path / "spill.jsonl"
+    batcher = ActivityBatcher(sink.insert, batch_size=100, flush_interval=10, max_queue=2,
+                              spill_path=str(spill), backpressure_timeout=0.01)
+
+    for i in range(3):
+        await batcher.log({"n": i})
+
+    # La commande n'a pas été bloquée et rien n'est perdu
+    await batcher.close()
+    assert batcher.get_stats()['dropped'] == 0
+    assert len(spill.read_text(encoding="utf-8").splitlines()) == 3
+
+
+@pytest.mark.asyncio
+async def test_interrupted_replay_resumes_without_losing_rows(tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    spill.write_text("".join(f'{{"n": {i}}}\n' for i in range(5)), encoding="utf-8")
+    inserted = []
+
+    async def insert(rows):
+        if len(inserted) == 2:
+            raise ConnectionError("down")  # coupure après le premier lot
+        inserted.extend(row["n"] for row in rows)
+
+    batcher = ActivityBatcher(insert, batch_size=2, flush_interval=10, spill_path=str(spill))
+    await batcher._replay_spill()
+    assert inserted == [0, 1]
+    assert batcher.replay_path.exists() and not spill.exists()
+
+    # Nouvelles lignes sauvegardées pendant la coupure: le rejeu en cours passe d'abord
+    await batcher._spill([{"n": 5}])
+    sink = FakeSink()
+    restarted = ActivityBatcher(sink.insert, batch_size=2, flush_interval=10, spill_path=str(spill))
+    await restarted._replay_spill()
+    assert [row["n"] for batch in sink.batches for row in batch] == [2, 3, 4, 5]
+    assert not restarted.replay_path.exists() and not spill.exists()
+
+
+@pytest.mark.asyncio
+async def test_spill_file_size_is_capped(tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    batcher = ActivityBatcher(FakeSink().insert, spill_path=str(spill), max_spill_bytes=20)
+    await batcher._spill([{"n": i} for i in range(5)])
+
+    assert len(spill.read_text(encoding="utf-8").splitlines()) == 2
+    stats = batcher.get_stats()
+    assert stats["spilled"] == 2 and stats["dropped"] == 3
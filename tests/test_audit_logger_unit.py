@@ -0,0 +1,96 @@
+"""
+Tests unitaires pour l'écrivain tamponné du journal d'audit.
+"""
+import asyncio
+import json
+
+import pytest
+
+from utils.audit_logger import AuditLogger, AuditAction
+
+
+async def _log(audit, guild_id, moderator_id=1):
+    return await audit.log_action(AuditAction.REPORT_VALIDATED, guild_id, moderator_id, "mod", {"n": moderator_id})
+
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.asyncio
+async def test_log_action_is_buffered_then_group_committed(tmp_path):
+    audit = AuditLogger(str(tmp_path / "audit"), flush_interval=60)
+    for moderator_id in range(5):
+        assert await _log(audit, 1, moderator_id) is True
+
+    path = audit._get_audit_file_path(1)
+    # Rien n'est écrit sur le chemin de log_action
+    assert not path.exists()
+    assert audit.get_writer_stats()["pending"] == 5
+
+    assert await audit.flush() == 5
+    assert [entry["details"]["n"] for entry in _lines(path)] == [0, 1, 2, 3, 4]
+    assert audit.batches == 1
+    await audit.close()
+
+
+@pytest.mark.asyncio
+async def test_background_writer_and_lru_handles(tmp_path):
+    audit = AuditLogger(str(tmp_path / "audit"), flush_interval=0.01, max_open_files=2, fsync_policy="always")
+    for guild_id in (1, 2, 3):
+        await _log(audit, guild_id)
+    await asyncio.sleep(0.1)
+
+    stats = audit.get_writer_stats()
+    assert stats["entries_written"] == 3
+    assert stats["open_files"] == 2
+    assert stats["handles_closed"] == 1
+    assert stats["fsyncs"] >= 3
+    await audit.close()
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_entries(tmp_path):
+    audit = AuditLogger(str(tmp_path / "audit"), flush_interval=60, fsync_policy="never")
+    await _log(audit, 7)
+    await audit.close()
+
+    assert len(_lines(audit._get_audit_file_path(7))) == 1
+    assert audit.get_writer_stats()["open_files"] == 0
+    # Après fermeture, une nouvelle entrée est refusée plutôt que perdue silencieusement
+    assert await _log(audit, 7) is False
+
+
+@pytest.mark.asyncio
+async def test_history_includes_buffered_entries(tmp_path):
+    audit = AuditLogger(str(tmp_path / "audit"), flush_interval=60)
+    await _log(audit, 3, moderator_id=42)
+    history = await audit.get_moderator_actions(3, 42, days=1)
+    assert len(history) == 1
+    await audit.close()
+
+
+@pytest.mark.asyncio
+async def test_write_error_requeues_only_unwritten_files(tmp_path):
+    audit = AuditLogger(str(tmp_path / "audit"), flush_interval=60)
+    await _log(audit, 1)
+    await _log(audit, 2)
+    failing = audit._get_audit_file_path(2)
+    open_handle = audit._handle
+
+    def flaky_handle(path):
+        if path == failing:
+            raise OSError("disk full")
+        return open_handle(path)
+
+    audit._handle = flaky_handle
+    assert await audit.flush() == 1
+    assert audit.get_writer_stats()["pending"] == 1
+
+    audit._handle = open_handle
+    assert await audit.flush() == 1
+    # Le fichier déjà écrit n'est pas dupliqué
+    assert len(_lines(audit._get_audit_file_path(1))) == 1
+    assert len(_lines(failing)) == 1
+    await audit.close()
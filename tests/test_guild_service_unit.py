@@ -0,0 +1,54 @@
+"""
+Tests unitaires pour le cache de configuration de GuildService.
+"""
+import json
+import os
+
+from services.guild_service import GuildService
+
+
+def _make_service(tmp_path, revalidate_interval=0.0):
+    return GuildService(config_dir=str(tmp_path / "guild_configs"), revalidate_interval=revalidate_interval)
+
+
+def test_second_read_is_cache_hit(tmp_path):
+    service = _make_service(tmp_path, revalidate_interval=60)
+    service.get_guild_config(1)  # création de la config par défaut (write-through)
+    config = service.get_guild_config(1)
+    assert config["language"] == "fr"
+    assert service.cache_hits == 1
+
+
+def test_update_is_written_through(tmp_path):
+    service = _make_service(tmp_path, revalidate_interval=60)
+    service.update_guild_config(1, {"language": "en"})
+    assert service.get_guild_config(1)["language"] == "en"
+
+    with open(service._get_config_path("1"), encoding="utf-8") as f:
+        assert json.load(f)["language"] == "en"
+
+
+def test_external_change_invalidates_cache(tmp_path):
+    service = _make_service(tmp_path, revalidate_interval=0.0)
+    service.get_guild_config(1)
+
+    path = service._get_config_path("1")
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    data["language"] = "en"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    # Forcer un mtime différent même sur les systèmes de fichiers à faible résolution
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert service.get_guild_config(1)["language"] == "en"
+    assert service.cache_invalidations == 1
+
+
+def test_delete_clears_cache(tmp_path):
+    service = _make_service(tmp_path, revalidate_interval=60)
+    service.update_guild_config(1, {"language": "en"})
+    assert service.delete_guild_config(1) is True
+    # Recréée avec les valeurs par défaut
+    assert service.get_guild_config(1)["language"] == "fr"
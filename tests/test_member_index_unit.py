@@ -0,0 +1,86 @@
+"""
+Tests unitaires pour l'index des noms de membres.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from utils.member_index import GuildMemberIndex, MemberIndex
+
+
+def _member(member_id, name, display_name=None, guild_id=1):
+    return SimpleNamespace(id=member_id, name=name, display_name=display_name or name,
+                           guild=SimpleNamespace(id=guild_id))
+
+
+def test_exact_then_partial_matches():
+    index = GuildMemberIndex()
+    index.add(1, "alice", "Queen Alice")
+    index.add(2, "malicious")
+    index.add(3, "bob")
+
+    assert index.find("ALICE") == 1
+    assert index.find("queen alice") == 1
+    assert index.find("alic") == 1  # préfixe avant sous-chaîne
+    assert index.find("licio") == 2
+    assert index.find("bo") == 3  # recherche courte: préfixe
+    assert index.find("zzz") is None
+
+
+def test_remove_cleans_grams_and_prefixes():
+    index = GuildMemberIndex()
+    index.add(1, "charlie")
+    assert index.find("ch") == 1
+    index.remove(1)
+    assert index.find("ch") is None
+    assert index.find("arli") is None
+    assert index._by_gram == {}
+
+
+@pytest.mark.asyncio
+async def test_lookup_falls_back_to_linear_scan_until_index_is_built():
+    registry = MemberIndex(chunk_size=1)
+    guild = SimpleNamespace(id=1, members=[_member(1, "dave"), _member(2, "davina")])
+
+    # Premier appel: parcours linéaire, construction lancée en tâche de fond
+    assert registry.find_member_id(guild, "davi") == 2
+    assert registry.linear_lookups == 1
+    registry.on_member_join(_member(3, "erin"))  # reçu pendant la construction
+    await asyncio.sleep(0.01)
+
+    assert registry.is_indexed(1)
+    assert registry.find_member_id(guild, "erin") == 3
+    assert registry.linear_lookups == 1
+
+
+@pytest.mark.asyncio
+async def test_events_maintain_built_index():
+    registry = MemberIndex()
+    guild = SimpleNamespace(id=1, members=[_member(1, "dave"), _member(2, "erin")])
+    await registry.build_guild(guild)
+
+    registry.on_member_update(_member(2, "erin"), _member(2, "erin", "Nightowl"))
+    assert registry.find_member_id(guild, "nightowl") == 2
+
+    registry.on_member_remove(_member(1, "dave"))
+    assert registry.find_member_id(guild, "dave") is None
+    assert registry.builds == 1
+    assert registry.linear_lookups == 0
+
+
+@pytest.mark.asyncio
+async def test_drop_guild_during_build_discards_index():
+    registry = MemberIndex(chunk_size=1)
+    guild = SimpleNamespace(id=1, members=[_member(i, f"user{i}") for i in range(5)])
+
+    registry.schedule_build(guild)
+    assert len(registry._tasks) == 1
+    await asyncio.sleep(0)
+    registry.drop_guild(1)
+    await asyncio.sleep(0.01)
+
+    # Le serveur oublié n'est pas réindexé et la tâche terminée est libérée
+    assert not registry.is_indexed(1)
+    assert registry.builds == 0
+    assert not registry._tasks
@@ -0,0 +1,151 @@
+"""
+Tests unitaires pour le moteur de purge des threads du forum.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services.purge_service import ThreadPurgeEngine, PurgeAlreadyRunning
+from services.report_service import ReportService
+from utils.rate_limiter import RateLimiter
+from utils.anonymous_hasher import anonymous_hasher
+from config.bot_config import bot_settings
+
+NOW = datetime.now(timezone.utc)
+
+
+class FakeThread:
+    active = 0
+    peak = 0
+
+    def __init__(self, thread_id, age_days, fail=False):
+        self.id = thread_id
+        self.created_at = NOW - timedelta(days=age_days)
+        self.archive_timestamp = NOW - timedelta(minutes=thread_id)
+        self.fail = fail
+        self.deleted = False
+
+    async def delete(self):
+        FakeThread.active += 1
+        FakeThread.peak = max(FakeThread.peak, FakeThread.active)
+        await asyncio.sleep(0)
+        FakeThread.active -= 1
+        if self.fail:
+            raise RuntimeError("boom")
+        self.deleted = True
+
+
+class FakeForum:
+    def __init__(self, active, archived, stop_after=None):
+        self.id = 1
+        self.threads = active
+        self.archived = sorted(archived, key=lambda t: t.archive_timestamp, reverse=True)
+        self.stop_after = stop_after
+
+    async def archived_threads(self, limit=None, before=None):
+        for count, thread in enumerate(t for t in self.archived if before is None or t.archive_timestamp < before):
+            if self.stop_after is not None and count >= self.stop_after:
+                raise ConnectionError("coupure")
+            yield thread
+
+
+@pytest.mark.asyncio
+async def test_purge_paginates_all_archived_threads_with_bounded_concurrency(tmp_path):
+    FakeThread.peak = 0
+    engine = ThreadPurgeEngine(str(tmp_path / "aegis.db"), concurrency=3, batch_size=10)
+    archived = [FakeThread(i, age_days=60) for i in range(1, 251)] + [FakeThread(300, age_days=1)]
+    forum = FakeForum([FakeThread(500, age_days=45), FakeThread(501, age_days=2)], archived)
+
+    job = await engine.start(10, forum.id, NOW - timedelta(days=30), 30)
+    job = await engine.run(forum, job)
+
+    assert job.is_done
+    assert job.active_deleted == 1
+    assert job.archived_deleted == 250  # au-delà de l'ancienne limite de 200
+    assert FakeThread.peak <= 3
+    assert await engine.get_job(10) is None
+    await engine.close()
+
+
+@pytest.mark.asyncio
+async def test_interrupted_purge_resumes_from_cursor(tmp_path):
+    engine = ThreadPurgeEngine(str(tmp_path / "aegis.db"), batch_size=5)
+    archived = [FakeThread(i, age_days=60) for i in range(1, 21)]
+    forum = FakeForum([], archived, stop_after=12)
+
+    job = await engine.start(10, forum.id, NOW - timedelta(days=30), 30)
+    with pytest.raises(ConnectionError):
+        await engine.run(forum, job)
+    await engine.close()
+
+    # Redémarrage: la purge reprend après les lots déjà sauvegardés
+    engine = ThreadPurgeEngine(str(tmp_path / "aegis.db"), batch_size=5)
+    assert len(await engine.open()) == 1
+    job = await engine.start(10, forum.id, NOW, 0)
+    assert job.resumed and job.archived_deleted == 10 and job.days == 30
+
+    forum.stop_after = None
+    job = await engine.run(forum, job)
+    assert job.archived_deleted == 20
+    assert all(thread.deleted for thread in archived)
+    await engine.close()
+
+
+@pytest.mark.asyncio
+async def test_purge_removes_linked_reports_locally_and_in_supabase(tmp_path):
+    bot_settings.reporter_salt_secret = "a" * 64
+    anonymous_hasher._initialized = False
+
+    class FakeDB:
+        is_connected = True
+        deleted = []
+
+        async def delete_reports_by_hashes(self, hashes):
+            self.deleted.extend(hashes)
+            return len(hashes)
+
+    db = FakeDB()
+    rs = ReportService(db_client=db, rate_limiter=RateLimiter(max_actions=5))
+    kept = await rs.create_report(1, 10, "Kept", "spam", "a", "")
+    purged = await rs.create_report(2, 10, "Purged", "spam", "b", "")
+    await rs.set_report_thread(kept.id, 901)
+    await rs.set_report_thread(purged.id, 902)
+
+    engine = ThreadPurgeEngine(str(tmp_path / "aegis.db"), report_service=rs)
+    forum = FakeForum([FakeThread(901, age_days=60, fail=True), FakeThread(902, age_days=60)], [])
+    job = await engine.run(forum, await engine.start(10, forum.id, NOW - timedelta(days=30), 30))
+
+    assert job.failed == 1 and job.reports_purged == 1
+    assert purged.id not in rs.active_reports
+    assert kept.id in rs.active_reports  # thread non supprimé: signalement conservé
+    assert db.deleted == [purged.uniqueness_hash]
+    await engine.close()
+
+
+
+@pytest.mark.asyncio
+async def test_concurrent_run_and_active_resume_counts(tmp_path):
+    engine = ThreadPurgeEngine(str(tmp_path / "aegis.db"), batch_size=2)
+    active = [FakeThread(i, age_days=60) for i in range(1, 5)]
+    forum = FakeForum(active, [])
+    job = await engine.start(10, forum.id, NOW - timedelta(days=30), 30)
+
+    engine._running.add(10)
+    with pytest.raises(PurgeAlreadyRunning):
+        await engine.run(forum, job)
+    engine._running.discard(10)
+
+    async def stop(job):
+        raise asyncio.CancelledError()  # arrêt du bot après le premier lot
+
+    with pytest.raises(asyncio.CancelledError):
+        await engine.run(forum, job, stop)
+
+    # Reprise: les threads actifs restants ne sont pas recomptés
+    forum.threads = [thread for thread in active if not thread.deleted]
+    job = await engine.start(10, forum.id, NOW, 0)
+    assert job.resumed and job.scanned == 4
+    job = await engine.run(forum, job)
+    assert job.scanned == 4 and job.active_deleted == 4
+    await engine.close()
@@ -0,0 +1,158 @@
+"""
+Tests unitaires pour RateLimiter et ses backends (mémoire, SQLite partagé).
+"""
+import sqlite3
+import time
+
+import pytest
+
+from utils.rate_limiter import RateLimiter, MemoryRateLimitBackend, SQLiteRateLimitBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        backend = MemoryRateLimitBackend()
+    else:
+        backend = SQLiteRateLimitBackend(str(tmp_path / "aegis.db"))
+    yield backend
+    backend.close()
+
+
+def test_limit_and_remaining_time(backend):
+    limiter = RateLimiter(max_actions=2, time_window=3600, backend=backend)
+
+    assert limiter.check_rate_limit(1, 10) is True
+    assert limiter.get_remaining_time(1, 10) == 0
+    assert limiter.check_rate_limit(1, 10) is True
+    assert limiter.check_rate_limit(1, 10) is False
+    assert 3590 < limiter.get_remaining_time(1, 10) <= 3600
+    # Les autres serveurs ne sont pas affectés
+    assert limiter.check_rate_limit(1, 20) is True
+    assert limiter.get_user_action_count(1, 10) == 2
+
+
+def test_reset_and_cleanup(backend):
+    limiter = RateLimiter(max_actions=1, time_window=3600, backend=backend)
+    limiter.check_rate_limit(1, 10)
+    limiter.reset_user_limit(1, 10)
+    assert limiter.check_rate_limit(1, 10) is True
+
+    assert backend.cleanup(window=0) == 1
+    assert limiter.get_stats()['active_users'] == 0
+
+
+def test_sqlite_backend_is_shared_and_persistent(tmp_path):
+    path = str(tmp_path / "aegis.db")
+    first = SQLiteRateLimitBackend(path)
+    second = SQLiteRateLimitBackend(path)  # autre processus / shard
+
+    assert RateLimiter(max_actions=1, backend=first).check_rate_limit(1, 10) is True
+    assert RateLimiter(max_actions=1, backend=second).check_rate_limit(1, 10) is False
+    first.close()
+    second.close()
+
+    restarted = SQLiteRateLimitBackend(path)
+    limiter = RateLimiter(max_actions=1, backend=restarted)
+    assert limiter.check_rate_limit(1, 10) is False
+    assert limiter.get_stats()['backend'] == "sqlite"
+    restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_async_check_matches_sync_check(backend):
+    limiter = RateLimiter(max_actions=1, time_window=3600, backend=backend)
+    assert await limiter.check_rate_limit_async(1, 10) is True
+    assert await limiter.check_rate_limit_async(1, 10) is False
+    assert limiter.check_rate_limit(1, 10) is False
+    assert 3590 < await limiter.get_remaining_time_async(1, 10) <= 3600
+    assert await limiter.get_remaining_time_async(2, 10) == 0
+    limiter.close()
+
+
+def test_sqlite_backend_fails_open_when_locked(tmp_path):
+    path = str(tmp_path / "aegis.db")
+    backend = SQLiteRateLimitBackend(path, busy_timeout=0.01)
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")  # autre processus qui garde le verrou d'écriture
+
+    started = time.monotonic()
+    assert RateLimiter(max_actions=1, backend=backend).check_rate_limit(1, 10) is True
+    assert time.monotonic() - started < 1
+    assert backend.stats()['busy_failures'] == 1
+
+    other.execute("ROLLBACK")
+    other.close()
+    # Rien n'a été enregistré pendant le verrouillage
+    assert backend.count("1:10", 3600) == 0
+    backend.close()
+
+
+def test_sqlite_cleanup_runs_in_batches(tmp_path):
+    backend = SQLiteRateLimitBackend(str(tmp_path / "aegis.db"), cleanup_batch_size=3)
+    for user_id in range(10):
+        assert backend.hit(f"{user_id}:1", 5, 3600) is True
+    assert backend.cleanup(window=3600) == 0
+    assert backend.cleanup(window=0) == 10
+    assert backend.stats()['tracked_actions'] == 0
+    backend.close()
+
+
+def test_guild_limit_throttles_all_users(backend):
+    limiter = RateLimiter(max_actions=5, backend=backend, guild_max_actions=2)
+
+    assert limiter.check_rate_limit(1, 10) is True
+    assert limiter.check_rate_limit(2, 10) is True
+    assert limiter.check_rate_limit(3, 10) is False
+    assert limiter.get_remaining_time(3, 10) > 0
+    # Le refus n'est pas compté pour l'utilisateur
+    assert limiter.get_user_action_count(3, 10) == 0
+    assert limiter.check_rate_limit(3, 20) is True
+
+
+def test_global_limit(backend):
+    limiter = RateLimiter(max_actions=5, backend=backend, global_max_actions=1)
+    assert limiter.check_rate_limit(1, 10) is True
+    assert limiter.check_rate_limit(2, 20) is False
+
+
+def test_limits_come_from_guild_config(tmp_path, backend):
+    from services.guild_service import GuildService
+
+    service = GuildService(config_dir=str(tmp_path / "guild_configs"), revalidate_interval=60)
+    service.update_guild_config(10, {"rate_limits": {"reports_per_user_per_hour": 1}})
+    limiter = RateLimiter(max_actions=5, backend=backend, limits_resolver=service.get_rate_limits)
+
+    assert limiter.check_rate_limit(1, 10) is True
+    assert limiter.check_rate_limit(1, 10) is False
+
+    # Limite serveur par défaut de la config (20/h)
+    for user_id in range(2, 21):
+        assert limiter.check_rate_limit(user_id, 10) is True
+    assert limiter.check_rate_limit(99, 10) is False
+
+
+def test_timer_wheel_expires_idle_keys():
+    backend = MemoryRateLimitBackend(tick_seconds=0.01)
+    limiter = RateLimiter(max_actions=1, time_window=0.02, backend=backend)
+    for user_id in range(50):
+        assert limiter.check_rate_limit(user_id, 10) is True
+
+    time.sleep(0.05)
+    # Une vérification suffit à faire tourner la roue
+    assert limiter.check_rate_limit(999, 10) is True
+    assert backend.stats()['active_keys'] == 1
+    assert backend.expired_keys == 50
+
+
+def test_ring_buffer_follows_limit_changes():
+    backend = MemoryRateLimitBackend()
+    for _ in range(3):
+        assert backend.hit("k", 3, 3600) is True
+    assert backend.hit("k", 3, 3600) is False
+    # Limite relevée: les 3 actions sont conservées
+    assert backend.hit("k", 4, 3600) is True
+    assert backend.count("k", 3600) == 4
+    # Limite abaissée: seules les plus récentes comptent
+    assert backend.hit("k", 2, 3600) is False
+    assert backend.count("k", 3600) == 2
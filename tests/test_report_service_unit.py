@@ -2,6 +2,7 @@
 Tests unitaires ciblés pour ReportService (création, doublons, rate limit, update).
 """
 import pytest
+from datetime import datetime, timedelta
 
 from services.report_service import ReportService
 from utils.rate_limiter import RateLimiter
@@ -76,3 +77,142 @@ async def test_update_report_status_calls_db():
     assert ok is True
     assert db.called is True
     assert rs.active_reports[r.id].status == "validated"
+
+
+class SupabaseIdDB(DummyDB):
+    async def add_report(self, **kwargs):
+        return {"success": True, "report_id": "uuid-123"}
+
+
+@pytest.mark.asyncio
+async def test_supabase_id_is_kept_for_validation():
+    db = SupabaseIdDB()
+    rs = ReportService(db_client=db, rate_limiter=RateLimiter())
+    r = await rs.create_report(1, 2, "TUser", "other", "ok", "")
+    assert r.metadata["db_report_id"] == "uuid-123"
+    await rs.update_report_status(r.id, "validated", validator_id=42)
+    assert db.report.metadata["db_report_id"] == "uuid-123"
+
+
+@pytest.mark.asyncio
+async def test_secondary_indexes_follow_status_and_cleanup():
+    rs = ReportService(db_client=None, rate_limiter=RateLimiter(max_actions=10))
+    r1 = await rs.create_report(1, 10, "Target", "spam", "a", "", target_user_id=77)
+    r2 = await rs.create_report(2, 10, "target ", "spam", "b", "")
+    r3 = await rs.create_report(1, 20, "Other", "spam", "c", "")
+
+    assert {r.id for r in await rs.get_guild_reports(10, status="pending")} == {r1.id, r2.id}
+    assert {r.id for r in rs.get_reports_for_target(77, usernames=("TARGET",))} == {r1.id, r2.id}
+    assert {r.id for r in rs.get_reporter_reports(1)} == {r1.id, r3.id}
+
+    await rs.update_report_status(r1.id, "validated", validator_id=5)
+    assert [r.id for r in await rs.get_guild_reports(10, status="pending")] == [r2.id]
+    assert [r.id for r in rs.get_reports_for_target(usernames=("Target",), status="validated")] == [r1.id]
+
+    await rs.cleanup_old_reports(days=-1)
+    assert r1.id not in rs.active_reports
+    assert rs.get_reports_for_target(77) == []
+    assert [r.id for r in await rs.get_guild_reports(10)] == [r2.id]
+
+
+@pytest.mark.asyncio
+async def test_guild_status_counts_use_index():
+    rs = ReportService(db_client=None, rate_limiter=RateLimiter(max_actions=10))
+    r1 = await rs.create_report(1, 10, "A", "spam", "a", "")
+    await rs.create_report(2, 10, "B", "spam", "b", "")
+    await rs.update_report_status(r1.id, "validated", validator_id=5)
+    rs.active_reports[r1.id].created_at -= timedelta(days=30)
+
+    assert rs.get_guild_status_counts(10) == {"validated": 1, "pending": 1}
+    assert rs.get_guild_status_counts(10, since=datetime.utcnow() - timedelta(days=7)) == {"pending": 1}
+    assert rs.get_guild_status_counts(99) == {}
+
+
+@pytest.mark.asyncio
+async def test_votes_are_idempotent_and_finalize_on_quorum():
+    thresholds = {"quorum_percentage": 80, "min_validators": 2, "validation_timeout_hours": 24}
+    rs = ReportService(db_client=None, rate_limiter=RateLimiter(), thresholds_resolver=lambda guild_id: thresholds)
+    r = await rs.create_report(1, 2, "TUser", "other", "ok", "")
+
+    first = await rs.record_vote(r.id, 10, "validated")
+    assert (first.status, first.approvals, first.decided) == ("pending", 1, False)
+    # Même vote répété: aucun effet
+    again = await rs.record_vote(r.id, 10, "validated")
+    assert (again.approvals, again.changed) == (1, False)
+
+    final = await rs.record_vote(r.id, 11, "validated")
+    assert final.decided is True
+    assert rs.active_reports[r.id].status == "validated"
+    assert rs.get_guild_status_counts(2) == {"validated": 1}
+    # Signalement clos: les votes suivants sont ignorés
+    late = await rs.record_vote(r.id, 12, "rejected")
+    assert (late.status, late.decided, late.rejections) == ("validated", False, 0)
+
+
+@pytest.mark.asyncio
+async def test_vote_change_replaces_previous_vote():
+    thresholds = {"quorum_percentage": 80, "min_validators": 2, "validation_timeout_hours": 24}
+    rs = ReportService(db_client=None, rate_limiter=RateLimiter(), thresholds_resolver=lambda guild_id: thresholds)
+    r = await rs.create_report(1, 2, "TUser", "other", "ok", "")
+
+    await rs.record_vote(r.id, 10, "validated")
+    changed = await rs.record_vote(r.id, 10, "rejected")
+    assert (changed.approvals, changed.rejections, changed.decided) == (0, 1, False)
+    # Sans consensus (1 pour, 1 contre): toujours en attente
+    split = await rs.record_vote(r.id, 11, "validated")
+    assert split.status == "pending"
+
+
+@pytest.mark.asyncio
+async def test_vote_refreshes_are_debounced():
+    import asyncio
+
+    rs = ReportService(db_client=None, rate_limiter=RateLimiter(), vote_edit_delay=0.05,
+                       thresholds_resolver=lambda guild_id: {"min_validators": 5})
+    r = await rs.create_report(1, 2, "TUser", "other", "ok", "")
+    edits = []
+
+    async def refresh(report):
+        edits.append(rs.get_vote_counts(report))
+
+    for validator_id in range(3):
+        await rs.record_vote(r.id, validator_id, "validated")
+        rs.schedule_vote_refresh(r.id, refresh)
+    await asyncio.sleep(0.1)
+    assert edits == [(3, 0)]
+
+
+@pytest.mark.asyncio
+async def test_pending_reports_are_auto_rejected_after_timeout():
+    rs = ReportService(db_client=None, rate_limiter=RateLimiter(),
+                       thresholds_resolver=lambda guild_id: {"validation_timeout_hours": 24})
+    first = await rs.create_report(1, 2, "UserA", "other", "ok", "")
+    second = await rs.create_report(3, 2, "UserB", "other", "ok", "")
+    await rs.record_vote(second.id, 10, "validated")
+
+    assert await rs.expire_pending_votes(datetime.utcnow() + timedelta(hours=1)) == []
+    expired = await rs.expire_pending_votes(datetime.utcnow() + timedelta(hours=25))
+    assert {report.id for report in expired} == {first.id, second.id}
+    assert rs.active_reports[first.id].status == "rejected"
+    assert rs.active_reports[first.id].metadata["auto_rejected"] is True
+    assert rs.get_vote_stats()["pending_deadlines"] == 0
+
+
+@pytest.mark.asyncio
+async def test_shortened_timeout_moves_deadlines_earlier():
+    thresholds = {"validation_timeout_hours": 24}
+    rs = ReportService(db_client=None, rate_limiter=RateLimiter(),
+                       thresholds_resolver=lambda guild_id: thresholds)
+    report = await rs.create_report(1, 2, "UserA", "other", "ok", "")
+
+    thresholds["validation_timeout_hours"] = 2
+    expired = await rs.expire_pending_votes(datetime.utcnow() + timedelta(hours=3))
+    assert [r.id for r in expired] == [report.id]
+
+    # Délai activé après la création d'un signalement
+    thresholds["validation_timeout_hours"] = 0
+    other = await rs.create_report(3, 2, "UserB", "other", "ok", "")
+    assert await rs.expire_pending_votes(datetime.utcnow() + timedelta(hours=3)) == []
+    thresholds["validation_timeout_hours"] = 1
+    expired = await rs.expire_pending_votes(datetime.utcnow() + timedelta(hours=3))
+    assert [r.id for r in expired] == [other.id]
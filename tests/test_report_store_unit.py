@@ -0,0 +1,107 @@
+"""
+Tests unitaires pour le stockage persistant des signalements et la reprise à chaud.
+"""
+import pytest
+
+from services.report_service import ReportService
+from database.report_store import SQLiteReportStore, SupabaseReportStore
+from database.models.report import Report
+from utils.rate_limiter import RateLimiter
+from tests.hasher_fixtures import hasher_configured  # noqa: F401 (fixture autouse)
+
+
+async def _open_store(tmp_path):
+    store = SQLiteReportStore(str(tmp_path / "aegis.db"))
+    assert await store.open() is True
+    return store
+
+
+@pytest.mark.asyncio
+async def test_reports_survive_restart(tmp_path):
+    store = await _open_store(tmp_path)
+    rs = ReportService(db_client=None, rate_limiter=RateLimiter(max_actions=5), store=store)
+    report = await rs.create_report(123, 456, "TargetUser", "harassment", "Reason", "")
+    await rs.set_report_thread(report.id, 999)
+    await rs.close()
+
+    # Nouveau processus: nouveau service sur le même fichier
+    store = await _open_store(tmp_path)
+    restarted = ReportService(db_client=None, rate_limiter=RateLimiter(max_actions=5), store=store)
+    assert await restarted.warm_start() == 1
+
+    restored = await restarted.get_report(report.id)
+    assert restored.thread_id == 999
+    assert restored.reporter_id == 123  # conservé localement pour le transfert des MP
+    assert restored.is_pending
+    # Les doublons restent détectés après redémarrage
+    assert await restarted.create_report(123, 456, "TargetUser", "harassment", "Again", "") is None
+    await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_status_update_and_cleanup_are_persisted(tmp_path):
+    store = await _open_store(tmp_path)
+    rs = ReportService(db_client=None, rate_limiter=RateLimiter(max_actions=5), store=store)
+    report = await rs.create_report(1, 2, "TUser", "other", "ok", "")
+    await rs.update_report_status(report.id, "validated", validator_id=42)
+
+    loaded = await store.load_reports()
+    assert loaded[0].status == "validated"
+    assert loaded[0].validated_by == 42
+
+    await rs.cleanup_old_reports(days=-1)
+    assert await store.load_reports() == []
+    await rs.close()
+
+
+@pytest.mark.asyncio
+async def test_supabase_store_pages_pending_reports_first():
+    def payload(report_id, status):
+        return Report(report_id, 1, 0, "TUser", "spam", "r", status=status).to_dict(include_reporter_id=False)
+
+    payloads = {
+        "pending": [payload(f"P{i:03d}", "pending") for i in range(5)],
+        "other": [payload(f"V{i:03d}", "validated") for i in range(3)],
+    }
+    calls = []
+
+    class Query:
+        def __init__(self):
+            self.group = None
+            self.bounds = None
+            self.ordered = False
+
+        def select(self, columns):
+            return self
+
+        def eq(self, column, value):
+            self.group = "pending"
+            return self
+
+        def neq(self, column, value):
+            self.group = "other"
+            return self
+
+        def order(self, column):
+            self.ordered = True
+            return self
+
+        def range(self, start, end):
+            self.bounds = (start, end)
+            return self
+
+    class DB:
+        is_connected = True
+        client = type("Client", (), {"table": lambda self, name: Query()})()
+
+        async def _execute(self, query):
+            assert query.ordered
+            calls.append((query.group, query.bounds))
+            start, end = query.bounds
+            rows = payloads[query.group][start:end + 1]
+            return type("Result", (), {"data": [{"payload": row} for row in rows]})()
+
+    reports = await SupabaseReportStore(DB()).load_reports(page_size=2)
+    assert [report.id for report in reports] == [f"P{i:03d}" for i in range(5)] + [f"V{i:03d}" for i in range(3)]
+    # Plus d'une page par groupe: aucune réponse plafonnée ne tronque le chargement
+    assert calls[:3] == [("pending", (0, 1)), ("pending", (2, 3)), ("pending", (4, 5))]
@@ -0,0 +1,83 @@
+"""
+Tests unitaires pour le planificateur central des tâches périodiques.
+"""
+import asyncio
+import time
+
+import pytest
+
+from services.scheduler import JobScheduler
+
+
+@pytest.mark.asyncio
+async def test_due_jobs_run_in_order_with_metrics():
+    scheduler = JobScheduler(db_path=None)
+    calls = []
+
+    async def fast():
+        calls.append("fast")
+
+    async def failing():
+        calls.append("failing")
+        raise RuntimeError("boom")
+
+    scheduler.add_job("fast", 0.05, fast, first_delay=0)
+    scheduler.add_job("failing", 10, failing, first_delay=0.02)
+    await scheduler.start()
+    await asyncio.sleep(0.13)
+    await scheduler.close()
+
+    assert calls[0] == "fast"
+    assert calls.count("failing") == 1
+    assert calls.count("fast") >= 2
+    stats = scheduler.get_stats()
+    assert stats["fast"]["runs"] == calls.count("fast")
+    assert stats["failing"]["failures"] == 1
+    assert stats["failing"]["last_error"] == "boom"
+
+
+@pytest.mark.asyncio
+async def test_slow_job_is_not_run_twice_concurrently():
+    scheduler = JobScheduler(db_path=None)
+    running = 0
+    peak = 0
+
+    async def slow():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.1)
+        running -= 1
+
+    scheduler.add_job("slow", 0.02, slow, first_delay=0)
+    await scheduler.start()
+    await asyncio.sleep(0.15)
+    await scheduler.close()
+
+    assert peak == 1
+    assert scheduler.get_stats()["slow"]["skipped"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_next_run_is_persisted_across_restarts(tmp_path):
+    db_path = str(tmp_path / "aegis.db")
+    calls = []
+
+    async def daily():
+        calls.append(time.time())
+
+    first = JobScheduler(db_path)
+    first.add_job("daily", 3600, daily, first_delay=0)
+    await first.start()
+    await asyncio.sleep(0.05)
+    await first.close()
+    assert len(calls) == 1
+
+    # Après redémarrage, la tâche quotidienne déjà exécutée n'est pas relancée
+    second = JobScheduler(db_path)
+    second.add_job("daily", 3600, daily, first_delay=0)
+    await second.start()
+    await asyncio.sleep(0.05)
+    assert second.get_stats()["daily"]["next_run_in"] > 3500
+    await second.close()
+    assert len(calls) == 1
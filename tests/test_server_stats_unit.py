@@ -0,0 +1,149 @@
+"""
+Tests unitaires pour l'agrégation des statistiques serveur.
+"""
+import pytest
+
+from database.server_stats import ServerStatsAggregator, PartialFlushError
+from database.supabase_client_new import SupabaseClientNew
+
+
+class FakeFlush:
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    async def __call__(self, rows):
+        if self.fail:
+            raise ConnectionError("down")
+        self.calls.append(rows)
+
+
+@pytest.mark.asyncio
+async def test_increments_are_coalesced_per_guild():
+    flush = FakeFlush()
+    aggregator = ServerStatsAggregator(flush, flush_interval=60)
+    for _ in range(50):
+        aggregator.increment(1, "Guild", total_reports=1)
+    aggregator.increment(1, total_checks=2)
+    aggregator.increment(2, "Other", flags_found=1)
+
+    assert aggregator.pending(1) == {"total_reports": 50, "total_checks": 2, "flags_found": 0}
+    assert await aggregator.flush() == 2
+    # Une seule écriture pour tous les événements de la fenêtre
+    assert len(flush.calls) == 1
+    rows = {row["guild_id"]: row for row in flush.calls[0]}
+    assert rows[1]["total_reports"] == 50 and rows[1]["guild_name"] == "Guild"
+    assert rows[2]["flags_found"] == 1
+    await aggregator.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_increments():
+    flush = FakeFlush()
+    aggregator = ServerStatsAggregator(flush, flush_interval=60)
+    aggregator.increment(1, "Guild", total_reports=1)
+    flush.fail = True
+    assert await aggregator.flush() == 0
+    aggregator.increment(1, total_reports=1)
+
+    flush.fail = False
+    await aggregator.close()
+    assert flush.calls[0][0]["total_reports"] == 2
+
+
+@pytest.mark.asyncio
+async def test_partial_flush_requeues_only_failed_guilds():
+    calls = []
+
+    async def flush(rows):
+        calls.append([row["guild_id"] for row in rows])
+        if len(calls) == 1:
+            raise PartialFlushError([row for row in rows if row["guild_id"] == 2], ConnectionError("down"))
+
+    aggregator = ServerStatsAggregator(flush, flush_interval=60)
+    aggregator.increment(1, "Guild", total_reports=1)
+    aggregator.increment(2, "Other", total_reports=1)
+    assert await aggregator.flush() == 1
+    assert aggregator.pending(1)["total_reports"] == 0
+    assert aggregator.pending(2)["total_reports"] == 1
+
+    await aggregator.close()
+    # Le serveur 1 déjà écrit n'est pas renvoyé
+    assert calls[1] == [2]
+
+
+@pytest.mark.asyncio
+async def test_fallback_reports_failed_rows():
+    class Result:
+        def __init__(self, data):
+            self.data = data
+
+    class Query:
+        def __init__(self, client, guild_id=None):
+            self.client = client
+            self.guild_id = guild_id
+
+        def select(self, *args):
+            return self
+
+        def eq(self, column, value):
+            self.guild_id = value
+            return self
+
+        def update(self, updates):
+            self.client.writes.append(updates)
+            return self
+
+        def execute(self):
+            if self.guild_id == 2:
+                raise ConnectionError("down")
+            return Result([{"total_reports": 3}])
+
+    class Client:
+        def __init__(self):
+            self.writes = []
+
+        def table(self, name):
+            return Query(self)
+
+    db = SupabaseClientNew(max_concurrency=1, timeout=5)
+    db.client = Client()
+    db.is_connected = True
+    db._increment_rpc_available = False
+    rows = [{"guild_id": guild_id, "guild_name": "G", "total_reports": 1, "total_checks": 0, "flags_found": 0}
+            for guild_id in (1, 2)]
+
+    with pytest.raises(PartialFlushError) as excinfo:
+        await db._flush_server_stats(rows)
+    assert [row["guild_id"] for row in excinfo.value.failed_rows] == [2]
+    assert db.client.writes[0]["total_reports"] == 4
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_client_uses_single_increment_rpc():
+    rpcs = []
+
+    class Query:
+        def execute(self):
+            return type("Result", (), {"data": None})()
+
+    class Client:
+        def rpc(self, name, params):
+            rpcs.append((name, params))
+            return Query()
+
+    db = SupabaseClientNew(max_concurrency=1, timeout=5)
+    db.client = Client()
+    db.is_connected = True
+    await db._update_server_stats(1, "Guild", "report")
+    await db._update_server_stats(1, "Guild", "report")
+    await db._update_server_stats(1, "Guild", "check")
+    await db.server_stats.flush()
+
+    assert len(rpcs) == 1
+    name, params = rpcs[0]
+    assert name == "increment_server_stats"
+    assert params["deltas"][0]["total_reports"] == 2
+    assert params["deltas"][0]["total_checks"] == 1
+    await db.close()
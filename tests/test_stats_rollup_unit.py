@@ -0,0 +1,124 @@
+"""
+Tests unitaires pour les statistiques journalières matérialisées.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.stats_rollup import StatsRollup, RemoteStatsDisabled
+from services.report_service import ReportService
+from utils.rate_limiter import RateLimiter
+from utils.anonymous_hasher import anonymous_hasher
+from config.bot_config import bot_settings
+
+
+class FakePush:
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    async def __call__(self, deltas):
+        if self.fail:
+            raise ConnectionError("down")
+        self.calls.append(deltas)
+
+
+@pytest.mark.asyncio
+async def test_period_window_and_categories(tmp_path):
+    rollup = StatsRollup(str(tmp_path / "aegis.db"), flush_interval=60)
+    old = datetime.utcnow() - timedelta(days=10)
+    rollup.record(1, "reports_created", "harassment")
+    rollup.record(1, "reports_created", "spam")
+    rollup.record(1, "reports_created", "spam", when=old)
+    rollup.record(2, "checks")
+
+    week = rollup.get_period(1, 7)
+    assert week["totals"]["reports_created"] == 2
+    assert week["by_category"]["spam"]["reports_created"] == 1
+    assert rollup.get_period(1, 30)["totals"]["reports_created"] == 3
+    # Totaux globaux (tous serveurs)
+    assert rollup.get_period(None, 7)["totals"]["checks"] == 1
+    with pytest.raises(ValueError):
+        rollup.record(1, "unknown")
+    await rollup.close()
+
+
+@pytest.mark.asyncio
+async def test_counters_survive_restart_and_are_pushed(tmp_path):
+    push = FakePush()
+    rollup = StatsRollup(str(tmp_path / "aegis.db"), push_deltas=push, flush_interval=60)
+    push.fail = True
+    rollup.record(5, "checks")
+    await rollup.flush()
+    assert rollup.get_stats()["pending_remote"] == 1  # conservé pour le prochain envoi
+
+    push.fail = False
+    rollup.record(5, "checks")
+    await rollup.close()
+    # Une seule ligne cumulée, sans le pseudo-serveur global
+    assert push.calls == [[{"guild_id": 5, "day": datetime.utcnow().date().isoformat(),
+                            "metric": "checks", "category": "", "value": 2}]]
+
+    restarted = StatsRollup(str(tmp_path / "aegis.db"), flush_interval=60)
+    assert await restarted.open() > 0
+    assert restarted.get_period(5, 1)["totals"]["checks"] == 2
+    await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_missing_remote_function_disables_push_visibly(tmp_path):
+    calls = []
+
+    async def push(deltas):
+        calls.append(deltas)
+        raise RemoteStatsDisabled("absente")
+
+    rollup = StatsRollup(str(tmp_path / "aegis.db"), push_deltas=push, flush_interval=60)
+    rollup.record(5, "checks")
+    await rollup.flush()
+    stats = rollup.get_stats()
+    assert stats["remote_disabled"] is True
+    assert stats["pending_remote"] == 0 and stats["failed_pushes"] == 0
+
+    # Plus rien n'est mis en attente pour Supabase, les compteurs locaux continuent
+    rollup.record(5, "checks")
+    await rollup.flush()
+    assert len(calls) == 1
+    assert rollup.get_period(5, 1)["totals"]["checks"] == 2
+    await rollup.close()
+
+
+@pytest.mark.asyncio
+async def test_report_service_records_lifecycle_events(tmp_path):
+    bot_settings.reporter_salt_secret = "a" * 64
+    anonymous_hasher._initialized = False
+    rollup = StatsRollup(None, flush_interval=60)
+    rs = ReportService(db_client=None, rate_limiter=RateLimiter(max_actions=5), rollup=rollup)
+
+    report = await rs.create_report(1, 9, "TUser", "spam", "reason", "")
+    await rs.update_report_status(report.id, "validated", validator_id=2)
+    await rs.update_report_status(report.id, "validated", validator_id=2)
+
+    totals = rollup.get_period(9, 1)["totals"]
+    assert totals["reports_created"] == 1
+    assert totals["reports_validated"] == 1  # pas de double comptage
+    await rollup.close()
+
+
+@pytest.mark.asyncio
+async def test_stats_command_counts_come_from_report_statuses():
+    from types import SimpleNamespace
+    from cogs.admin import AdminCog
+
+    bot_settings.reporter_salt_secret = "a" * 64
+    anonymous_hasher._initialized = False
+    # Compteurs journaliers vides (déploiement): ils ne doivent pas fausser /stats
+    rollup = StatsRollup(None, flush_interval=60)
+    rs = ReportService(db_client=None, rate_limiter=RateLimiter(max_actions=5))
+    first = await rs.create_report(1, 9, "TUser", "spam", "reason", "")
+    await rs.create_report(2, 9, "Other", "spam", "reason", "")
+    await rs.update_report_status(first.id, "validated", validator_id=3)
+
+    cog = AdminCog(SimpleNamespace(report_service=rs, stats_rollup=rollup))
+    assert cog._calculate_stats(9, 7) == {"total": 2, "validated": 1, "pending": 1, "rejected": 0}
+    await rollup.close()
@@ -0,0 +1,330 @@
+"""
+Tests unitaires pour SupabaseClientNew (exécution non bloquante, timeouts).
+"""
+import asyncio
+import time
+
+import pytest
+
+from database.supabase_client_new import SupabaseClientNew
+
+
+class FakeResult:
+    def __init__(self, data=None):
+        self.data = data or []
+
+
+class FakeQuery:
+    """Requête factice imitant le builder synchrone du SDK supabase"""
+
+    def __init__(self, data=None, delay: float = 0.0):
+        self.data = data
+        self.delay = delay
+
+    def __getattr__(self, name):
+        # select / eq / limit / insert ... renvoient la même requête
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        time.sleep(self.delay)
+        return FakeResult(self.data)
+
+
+class FakeClient:
+    def __init__(self, data=None, delay: float = 0.0, rpc_data=None):
+        self.data = data
+        self.delay = delay
+        self.rpc_data = rpc_data
+        self.tables = []
+        self.rpcs = []
+
+    def table(self, name):
+        self.tables.append(name)
+        return FakeQuery(self.data, self.delay)
+
+    def rpc(self, name, params):
+        self.rpcs.append(name)
+        if self.rpc_data is None:
+            raise Exception("PGRST202: Could not find the function public.%s" % name)
+        return FakeQuery(self.rpc_data, self.delay)
+
+
+@pytest.mark.asyncio
+async def test_execute_does_not_block_event_loop():
+    db = SupabaseClientNew(max_concurrency=2, timeout=5)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    await asyncio.gather(db._execute(FakeQuery(delay=0.2)), ticker())
+    # Le ticker a progressé pendant la requête "lente"
+    assert ticks == 5
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_execute_timeout_raises():
+    db = SupabaseClientNew(max_concurrency=1, timeout=0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        await db._execute(FakeQuery(delay=0.3))
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_check_user_timeout_returns_none():
+    db = SupabaseClientNew(max_concurrency=1, timeout=0.05)
+    db.client = FakeClient(delay=0.3)
+    db.is_connected = True
+    assert await db.check_user(1, 2) is None
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_check_user_clean_user():
+    db = SupabaseClientNew(max_concurrency=2, timeout=5)
+    db.client = FakeClient(data=[])
+    db.is_connected = True
+    result = await db.check_user(1, 2)
+    assert result["is_flagged"] is False
+    assert result["risk_level"] == "clean"
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_check_user_uses_single_rpc():
+    summary = {
+        "user": {"user_id": 1, "total_flags": 2, "active_flags": 1, "risk_level": "high"},
+        "reports": [{"id": "r1", "category": "spam", "reason": "x"}]
+    }
+    db = SupabaseClientNew(max_concurrency=2, timeout=5)
+    db.client = FakeClient(data=[], rpc_data=summary)
+    db.is_connected = True
+
+    result = await db.check_user(1, 2)
+    assert result["is_flagged"] is True
+    assert result["risk_level"] == "high"
+    assert result["reports"] == summary["reports"]
+    assert db.client.rpcs == ["check_user_summary"]
+    # Seul le log d'activité (en arrière-plan) touche une table
+    await db.close()
+    assert db.client.tables == ["activity"]
+
+
+@pytest.mark.asyncio
+async def test_check_user_falls_back_without_rpc():
+    db = SupabaseClientNew(max_concurrency=2, timeout=5)
+    db.client = FakeClient(data=[])
+    db.is_connected = True
+
+    assert (await db.check_user(1, 2))["is_flagged"] is False
+    assert db._summary_rpc_available is False
+    # Plus de tentative RPC ensuite
+    await db.check_user(1, 2)
+    assert db.client.rpcs == ["check_user_summary"]
+    await db.close()
+
+
+class CountingQuery:
+    """Requête enregistrant ses filtres; renvoie un comptage selon validated_at"""
+
+    def __init__(self, table, log, counts):
+        self.table = table
+        self.log = log
+        self.counts = counts
+        self.calls = []
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return method
+
+    def execute(self):
+        self.log.append((self.table, self.calls))
+        result = FakeResult()
+        since = any(name == "gte" for name, _, _ in self.calls)
+        result.count = self.counts["active" if since else "total"]
+        return result
+
+
+@pytest.mark.asyncio
+async def test_update_user_flags_uses_exact_counts():
+    log = []
+
+    class Client:
+        def table(self, name):
+            return CountingQuery(name, log, {"total": 7, "active": 2})
+
+    db = SupabaseClientNew(max_concurrency=2, timeout=5)
+    db.client = Client()
+    db.is_connected = True
+    await db._update_user_flags(1, "Target", "Guild")
+
+    selects = [calls for table, calls in log if table == "reports"]
+    assert len(selects) == 2
+    # Comptage côté serveur, sans télécharger les lignes
+    assert all(("select", ("id",), {"count": "exact", "head": True}) in calls for calls in selects)
+
+    upsert = next(calls for table, calls in log if table == "users")
+    user_data = upsert[0][1][0]
+    assert user_data["total_flags"] == 7
+    assert user_data["active_flags"] == 2
+    assert user_data["risk_level"] == "medium"
+    assert user_data["expires_at"]
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_fallback_applies_flag_expiry_at_read_time():
+    log = []
+    stale = {"user_id": 1, "total_flags": 1, "active_flags": 1, "risk_level": "low", "expires_at": "2020-01-01"}
+
+    class UserQuery(CountingQuery):
+        def execute(self):
+            result = super().execute()
+            result.data = [stale] if self.table == "users" else []
+            return result
+
+    class Client:
+        def table(self, name):
+            return UserQuery(name, log, {"total": 1, "active": 0})
+
+    db = SupabaseClientNew(max_concurrency=2, timeout=5)
+    db.client = Client()
+    db.is_connected = True
+    db._summary_rpc_available = False
+
+    user, _ = await db._fetch_user_summary(1, 5)
+    # Flag validé il y a plus de FLAG_EXPIRY_DAYS jours: plus actif
+    assert user["active_flags"] == 0 and user["risk_level"] == "clean"
+    assert user["total_flags"] == 1
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_guild_stats_are_aggregated_server_side():
+    summary = {
+        "server": {"guild_id": 5, "total_reports": 3, "total_checks": 10, "flags_found": 1},
+        "activity": {"check": 10, "report": 3}
+    }
+    db = SupabaseClientNew(max_concurrency=2, timeout=5)
+    db.client = FakeClient(rpc_data=summary)
+    db.is_connected = True
+
+    stats = await db.get_guild_stats(5, days=7)
+    assert stats["recent_activity"] == {"check": 10, "report": 3}
+    assert stats["total_checks"] == 10
+    assert db.client.rpcs == ["guild_stats_summary"]
+    assert db.client.tables == []
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_validate_report_is_a_single_round_trip():
+    report = {"id": "uuid-1", "guild_id": 5, "guild_name": "G", "target_user_id": 9,
+              "total_flags": 2, "active_flags": 1, "risk_level": "low"}
+    db = SupabaseClientNew(max_concurrency=2, timeout=5)
+    db.client = FakeClient(rpc_data=report)
+    db.is_connected = True
+
+    ok = await db.validate_report("uuid-1", 42, "validated")
+    assert ok is True
+    assert db.client.rpcs == ["validate_report_and_flags"]
+    # Statut et flags traités par la fonction SQL: aucune requête de table directe
+    assert "reports" not in db.client.tables
+    assert "users" not in db.client.tables
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_update_report_falls_back_on_uniqueness_hash():
+    class Report:
+        status = "rejected"
+        validated_by = 42
+        uniqueness_hash = "h" * 64
+        metadata = {}
+
+    filters = []
+
+    class RecordingQuery(FakeQuery):
+        def eq(self, column, value):
+            filters.append((column, value))
+            return self
+
+    class Client(FakeClient):
+        def table(self, name):
+            self.tables.append(name)
+            # Rejet d'un signalement sans cible connue: pas de recalcul des flags
+            return RecordingQuery([{"id": "uuid-1", "guild_id": 5, "guild_name": "G", "target_user_id": 0}])
+
+    db = SupabaseClientNew(max_concurrency=2, timeout=5)
+    db.client = Client()
+    db.is_connected = True
+
+    assert await db.update_report(Report()) is True
+    assert db._validate_rpc_available is False
+    # Le signalement est retrouvé par son hash (l'ID local n'est pas un ID Supabase)
+    assert filters[0] == ("uniqueness_hash", "h" * 64)
+    assert db.client.tables.count("reports") == 1
+    await db.close()
+
+
+def test_missing_function_detection_is_strict():
+    class APIError(Exception):
+        def __init__(self, message, code=None):
+            super().__init__(message)
+            self.code = code
+
+    assert SupabaseClientNew._is_missing_function(APIError("not found", code="PGRST202"), "check_user_summary")
+    assert SupabaseClientNew._is_missing_function(
+        Exception("404: Could not find the function public.check_user_summary"), "check_user_summary"
+    )
+    # Erreur d'exécution dans la fonction: le chemin RPC ne doit pas être désactivé
+    runtime = APIError('division by zero (PL/pgSQL function check_user_summary line 12)', code="22012")
+    assert not SupabaseClientNew._is_missing_function(runtime, "check_user_summary")
+
+
+@pytest.mark.asyncio
+async def test_summary_rpc_stays_enabled_on_runtime_error():
+    class Client(FakeClient):
+        def rpc(self, name, params):
+            self.rpcs.append(name)
+            raise Exception("PL/pgSQL function check_user_summary(bigint,integer) line 5: timeout")
+
+    db = SupabaseClientNew(max_concurrency=2, timeout=5)
+    db.client = Client()
+    db.is_connected = True
+
+    with pytest.raises(Exception):
+        await db._fetch_user_summary(1, 10)
+    assert db._summary_rpc_available is True
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_uniqueness_hashes_are_paged_in_stable_order():
+    log = []
+
+    class PageQuery(CountingQuery):
+        def execute(self):
+            result = super().execute()
+            start, end = next(args for name, args, _ in self.calls if name == "range")
+            result.data = [{"uniqueness_hash": f"h{i}"} for i in range(start, min(end + 1, 5))]
+            return result
+
+    class Client:
+        def table(self, name):
+            return PageQuery(name, log, {"total": 0, "active": 0})
+
+    db = SupabaseClientNew(max_concurrency=2, timeout=5)
+    db.client = Client()
+    db.is_connected = True
+
+    assert await db.load_uniqueness_hashes(page_size=2) == [f"h{i}" for i in range(5)]
+    assert len(log) == 3
+    assert all(("order", ("id",), {}) in calls for _, calls in log)
+    await db.close()
@@ -0,0 +1,87 @@
+"""
+Tests unitaires pour TranslationManager (cache de langue par serveur, t_many).
+"""
+from pathlib import Path
+
+import pytest
+
+import services.guild_service as guild_service_module
+from services.guild_service import GuildService
+from locales.translation_manager import TranslationManager
+
+LOCALES_DIR = str(Path(__file__).resolve().parent.parent / "locales")
+
+
+@pytest.fixture
+def guild_service(tmp_path, monkeypatch):
+    service = GuildService(config_dir=str(tmp_path / "guild_configs"), revalidate_interval=60)
+    monkeypatch.setattr(guild_service_module, "guild_service", service)
+    return service
+
+
+def test_guild_language_is_cached(guild_service):
+    translator = TranslationManager(LOCALES_DIR)
+    guild_service.update_guild_config(1, {"language": "en"})
+
+    assert translator._get_guild_language(1) == "en"
+    reads = guild_service.cache_hits + guild_service.cache_misses
+    translator.t("report_modal_title", 1)
+    translator.t("report_modal_title", 1)
+    # Aucune lecture supplémentaire de la configuration
+    assert guild_service.cache_hits + guild_service.cache_misses == reads
+
+
+def test_language_change_invalidates_cache(guild_service):
+    translator = TranslationManager(LOCALES_DIR)
+    guild_service.update_guild_config(1, {"language": "en"})
+    english = translator.t("report_modal_title", 1)
+
+    guild_service.set_guild_language(1, "fr")
+    french = translator.t("report_modal_title", 1)
+
+    assert translator._get_guild_language(1) == "fr"
+    assert english != french
+
+
+def test_t_many_matches_t(guild_service):
+    translator = TranslationManager(LOCALES_DIR)
+    guild_service.update_guild_config(1, {"language": "fr"})
+    keys = ["report_modal_title", "category_spam", "missing_key_for_test"]
+
+    texts = translator.t_many(keys, 1, fallbacks={"missing_key_for_test": "fallback"})
+
+    assert texts["report_modal_title"] == translator.t("report_modal_title", 1)
+    assert texts["category_spam"] == translator.t("category_spam", 1)
+    assert texts["missing_key_for_test"] == "fallback"
+
+
+def test_catalog_merges_default_language_fallback(guild_service):
+    translator = TranslationManager(LOCALES_DIR)
+    translator.add_translation("en", "only_in_default_for_test", "Default text")
+
+    catalog = translator.catalog(language="fr")
+    assert catalog.language == "fr"
+    assert catalog.get("only_in_default_for_test") == "Default text"
+
+
+def test_catalog_formats_templates(guild_service):
+    translator = TranslationManager(LOCALES_DIR)
+    translator.add_translation("en", "greeting_for_test", "Hello {name}")
+    catalog = translator.catalog(language="en")
+
+    assert catalog.get("greeting_for_test", name="Aegis") == "Hello Aegis"
+    # Variable manquante: texte brut retourné
+    assert catalog.get("greeting_for_test", other="x") == "Hello {name}"
+    # Sans variables: texte brut comme t()
+    assert catalog.get("greeting_for_test") == translator.t("greeting_for_test", language="en")
+
+
+def test_catalog_missing_key_is_reported_once(guild_service, caplog):
+    translator = TranslationManager(LOCALES_DIR)
+    catalog = translator.catalog(language="en")
+
+    with caplog.at_level("WARNING", logger="aegis.translations"):
+        assert catalog.get("missing_key_for_test") == "missing_key_for_test"
+        assert catalog.get("missing_key_for_test") == "missing_key_for_test"
+
+    assert sum("missing_key_for_test" in r.message for r in caplog.records) == 1
@@ -0,0 +1,94 @@
+"""
+Tests unitaires pour le cache de détection des doublons.
+"""
+import time
+
+import pytest
+
+from services.report_service import ReportService
+from utils.rate_limiter import RateLimiter
+from utils.uniqueness_cache import UniquenessCache, BloomFilter
+from utils.anonymous_hasher import anonymous_hasher
+from config.bot_config import bot_settings
+from tests.hasher_fixtures import hasher_configured  # noqa: F401 (fixture autouse)
+
+
+class CountingDB:
+    def __init__(self, existing=None):
+        self.existing = existing or {}
+        self.calls = 0
+        self.is_connected = True
+
+    async def check_duplicate_report(self, uniqueness_hash):
+        self.calls += 1
+        return self.existing.get(uniqueness_hash)
+
+    async def load_uniqueness_hashes(self):
+        return list(self.existing)
+
+
+def test_lru_eviction_is_bounded():
+    cache = UniquenessCache(max_size=2)
+    cache.put("a", "R1")
+    cache.put("b", "R2")
+    cache.lookup("a")  # "a" devient le plus récent
+    cache.put("c", "R3")
+
+    assert len(cache) == 2
+    assert cache.lookup("b") == (False, None)
+    assert cache.lookup("a") == (True, "R1")
+    assert cache.evictions == 1
+
+
+def test_negative_results_expire():
+    cache = UniquenessCache(negative_ttl=0.01)
+    cache.put_negative("a")
+    assert cache.lookup("a") == (True, None)
+    time.sleep(0.02)
+    assert cache.lookup("a") == (False, None)
+    assert cache.expirations == 1
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000)
+    keys = [f"hash-{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"other-{i}" in bloom for i in range(1000))
+    assert false_positives < 50
+
+
+@pytest.mark.asyncio
+async def test_negative_lookup_skips_db_on_second_check():
+    db = CountingDB()
+    rs = ReportService(db_client=db, rate_limiter=RateLimiter(max_actions=10))
+
+    assert await rs._check_duplicate_report("unknown") is None
+    assert await rs._check_duplicate_report("unknown") is None
+    assert db.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_db_duplicate_is_cached_and_blocks_report():
+    hasher_hash = anonymous_hasher.generate_report_uniqueness_hash(1, 2, "Target")
+    db = CountingDB({hasher_hash: "DB-REPORT"})
+    rs = ReportService(db_client=db, rate_limiter=RateLimiter(max_actions=10))
+
+    assert await rs.create_report(1, 2, "Target", "spam", "x", "") is None
+    assert await rs._check_duplicate_report(hasher_hash) == "DB-REPORT"
+    assert db.calls == 1
+    assert rs.check_duplicate_by_hash(hasher_hash) is True
+
+
+@pytest.mark.asyncio
+async def test_seeded_bloom_filter_skips_db(monkeypatch):
+    monkeypatch.setattr(bot_settings, "duplicate_bloom_enabled", True)
+    db = CountingDB({"known": "DB-REPORT"})
+    rs = ReportService(db_client=db, rate_limiter=RateLimiter(max_actions=10))
+
+    assert await rs.seed_duplicate_filter() == 1
+    assert await rs._check_duplicate_report("never-seen") is None
+    assert db.calls == 0
+    assert await rs._check_duplicate_report("known") == "DB-REPORT"
+    assert db.calls == 1
@@ -0,0 +1,80 @@
+"""
+Tests unitaires pour la résolution des utilisateurs sans fetch_user superflu.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from utils.user_resolver import UserResolver
+
+
+class FakeClient:
+    def __init__(self, known=None):
+        self.known = known or {}
+        self.fetches = 0
+
+    def get_user(self, user_id):
+        return self.known.get(user_id)
+
+    async def fetch_user(self, user_id):
+        self.fetches += 1
+        await asyncio.sleep(0)
+        return SimpleNamespace(name=f"fetched{user_id}")
+
+
+class FakeGuild:
+    def __init__(self, members):
+        self.members = members
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+
+@pytest.mark.asyncio
+async def test_discord_caches_are_checked_before_fetch_user():
+    client = FakeClient(known={2: SimpleNamespace(name="known")})
+    guild = FakeGuild({1: SimpleNamespace(name="member")})
+    resolver = UserResolver()
+
+    assert await resolver.resolve_name(client, guild, 1) == "member"
+    assert await resolver.resolve_name(client, guild, 2) == "known"
+    assert client.fetches == 0
+    stats = resolver.get_stats()
+    assert stats["member_hits"] == 1 and stats["client_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fetched_users_are_cached_and_concurrent_fetches_coalesced():
+    client = FakeClient()
+    resolver = UserResolver(max_size=2)
+
+    names = await asyncio.gather(*(resolver.resolve_name(client, None, 5) for _ in range(10)))
+    assert names == ["fetched5"] * 10
+    assert client.fetches == 1
+    assert await resolver.resolve_name(client, None, 5) == "fetched5"
+    assert client.fetches == 1
+
+    await resolver.resolve_name(client, None, 6)
+    await resolver.resolve_name(client, None, 7)
+    assert resolver.get_stats()["evictions"] == 1
+    await resolver.resolve_name(client, None, 5)  # évincé: nouvelle requête
+    assert client.fetches == 4
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_coalesced_waiters():
+    client = FakeClient()
+    resolver = UserResolver()
+
+    first = asyncio.create_task(resolver.resolve_name(client, None, 8))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(resolver.resolve_name(client, None, 8))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await waiter == "fetched8"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert client.fetches == 1
+    assert not resolver._inflight
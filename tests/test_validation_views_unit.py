@@ -0,0 +1,41 @@
+"""
+Tests unitaires pour les boutons de validation persistants (custom_id dynamiques).
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from ui.views.validation_views import (
+    ReportValidationView, ReportActionButton, LegacyReportActionButton, report_custom_id
+)
+
+
+def test_view_encodes_report_id_in_custom_ids():
+    view = ReportValidationView("ABC123", guild_id=1)
+    assert view.timeout is None
+    custom_ids = [item.custom_id for item in view.children]
+    assert custom_ids == [report_custom_id(action, "ABC123") for action in ("validate", "reject", "info")]
+    # Chaque custom_id est reconnu par le gestionnaire unique enregistré au démarrage
+    for custom_id in custom_ids:
+        assert ReportActionButton.__discord_ui_compiled_template__.fullmatch(custom_id)
+
+
+@pytest.mark.asyncio
+async def test_from_custom_id_resolves_action_and_report():
+    custom_id = report_custom_id("reject", "XYZ9")
+    match = ReportActionButton.__discord_ui_compiled_template__.fullmatch(custom_id)
+    button = await ReportActionButton.from_custom_id(None, None, match)
+    assert (button.action, button.report_id) == ("reject", "XYZ9")
+
+
+@pytest.mark.asyncio
+async def test_legacy_custom_id_resolves_report_by_thread():
+    report = SimpleNamespace(id="OLD42")
+    service = SimpleNamespace(get_report_by_thread=lambda thread_id: report if thread_id == 77 else None)
+    interaction = SimpleNamespace(client=SimpleNamespace(report_service=service), channel_id=77)
+
+    match = LegacyReportActionButton.__discord_ui_compiled_template__.fullmatch("validate_report")
+    button = await LegacyReportActionButton.from_custom_id(interaction, None, match)
+    assert (button.action, button.report_id) == ("validate", "OLD42")
+    # Le message est migré vers le nouveau format au prochain affichage des boutons
+    assert button.custom_id == report_custom_id("validate", "OLD42")
@@ -7,6 +7,8 @@ from typing import Optional
 
 from config.logging_config import get_logger
 from config.bot_config import REPORT_CATEGORIES
+from utils.member_index import member_index
+from utils.user_resolver import user_resolver
 
 logger = get_logger('ui.report_modals')
 
@@ -19,9 +21,11 @@ class AgisReportModal(Modal):
         self.guild_id = guild_id
         self.bot = bot
         self.translator = translator
+        # Catalogue de la langue du serveur, conservé pour toute l'interaction
+        self.texts = translator.catalog(guild_id)
         
         # Titre du modal traduit
-        title = self.translator.t("report_modal_title", guild_id)
+        title = self.texts.get("report_modal_title")
         super().__init__(title=title, timeout=600)  # 10 minutes
         
         self._create_inputs()
@@ -31,8 +35,8 @@ class AgisReportModal(Modal):
         
         # Champ nom d'utilisateur cible (accepte @mentions, noms, IDs)
         self.target_input = TextInput(
-            label=self.translator.t("report_modal_target_label", self.guild_id),
-            placeholder=self.translator.t("report_modal_target_placeholder", self.guild_id),
+            label=self.texts.get("report_modal_target_label"),
+            placeholder=self.texts.get("report_modal_target_placeholder"),
             required=True,
             max_length=100,  # Augmenté pour les mentions
             style=discord.TextStyle.short
@@ -41,8 +45,8 @@ class AgisReportModal(Modal):
         
         # Champ raison
         self.reason_input = TextInput(
-            label=self.translator.t("report_modal_reason_label", self.guild_id),
-            placeholder=self.translator.t("report_modal_reason_placeholder", self.guild_id),
+            label=self.texts.get("report_modal_reason_label"),
+            placeholder=self.texts.get("report_modal_reason_placeholder"),
             required=True,
             max_length=500,
             style=discord.TextStyle.paragraph
@@ -64,7 +68,7 @@ class AgisReportModal(Modal):
             target_user_data = await self._extract_user_info(interaction, target_raw)
             if not target_user_data:
                 await interaction.response.send_message(
-                    f"❌ {self.translator.t('report_target_invalid', self.guild_id)}",
+                    f"❌ {self.texts.get('report_target_invalid')}",
                     ephemeral=True
                 )
                 return
@@ -97,18 +101,17 @@ class AgisReportModal(Modal):
             
             if not report:
                 # Vérifier si c'est un problème de rate limiting
-                remaining_time = self.bot.rate_limiter.get_remaining_time(
+                remaining_time = await self.bot.rate_limiter.get_remaining_time_async(
                     interaction.user.id, interaction.guild_id
                 )
                 
                 if remaining_time > 0:
-                    error_msg = self.translator.t(
+                    error_msg = self.texts.get(
                         "error_rate_limited", 
-                        self.guild_id,
                         time=remaining_time // 60 + 1  # Minutes
                     )
                 else:
-                    error_msg = self.translator.t("error_database_error", self.guild_id)
+                    error_msg = self.texts.get("error_database_error")
                 
                 await interaction.response.send_message(
                     f"❌ {error_msg}",
@@ -132,7 +135,7 @@ class AgisReportModal(Modal):
             logger.error(f"Erreur lors de la soumission du signalement: {e}")
             
             try:
-                error_msg = self.translator.t("error_database_error", self.guild_id)
+                error_msg = self.texts.get("error_database_error")
                 await interaction.response.send_message(
                     f"❌ {error_msg}",
                     ephemeral=True
@@ -148,10 +151,9 @@ class AgisReportModal(Modal):
             
             # Créer l'embed
             embed = discord.Embed(
-                title=self.translator.t("report_submitted_title", self.guild_id),
-                description=self.translator.t(
+                title=self.texts.get("report_submitted_title"),
+                description=self.texts.get(
                     "report_submitted_description",
-                    self.guild_id,
                     report_id=report.id,
                     target=target,
                     category=category_label
@@ -162,12 +164,12 @@ class AgisReportModal(Modal):
             
             embed.add_field(
                 name="📋 Informations",
-                value=f"**ID**: `{report.id}`\n**Statut**: {self.translator.t('report_status_pending', self.guild_id)}",
+                value=f"**ID**: `{report.id}`\n**Statut**: {self.texts.get('report_status_pending')}",
                 inline=False
             )
             
             embed.set_footer(
-                text=self.translator.t('report_footer_review', self.guild_id),
+                text=self.texts.get('report_footer_review'),
                 icon_url=interaction.user.display_avatar.url
             )
             
@@ -186,7 +188,7 @@ class AgisReportModal(Modal):
         try:
             if not interaction.response.is_done():
                 await interaction.response.send_message(
-                    self.translator.t('error_report_processing', self.guild_id),
+                    self.texts.get('error_report_processing'),
                     ephemeral=True
                 )
         except:
@@ -238,9 +240,12 @@ class AgisReportModal(Modal):
                 inline=True
             )
             
+            # Décompte des votes (quorum du serveur), mis à jour à chaque vote
+            from ui.views.validation_views import VOTES_FIELD_NAME, votes_field_value
+            thresholds = self.bot.report_service.get_validation_thresholds(interaction.guild_id)
             embed.add_field(
-                name="👥 Validations",
-                value="0 / 2",
+                name=VOTES_FIELD_NAME,
+                value=votes_field_value(report, thresholds["min_validators"]),
                 inline=True
             )
             
@@ -264,8 +269,8 @@ class AgisReportModal(Modal):
             # Récupérer le thread créé
             thread = thread_with_message.thread
             
-            # Sauvegarder l'ID du thread
-            report.thread_id = thread.id
+            # Sauvegarder l'ID du thread (persisté pour le transfert des MP)
+            await self.bot.report_service.set_report_thread(report.id, thread.id)
             
             logger.info(f"Post forum créé: {thread.id} pour signalement {report.id}")
             
@@ -337,35 +342,20 @@ class AgisReportModal(Modal):
             target_input = target_input.strip()
             
             # 1. Vérifier si c'est une mention (<@123456789> ou <@!123456789>)
+            # 2. Ou un ID numérique pur
             mention_match = re.match(r'<@!?(\d+)>', target_input)
-            if mention_match:
-                user_id = int(mention_match.group(1))
-                try:
-                    user = await interaction.client.fetch_user(user_id)
-                    return (user.name, user_id)
-                except:
-                    return (f"Unknown#{user_id}", user_id)
-            
-            # 2. Vérifier si c'est un ID numérique pur
-            if target_input.isdigit():
-                user_id = int(target_input)
-                try:
-                    user = await interaction.client.fetch_user(user_id)
-                    return (user.name, user_id)
-                except:
-                    return (f"Unknown#{user_id}", user_id)
-            
-            # 3. Chercher par nom dans le serveur
+            if mention_match or target_input.isdigit():
+                user_id = int(mention_match.group(1) if mention_match else target_input)
+                # Cache du serveur et du bot d'abord: fetch_user seulement en dernier recours
+                username = await user_resolver.resolve_name(interaction.client, interaction.guild, user_id)
+                return (username or f"Unknown#{user_id}", user_id)
+            
+            # 3. Chercher par nom dans le serveur (exact puis partiel, via l'index des membres)
             if interaction.guild:
-                # Chercher par nom exact
-                for member in interaction.guild.members:
-                    if member.name.lower() == target_input.lower() or member.display_name.lower() == target_input.lower():
-                        return (member.name, member.id)
-                
-                # Chercher par nom partiel si pas trouvé
-                for member in interaction.guild.members:
-                    if target_input.lower() in member.name.lower() or target_input.lower() in member.display_name.lower():
-                        return (member.name, member.id)
+                member_id = member_index.find_member_id(interaction.guild, target_input)
+                member = interaction.guild.get_member(member_id) if member_id else None
+                if member:
+                    return (member.name, member.id)
             
             # 4. Si aucune correspondance, traiter comme nom d'utilisateur (sans ID)
             if len(target_input) >= 2 and len(target_input) <= 32:
@@ -2,7 +2,7 @@
 Vues Discord pour les signalements
 """
 import discord
-from discord.ui import View, Select, Button
+from discord.ui import View, Select
 from typing import Optional
 
 from config.logging_config import get_logger
@@ -11,6 +11,24 @@ from config.bot_config import REPORT_CATEGORIES
 logger = get_logger('ui.report_views')
 
 
+def category_translation_keys() -> list:
+    """Clés de traduction (label + description) de toutes les catégories"""
+    keys = []
+    for category_id in REPORT_CATEGORIES:
+        keys.append(f"category_{category_id}")
+        keys.append(f"category_{category_id}_description")
+    return keys
+
+
+def category_fallbacks() -> dict:
+    """Textes par défaut des catégories si la traduction est absente"""
+    fallbacks = {}
+    for category_id, category_data in REPORT_CATEGORIES.items():
+        fallbacks[f"category_{category_id}"] = category_data['label']
+        fallbacks[f"category_{category_id}_description"] = category_data['description']
+    return fallbacks
+
+
 class CategorySelectView(View):
     """Vue pour sélectionner une catégorie de signalement"""
     
@@ -27,14 +45,17 @@ class CategorySelectView(View):
         """Créer le menu de sélection des catégories"""
         options = []
         
-        for category_id, category_data in REPORT_CATEGORIES.items():
-            # Traduire le label et la description
-            label_key = f"category_{category_id}"
-            label = self.translator.t(label_key, self.guild_id, fallback=category_data['label'])
-            
-            # Traduire la description aussi
-            desc_key = f"category_{category_id}_description"
-            description = self.translator.t(desc_key, self.guild_id, fallback=category_data['description'])
+        # Résoudre la langue une seule fois pour toutes les catégories
+        texts = self.translator.t_many(
+            ["category_select_placeholder"] + category_translation_keys(),
+            self.guild_id,
+            fallbacks=category_fallbacks()
+        )
+        
+        for category_id in REPORT_CATEGORIES:
+            # Label et description traduits
+            label = texts[f"category_{category_id}"]
+            description = texts[f"category_{category_id}_description"]
             
             option = discord.SelectOption(
                 label=label,
@@ -45,7 +66,7 @@ class CategorySelectView(View):
             options.append(option)
         
         # Créer le select avec les options (placeholder traduit)
-        placeholder = self.translator.t("category_select_placeholder", self.guild_id)
+        placeholder = texts["category_select_placeholder"]
         select = CategorySelect(
             placeholder=placeholder,
             options=options,
@@ -120,123 +141,3 @@ class CategorySelect(Select):
                 )
             except:
                 pass  # Éviter les erreurs en cascade
-
-
-class ReportValidationView(View):
-    """Vue pour valider/rejeter un signalement"""
-    
-    def __init__(self, report_id: str, bot, translator, timeout: float = 3600):  # 1h timeout
-        super().__init__(timeout=timeout)
-        self.report_id = report_id
-        self.bot = bot
-        self.translator = translator
-    
-    @discord.ui.button(
-        label="✅ Approuver",
-        style=discord.ButtonStyle.success,
-        custom_id="approve_report"
-    )
-    async def approve_button(self, interaction: discord.Interaction, button: Button):
-        """Bouton pour approuver un signalement"""
-        try:
-            # Vérifier les permissions
-            if not self._check_validation_permissions(interaction):
-                await interaction.response.send_message(
-                    "❌ Vous n'avez pas les permissions pour valider les signalements.",
-                    ephemeral=True
-                )
-                return
-            
-            # Valider le signalement
-            success = await self.bot.report_service.update_report_status(
-                self.report_id,
-                "validated",
-                interaction.user.id
-            )
-            
-            if success:
-                embed = discord.Embed(
-                    title="✅ Signalement Approuvé",
-                    description=f"Le signalement `{self.report_id}` a été approuvé par {interaction.user.mention}",
-                    color=discord.Color.green()
-                )
-                
-                # Désactiver les boutons
-                for item in self.children:
-                    item.disabled = True
-                
-                await interaction.response.edit_message(embed=embed, view=self)
-                
-            else:
-                await interaction.response.send_message(
-                    "❌ Erreur lors de l'approbation du signalement.",
-                    ephemeral=True
-                )
-        
-        except Exception as e:
-            logger.error(f"Erreur lors de l'approbation: {e}")
-            await interaction.response.send_message(
-                "❌ Une erreur s'est produite.",
-                ephemeral=True
-            )
-    
-    @discord.ui.button(
-        label="❌ Rejeter",
-        style=discord.ButtonStyle.danger,
-        custom_id="reject_report"
-    )
-    async def reject_button(self, interaction: discord.Interaction, button: Button):
-        """Bouton pour rejeter un signalement"""
-        try:
-            # Vérifier les permissions
-            if not self._check_validation_permissions(interaction):
-                await interaction.response.send_message(
-                    "❌ Vous n'avez pas les permissions pour valider les signalements.",
-                    ephemeral=True
-                )
-                return
-            
-            # Rejeter le signalement
-            success = await self.bot.report_service.update_report_status(
-                self.report_id,
-                "rejected",
-                interaction.user.id
-            )
-            
-            if success:
-                embed = discord.Embed(
-                    title="❌ Signalement Rejeté",
-                    description=f"Le signalement `{self.report_id}` a été rejeté par {interaction.user.mention}",
-                    color=discord.Color.red()
-                )
-                
-                # Désactiver les boutons
-                for item in self.children:
-                    item.disabled = True
-                
-                await interaction.response.edit_message(embed=embed, view=self)
-                
-            else:
-                await interaction.response.send_message(
-                    "❌ Erreur lors du rejet du signalement.",
-                    ephemeral=True
-                )
-        
-        except Exception as e:
-            logger.error(f"Erreur lors du rejet: {e}")
-            await interaction.response.send_message(
-                "❌ Une erreur s'est produite.",
-                ephemeral=True
-            )
-    
-    def _check_validation_permissions(self, interaction: discord.Interaction) -> bool:
-        """Vérifier si l'utilisateur peut valider des signalements"""
-        # Vérifier les permissions administrateur
-        if interaction.user.guild_permissions.administrator:
-            return True
-        
-        # TODO: Vérifier le rôle validateur configuré
-        # from config.bot_config import bot_settings
-        # validator_role_name = bot_settings.validator_role_name
-        
-        return False
\ No newline at end of file
@@ -1,8 +1,14 @@
 """
 Vues Discord pour la validation des signalements
+
+Les boutons sont des éléments dynamiques persistants: l'ID du signalement est
+encodé dans le custom_id ("aegis:report:<action>:<id>") et un seul gestionnaire
+enregistré au démarrage (AegisBot.setup) retrouve le signalement au clic. Aucune
+vue n'est gardée en mémoire par signalement et les boutons fonctionnent encore
+après un redémarrage.
 """
 import discord
-from discord.ui import View, Button
+from discord.ui import View, Button, DynamicItem
 from typing import Optional
 
 from config.logging_config import get_logger
@@ -11,21 +17,132 @@ from locales.translation_manager import translator
 logger = get_logger('ui.validation_views')
 
 
+# Action -> (libellé, style) des boutons de validation
+REPORT_ACTIONS = {
+    "validate": ("✅ Valider", discord.ButtonStyle.green),
+    "reject": ("❌ Refuser", discord.ButtonStyle.red),
+    "info": ("📋 Plus d'infos", discord.ButtonStyle.secondary)
+}
+
+# Anciens custom_id statiques (messages postés avant les boutons dynamiques)
+LEGACY_ACTIONS = {
+    "validate_report": "validate",
+    "reject_report": "reject",
+    "request_more_info": "info"
+}
+
+
+# Champ de l'embed du forum affichant le décompte des votes
+VOTES_FIELD_NAME = "👥 Validations"
+
+
+def report_custom_id(action: str, report_id: str) -> str:
+    """custom_id d'un bouton de validation (100 caractères maximum côté Discord)"""
+    return f"aegis:report:{action}:{report_id}"
+
+
+def votes_field_value(report, required: int) -> str:
+    """Décompte des votes affiché dans l'embed du signalement"""
+    counts = report.metadata.get("vote_counts") or {}
+    return translator.t(
+        "validation_votes_value", report.guild_id,
+        approvals=counts.get("validated", 0), rejections=counts.get("rejected", 0), required=required
+    )
+
+
+async def refresh_votes_field(message: discord.Message, report, required: int):
+    """Mettre à jour le décompte des votes dans le message du forum (une requête)"""
+    if not message.embeds:
+        return
+    embed = message.embeds[0]
+    value = votes_field_value(report, required)
+    for index, field in enumerate(embed.fields):
+        if field.name == VOTES_FIELD_NAME:
+            embed.set_field_at(index, name=field.name, value=value, inline=field.inline)
+            break
+    else:
+        embed.add_field(name=VOTES_FIELD_NAME, value=value, inline=True)
+    await message.edit(embed=embed)
+
+
+async def close_expired_report(client, report):
+    """Afficher l'auto-rejet d'un signalement resté sans consensus dans son post du forum"""
+    if not report.thread_id:
+        return
+    try:
+        hours = client.report_service.get_validation_thresholds(report.guild_id).get("validation_timeout_hours")
+        thread = client.get_channel(report.thread_id) or await client.fetch_channel(report.thread_id)
+        # Le message de départ d'un post de forum a l'ID du thread
+        message = await thread.fetch_message(report.thread_id)
+        
+        embed = discord.Embed(
+            title=translator.t("validation_expired_title", report.guild_id),
+            description=translator.t("validation_expired_description", report.guild_id, report_id=report.id, hours=hours),
+            color=discord.Color.dark_grey()
+        )
+        embed.add_field(name="🏷️ Statut", value="Refusé ❌", inline=True)
+        embed.timestamp = discord.utils.utcnow()
+        
+        await message.edit(embed=embed, view=ReportValidationView(report.id, report.guild_id, disabled=True))
+    except Exception as e:
+        logger.debug(f"Affichage de l'auto-rejet impossible pour {report.id}: {e}")
+
+
 class ReportValidationView(View):
-    """Vue avec boutons de validation pour les signalements"""
+    """Vue avec boutons de validation pour les signalements (entièrement dynamique, jamais stockée)"""
     
-    def __init__(self, report_id: str, guild_id: int, timeout: float = None):
-        super().__init__(timeout=timeout)
+    def __init__(self, report_id: str, guild_id: int, disabled: bool = False):
+        super().__init__(timeout=None)
         self.report_id = report_id
         self.guild_id = guild_id
+        for action in REPORT_ACTIONS:
+            button = ReportActionButton(action, report_id)
+            button.item.disabled = disabled
+            self.add_item(button)
+
+
+class ReportActionButton(DynamicItem[Button], template=r"aegis:report:(?P<action>validate|reject|info):(?P<report_id>[A-Za-z0-9_-]*)"):
+    """Bouton de validation persistant, résolu depuis son custom_id à chaque clic"""
     
-    @discord.ui.button(
-        label="✅ Valider", 
-        style=discord.ButtonStyle.green, 
-        custom_id="validate_report"
-    )
-    async def validate_report(self, interaction: discord.Interaction, button: Button):
-        """Valider le signalement"""
+    def __init__(self, action: str, report_id: str):
+        label, style = REPORT_ACTIONS[action]
+        super().__init__(Button(label=label, style=style, custom_id=report_custom_id(action, report_id)))
+        self.action = action
+        self.report_id = report_id
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: Button, match):
+        return cls(match["action"], match["report_id"])
+    
+    async def callback(self, interaction: discord.Interaction):
+        handlers = {
+            "validate": self.validate_report,
+            "reject": self.reject_report,
+            "info": self.request_more_info
+        }
+        await handlers[self.action](interaction)
+    
+    def _closed_view(self, interaction: discord.Interaction) -> ReportValidationView:
+        """Boutons désactivés après la décision (vue dynamique: rien n'est gardé en mémoire)"""
+        return ReportValidationView(self.report_id, interaction.guild_id, disabled=True)
+    
+    async def validate_report(self, interaction: discord.Interaction):
+        """Voter pour la validation du signalement"""
+        await self._vote(interaction, "validated")
+    
+    async def reject_report(self, interaction: discord.Interaction):
+        """Voter pour le refus du signalement"""
+        await self._vote(interaction, "rejected")
+    
+    async def _vote(self, interaction: discord.Interaction, decision: str):
+        """
+        Enregistrer le vote du validateur
+        
+        Le signalement n'est clos qu'une fois le quorum du serveur atteint; en
+        attendant, le décompte du message est mis à jour avec anti-rebond (une
+        seule modification pour plusieurs votes rapprochés).
+        """
+        error_key = "validation_error_validation_failed" if decision == "validated" else "validation_error_reject_failed"
         try:
             # Vérifier les permissions
             if not self._check_validator_permissions(interaction):
@@ -35,189 +152,89 @@ class ReportValidationView(View):
                 )
                 return
             
-            # Récupérer le signalement
-            if hasattr(interaction.client, 'report_service'):
-                report = await interaction.client.report_service.get_report(self.report_id)
-                
-                if not report:
-                    await interaction.response.send_message(
-                        "❌ Signalement non trouvé.",
-                        ephemeral=True
-                    )
-                    return
-                
-                # Valider le signalement
-                success = await interaction.client.report_service.update_report_status(
-                    self.report_id, 
-                    "validated", 
-                    validator_id=interaction.user.id
-                )
-                
-                if success:
-                    # Sauvegarder dans Supabase si connecté
-                    if hasattr(interaction.client.report_service, 'db') and interaction.client.report_service.db:
-                        try:
-                            # Ajouter à Supabase (niveau calculé automatiquement maintenant)
-                            result = await interaction.client.report_service.db.add_validated_report(
-                                user_id=report.target_user_id or 0,  # Utilise l'ID si disponible
-                                username=report.target_username,
-                                reason=report.reason,
-                                category=report.category,
-                                guild_id=interaction.guild_id,
-                                guild_name=interaction.guild.name
-                            )
-                            
-                            if result.get("success"):
-                                logger.info(f"Signalement {self.report_id} sauvé dans Supabase - "
-                                          f"Nouveau niveau: {result['new_level']} "
-                                          f"({result['new_active_flags']} flags actifs)")
-                            else:
-                                logger.error(f"Échec sauvegarde Supabase: {result.get('error')}")
-                        except Exception as e:
-                            logger.error(f"Erreur sauvegarde Supabase: {e}")
-                    
-                    # Envoyer feedback à l'utilisateur
-                    await self._send_validation_feedback(interaction, report, "validated")
-                    
-                    # Créer l'embed de validation
-                    embed = discord.Embed(
-                        title="✅ Signalement Validé",
-                        description=f"Signalement **#{self.report_id}** validé par {interaction.user.mention}",
-                        color=discord.Color.green()
-                    )
-                    
-                    embed.add_field(
-                        name="🏷️ Statut",
-                        value="Validé ✅",
-                        inline=True
-                    )
-                    
-                    embed.add_field(
-                        name="👤 Validé par",
-                        value=interaction.user.mention,
-                        inline=True
-                    )
-                    
-                    embed.timestamp = interaction.created_at
-                    
-                    # Désactiver les boutons
-                    for item in self.children:
-                        item.disabled = True
-                    
-                    # Modifier le message original
-                    await interaction.response.edit_message(
-                        embed=embed,
-                        view=self
-                    )
-                    
-                    logger.info(f"Signalement {self.report_id} validé par {interaction.user}")
-                    
-                    # TODO: Appliquer les actions automatiques selon la configuration
-                    
-                else:
-                    await interaction.response.send_message(
-                        translator.t("validation_error_validation_failed", interaction.guild_id),
-                        ephemeral=True
-                    )
+            report_service = getattr(interaction.client, 'report_service', None)
+            if not report_service:
+                return
             
-        except Exception as e:
-            logger.error(f"Erreur validation signalement {self.report_id}: {e}")
-            await interaction.response.send_message(
-                translator.t("validation_error_validation_failed", interaction.guild_id),
-                ephemeral=True
-            )
-    
-    @discord.ui.button(
-        label="❌ Refuser", 
-        style=discord.ButtonStyle.red, 
-        custom_id="reject_report"
-    )
-    async def reject_report(self, interaction: discord.Interaction, button: Button):
-        """Refuser le signalement"""
-        try:
-            # Vérifier les permissions
-            if not self._check_validator_permissions(interaction):
+            outcome = await report_service.record_vote(self.report_id, interaction.user.id, decision)
+            if outcome is None:
                 await interaction.response.send_message(
-                    "❌ Vous n'avez pas la permission de refuser les signalements.",
+                    translator.t("validation_error_report_not_found", interaction.guild_id),
                     ephemeral=True
                 )
                 return
             
-            # Récupérer le signalement
-            if hasattr(interaction.client, 'report_service'):
-                report = await interaction.client.report_service.get_report(self.report_id)
-                
-                if not report:
+            if not outcome.decided:
+                if outcome.status != "pending":
                     await interaction.response.send_message(
-                        "❌ Signalement non trouvé.",
+                        translator.t("validation_vote_already_closed", interaction.guild_id),
                         ephemeral=True
                     )
                     return
                 
-                # Refuser le signalement
-                success = await interaction.client.report_service.update_report_status(
-                    self.report_id, 
-                    "rejected", 
-                    validator_id=interaction.user.id
+                await interaction.response.send_message(
+                    translator.t(
+                        "validation_vote_recorded", interaction.guild_id,
+                        approvals=outcome.approvals, rejections=outcome.rejections, required=outcome.required
+                    ),
+                    ephemeral=True
                 )
-                
-                if success:
-                    # Envoyer feedback à l'utilisateur
-                    await self._send_validation_feedback(interaction, report, "rejected")
-                    
-                    # Créer l'embed de rejet
-                    embed = discord.Embed(
-                        title="❌ Signalement Refusé",
-                        description=f"Signalement **#{self.report_id}** refusé par {interaction.user.mention}",
-                        color=discord.Color.red()
-                    )
-                    
-                    embed.add_field(
-                        name="🏷️ Statut",
-                        value="Refusé ❌",
-                        inline=True
-                    )
-                    
-                    embed.add_field(
-                        name="👤 Refusé par",
-                        value=interaction.user.mention,
-                        inline=True
-                    )
-                    
-                    embed.timestamp = interaction.created_at
-                    
-                    # Désactiver les boutons
-                    for item in self.children:
-                        item.disabled = True
-                    
-                    # Modifier le message original
-                    await interaction.response.edit_message(
-                        embed=embed,
-                        view=self
-                    )
-                    
-                    logger.info(f"Signalement {self.report_id} refusé par {interaction.user}")
-                    
-                else:
-                    await interaction.response.send_message(
-                        "❌ Erreur lors du refus.",
-                        ephemeral=True
+                if outcome.changed and interaction.message is not None:
+                    message = interaction.message
+                    report_service.schedule_vote_refresh(
+                        self.report_id,
+                        lambda report: refresh_votes_field(message, report, outcome.required)
                     )
+                return
+            
+            # Quorum atteint: modifier le message original (boutons désactivés)
+            await interaction.response.edit_message(
+                embed=self._decision_embed(interaction, outcome.status),
+                view=self._closed_view(interaction)
+            )
+            logger.info(f"Signalement {self.report_id} {outcome.status} (quorum atteint par {interaction.user})")
+            
+            # Envoyer feedback à l'utilisateur
+            report = await report_service.get_report(self.report_id)
+            if report:
+                await self._send_validation_feedback(interaction, report, outcome.status)
+            
+            # TODO: Appliquer les actions automatiques selon la configuration
             
         except Exception as e:
-            logger.error(f"Erreur refus signalement {self.report_id}: {e}")
-            await interaction.response.send_message(
-                "❌ Erreur lors du refus.",
-                ephemeral=True
+            logger.error(f"Erreur vote {decision} signalement {self.report_id}: {e}")
+            if not interaction.response.is_done():
+                await interaction.response.send_message(
+                    translator.t(error_key, interaction.guild_id),
+                    ephemeral=True
+                )
+    
+    def _decision_embed(self, interaction: discord.Interaction, status: str) -> discord.Embed:
+        """Embed affiché une fois le signalement validé ou refusé"""
+        if status == "validated":
+            embed = discord.Embed(
+                title="✅ Signalement Validé",
+                description=f"Signalement **#{self.report_id}** validé par {interaction.user.mention}",
+                color=discord.Color.green()
+            )
+            embed.add_field(name="🏷️ Statut", value="Validé ✅", inline=True)
+            embed.add_field(name="👤 Validé par", value=interaction.user.mention, inline=True)
+        else:
+            embed = discord.Embed(
+                title="❌ Signalement Refusé",
+                description=f"Signalement **#{self.report_id}** refusé par {interaction.user.mention}",
+                color=discord.Color.red()
             )
+            embed.add_field(name="🏷️ Statut", value="Refusé ❌", inline=True)
+            embed.add_field(name="👤 Refusé par", value=interaction.user.mention, inline=True)
+        
+        embed.timestamp = interaction.created_at
+        return embed
     
-    @discord.ui.button(
-        label="📋 Plus d'infos", 
-        style=discord.ButtonStyle.secondary, 
-        custom_id="request_more_info"
-    )
-    async def request_more_info(self, interaction: discord.Interaction, button: Button):
+    async def request_more_info(self, interaction: discord.Interaction):
         """Demander plus d'informations"""
+        texts = translator.catalog(interaction.guild_id)
+        
         try:
             # Vérifier les permissions
             if not self._check_validator_permissions(interaction):
@@ -244,31 +261,31 @@ class ReportValidationView(View):
                     
                     # Envoyer un MP demandant plus d'infos
                     embed = discord.Embed(
-                        title=translator.t("validation_more_info_title", interaction.guild_id),
-                        description=translator.t("validation_more_info_description", interaction.guild_id, guild_name=interaction.guild.name, report_id=self.report_id),
+                        title=texts.get("validation_more_info_title"),
+                        description=texts.get("validation_more_info_description", guild_name=interaction.guild.name, report_id=self.report_id),
                         color=discord.Color.blue()
                     )
                     
                     embed.add_field(
-                        name=translator.t("validation_more_info_initial_report", interaction.guild_id),
+                        name=texts.get("validation_more_info_initial_report"),
                         value=f"**Utilisateur signalé:** `{report.target_username}`\n**Catégorie:** {report.category}\n**Raison:** {report.reason}",
                         inline=False
                     )
                     
                     embed.add_field(
-                        name=translator.t("validation_more_info_request", interaction.guild_id),
-                        value=translator.t("validation_more_info_request_text", interaction.guild_id),
+                        name=texts.get("validation_more_info_request"),
+                        value=texts.get("validation_more_info_request_text"),
                         inline=False
                     )
                     
                     embed.add_field(
-                        name=translator.t("validation_more_info_how_to_respond", interaction.guild_id),
-                        value=translator.t("validation_more_info_how_to_respond_text", interaction.guild_id),
+                        name=texts.get("validation_more_info_how_to_respond"),
+                        value=texts.get("validation_more_info_how_to_respond_text"),
                         inline=False
                     )
                     
                     embed.set_footer(
-                        text=translator.t("validation_more_info_requested_by", interaction.guild_id),
+                        text=texts.get("validation_more_info_requested_by"),
                         icon_url=interaction.guild.icon.url if interaction.guild.icon else None
                     )
                     
@@ -276,14 +293,14 @@ class ReportValidationView(View):
                     
                     # Confirmer l'envoi (sans révéler l'identité du reporter)
                     await interaction.response.send_message(
-                        translator.t("validation_more_info_sent_success", interaction.guild_id),
+                        texts.get("validation_more_info_sent_success"),
                         ephemeral=True
                     )
                     
                     # Ajouter un message dans le thread
                     embed_thread = discord.Embed(
-                        title=translator.t("validation_more_info_thread_title", interaction.guild_id),
-                        description=translator.t("validation_more_info_thread_description", interaction.guild_id, user_mention=interaction.user.mention),
+                        title=texts.get("validation_more_info_thread_title"),
+                        description=texts.get("validation_more_info_thread_description", user_mention=interaction.user.mention),
                         color=discord.Color.blue()
                     )
                     
@@ -293,13 +310,13 @@ class ReportValidationView(View):
                     
                 except discord.Forbidden:
                     await interaction.response.send_message(
-                        translator.t("validation_more_info_dm_closed_error", interaction.guild_id),
+                        texts.get("validation_more_info_dm_closed_error"),
                         ephemeral=True
                     )
                 except Exception as e:
                     logger.error(f"Erreur envoi demande infos: {e}")
                     await interaction.response.send_message(
-                        translator.t("validation_more_info_send_error", interaction.guild_id),
+                        texts.get("validation_more_info_send_error"),
                         ephemeral=True
                     )
             
@@ -348,8 +365,9 @@ class ReportValidationView(View):
                 auto_actions = config.get('auto_actions', {})
                 
                 # Calculer le niveau basé sur les signalements validés
-                user_reports = [r for r in interaction.client.report_service.active_reports.values() 
-                              if r.target_username.lower() == report.target_username.lower() and r.status == "validated"]
+                user_reports = interaction.client.report_service.get_reports_for_target(
+                    usernames=(report.target_username,), status="validated"
+                )
                 validated_count = len(user_reports)
                 
                 if validated_count >= 3:
@@ -420,4 +438,25 @@ class ReportValidationView(View):
         except discord.Forbidden:
             logger.warning(f"Impossible d'envoyer feedback à l'utilisateur {report.reporter_id} (DM fermés)")
         except Exception as e:
-            logger.error(f"Erreur envoi feedback pour signalement {report.id}: {e}")
\ No newline at end of file
+            logger.error(f"Erreur envoi feedback pour signalement {report.id}: {e}")
+
+
+class LegacyReportActionButton(ReportActionButton, template=r"(?P<legacy>validate_report|reject_report|request_more_info)"):
+    """
+    Boutons des messages postés avec les anciens custom_id statiques
+    
+    Le signalement est retrouvé par le thread du forum où le bouton a été cliqué;
+    le clic est traité par un ReportActionButton ordinaire.
+    """
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: Button, match):
+        report_id = ""
+        report_service = getattr(interaction.client, 'report_service', None)
+        if report_service:
+            report = report_service.get_report_by_thread(interaction.channel_id)
+            if report:
+                report_id = report.id
+        # Bouton au nouveau format: le message est migré au prochain affichage des boutons
+        # (ID vide si le thread est inconnu: le clic répond "Signalement non trouvé")
+        return ReportActionButton(LEGACY_ACTIONS[match["legacy"]], report_id)
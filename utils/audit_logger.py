@@ -1,17 +1,32 @@
 """
 Système d'audit log transparent pour les actions de validation
 Enregistre les actions des modérateurs sans exposer les reporters
+
+Les entrées sont mises en mémoire tampon puis écrites par une tâche de fond,
+groupées par fichier (un fichier JSONL par serveur et par mois) et hors de la
+boucle d'événements: une rafale de modération ne bloque pas les interactions
+sur les accès disque. Les fichiers restent ouverts (LRU borné) et le tampon
+est vidé à la fermeture du bot.
 """
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import datetime, timedelta
 from enum import Enum
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import json
+import os
+import time
 from pathlib import Path
 
 from config.logging_config import get_logger
+from config.bot_config import bot_settings
 
 logger = get_logger('audit_logger')
 
+# Politiques de synchronisation disque (fsync) des écritures groupées
+FSYNC_POLICIES = ("always", "interval", "never")
+
 
 class AuditAction(Enum):
     """Types d'actions auditées"""
@@ -26,15 +41,197 @@ class AuditAction(Enum):
 class AuditLogger:
     """Logger d'audit transparent pour les actions de modération"""
     
-    def __init__(self, audit_dir: str = "audit_logs"):
+    def __init__(self, audit_dir: str = "audit_logs", fsync_policy: str = "interval",
+                 flush_interval: float = 1.0, fsync_interval: float = 5.0,
+                 max_open_files: int = 32, max_buffer: int = 1000):
+        """
+        Args:
+            audit_dir: Dossier des fichiers d'audit
+            fsync_policy: always (fsync à chaque écriture groupée), interval (au plus
+                toutes les fsync_interval secondes) ou never (laissé au système)
+            flush_interval: Délai maximum avant l'écriture d'une entrée (secondes)
+            fsync_interval: Délai entre deux fsync avec la politique interval (secondes)
+            max_open_files: Nombre de fichiers gardés ouverts (les moins récents sont fermés)
+            max_buffer: Nombre d'entrées en attente déclenchant une écriture immédiate
+        """
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Politique fsync inconnue: {fsync_policy}")
+        
         self.audit_dir = Path(audit_dir)
         self.audit_dir.mkdir(exist_ok=True)
+        self.fsync_policy = fsync_policy
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_open_files = max(1, max_open_files)
+        self.max_buffer = max(1, max_buffer)
         
-    def _get_audit_file_path(self, guild_id: int) -> Path:
+        # Lignes en attente: (fichier, ligne JSON)
+        self._buffer: List[Tuple[Path, str]] = []
+        # Fichiers ouverts en ajout, du moins au plus récemment utilisé
+        self._handles: "OrderedDict[Path, Any]" = OrderedDict()
+        # Fichiers écrits depuis le dernier fsync
+        self._unsynced: set = set()
+        self._last_fsync = time.monotonic()
+        
+        # Un seul thread: les écritures d'un même fichier restent ordonnées
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audit_writer")
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+        
+        # Métriques
+        self.entries_written = 0
+        self.batches = 0
+        self.fsyncs = 0
+        self.write_errors = 0
+        self.handles_closed = 0
+    
+    def _get_audit_file_path(self, guild_id: int, when: Optional[datetime] = None) -> Path:
         """Obtenir le chemin du fichier d'audit pour un serveur"""
-        date_str = datetime.utcnow().strftime("%Y-%m")
+        date_str = (when or datetime.utcnow()).strftime("%Y-%m")
         return self.audit_dir / f"audit_{guild_id}_{date_str}.jsonl"
     
+    async def _run_sync(self, func, *args):
+        """Exécuter une opération fichier hors de la boucle d'événements"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    def _enqueue(self, path: Path, line: str):
+        """Ajouter une ligne au tampon et réveiller l'écrivain (sans accès disque)"""
+        if self._closed:
+            raise RuntimeError("Audit logger fermé")
+        self._buffer.append((path, line))
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        if len(self._buffer) >= self.max_buffer:
+            self._wake.set()
+    
+    async def _run(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+    
+    def _handle(self, path: Path):
+        handle = self._handles.get(path)
+        if handle is not None:
+            self._handles.move_to_end(path)
+            return handle
+        
+        handle = open(path, "a", encoding="utf-8")
+        self._handles[path] = handle
+        while len(self._handles) > self.max_open_files:
+            old_path, old_handle = self._handles.popitem(last=False)
+            self._close_handle(old_path, old_handle)
+        return handle
+    
+    def _close_handle(self, path: Path, handle):
+        try:
+            handle.flush()
+            if path in self._unsynced and self.fsync_policy != "never":
+                os.fsync(handle.fileno())
+                self.fsyncs += 1
+            handle.close()
+        finally:
+            self._unsynced.discard(path)
+            self.handles_closed += 1
+    
+    def _write_sync(self, groups: Dict[Path, List[str]], force_sync: bool = False,
+                    written: Optional[List[Path]] = None) -> List[Path]:
+        """
+        Écriture groupée: un write + flush par fichier, fsync selon la politique
+        
+        Args:
+            written: Liste complétée au fur et à mesure par les fichiers écrits
+                (connue de l'appelant même si une exception interrompt l'écriture)
+        
+        Returns:
+            Fichiers écrits
+        """
+        written = [] if written is None else written
+        for path, lines in groups.items():
+            handle = self._handle(path)
+            handle.write("".join(lines))
+            handle.flush()
+            self._unsynced.add(path)
+            written.append(path)
+        
+        now = time.monotonic()
+        if self.fsync_policy == "always" or (
+            self.fsync_policy == "interval" and (force_sync or now - self._last_fsync >= self.fsync_interval)
+        ):
+            for path in list(self._unsynced):
+                handle = self._handles.get(path)
+                if handle is not None:
+                    os.fsync(handle.fileno())
+                    self.fsyncs += 1
+            self._unsynced.clear()
+            self._last_fsync = now
+        return written
+    
+    async def flush(self, sync: bool = False) -> int:
+        """
+        Écrire les entrées en attente
+        
+        Args:
+            sync: Forcer un fsync (politique interval)
+            
+        Returns:
+            Nombre d'entrées écrites
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        
+        async with self._flush_lock:
+            if not self._buffer and not (sync and self._unsynced):
+                return 0
+            
+            batch, self._buffer = self._buffer, []
+            groups: Dict[Path, List[str]] = {}
+            for path, line in batch:
+                groups.setdefault(path, []).append(line)
+            
+            written: List[Path] = []
+            try:
+                await self._run_sync(self._write_sync, groups, sync, written)
+            except Exception as e:
+                # Remettre en tête du tampon les seules entrées des fichiers non écrits:
+                # réécrire les autres dupliquerait des lignes
+                self.write_errors += 1
+                done = set(written)
+                remaining = [(path, line) for path, line in batch if path not in done]
+                self._buffer[:0] = remaining
+                count = len(batch) - len(remaining)
+                self.entries_written += count
+                logger.error(f"❌ Erreur écriture audit ({len(remaining)} entrée(s) en attente): {e}")
+                return count
+            
+            self.entries_written += len(batch)
+            self.batches += 1
+            return len(batch)
+    
+    async def close(self):
+        """Arrêter l'écrivain, écrire les entrées restantes et fermer les fichiers"""
+        self._closed = True
+        if self._task is not None and not self._task.done():
+            # Pas d'annulation: une écriture en cours doit se terminer
+            self._wake.set()
+            await self._task
+        await self.flush(sync=True)
+        
+        def _close_all():
+            while self._handles:
+                path, handle = self._handles.popitem(last=False)
+                self._close_handle(path, handle)
+        
+        await self._run_sync(_close_all)
+        self._executor.shutdown(wait=True)
+    
     async def log_action(self, 
                         action: AuditAction,
                         guild_id: int,
@@ -69,11 +266,11 @@ class AuditLogger:
                 "details": details
             }
             
-            # Écrire dans le fichier d'audit (format JSONL pour faciliter le parsing)
-            audit_file = self._get_audit_file_path(guild_id)
-            
-            with open(audit_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps(audit_entry, ensure_ascii=False) + "\n")
+            # Mettre en attente pour l'écrivain (format JSONL pour faciliter le parsing)
+            self._enqueue(
+                self._get_audit_file_path(guild_id),
+                json.dumps(audit_entry, ensure_ascii=False) + "\n"
+            )
             
             logger.info(f"📋 Action auditée: {action.value} par {moderator_name} dans guild {guild_id}")
             return True
@@ -177,6 +374,8 @@ class AuditLogger:
             Liste des entrées d'audit
         """
         try:
+            # Les entrées encore en mémoire doivent apparaître dans l'historique
+            await self.flush()
             audit_entries = []
             
             # Parcourir les fichiers d'audit des derniers mois
@@ -240,9 +439,6 @@ class AuditLogger:
             Statistiques d'activité de modération
         """
         try:
-            # Import local pour éviter les imports circulaires
-            from datetime import timedelta
-            
             # Cette méthode est synchrone pour les statistiques rapides
             stats = {
                 "period_days": days,
@@ -259,7 +455,24 @@ class AuditLogger:
         except Exception as e:
             logger.error(f"❌ Erreur calcul stats audit: {e}")
             return {"error": str(e)}
+    
+    def get_writer_stats(self) -> Dict[str, Any]:
+        """Statistiques de l'écrivain d'audit"""
+        return {
+            'pending': len(self._buffer),
+            'entries_written': self.entries_written,
+            'batches': self.batches,
+            'fsyncs': self.fsyncs,
+            'fsync_policy': self.fsync_policy,
+            'open_files': len(self._handles),
+            'handles_closed': self.handles_closed,
+            'write_errors': self.write_errors
+        }
 
 
 # Instance globale
-audit_logger = AuditLogger()
\ No newline at end of file
+audit_logger = AuditLogger(
+    fsync_policy=bot_settings.audit_fsync_policy,
+    flush_interval=bot_settings.audit_flush_interval,
+    max_open_files=bot_settings.audit_max_open_files
+)
\ No newline at end of file
@@ -0,0 +1,299 @@
+"""
+Index des noms de membres par serveur pour Aegis
+
+Remplace les parcours linéaires de guild.members lors de la résolution d'une
+cible de signalement: correspondance exacte par dictionnaire, correspondance
+partielle par trigrammes (ou par préfixe pour les recherches de moins de 3
+caractères). L'index d'un serveur est construit à la première recherche puis
+maintenu par les événements de membres.
+"""
+import asyncio
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from config.logging_config import get_logger
+
+logger = get_logger('member_index')
+
+GRAM_SIZE = 3
+
+
+def _normalize(name: Optional[str]) -> str:
+    return (name or "").strip().lower()
+
+
+def _grams(name: str) -> Set[str]:
+    return {name[i:i + GRAM_SIZE] for i in range(len(name) - GRAM_SIZE + 1)}
+
+
+class GuildMemberIndex:
+    """Index des noms (name et display_name normalisés) des membres d'un serveur"""
+    
+    def __init__(self):
+        # {member_id: (nom normalisé, display_name normalisé)}
+        self._members: Dict[int, Tuple[str, str]] = {}
+        # {nom normalisé: {member_id}}
+        self._by_name: Dict[str, Set[int]] = {}
+        # {trigramme: [nom normalisé]} (listes: bien plus compactes que des sets)
+        self._by_gram: Dict[str, List[str]] = {}
+        # Noms triés pour la recherche par préfixe
+        self._sorted_names: List[str] = []
+        # Chargement initial: noms ajoutés sans tri, triés une seule fois à la fin
+        self.loading = False
+    
+    def __len__(self) -> int:
+        return len(self._members)
+    
+    def add(self, member_id: int, name: str, display_name: Optional[str] = None):
+        """Ajouter ou mettre à jour un membre"""
+        if member_id in self._members:
+            self.remove(member_id)
+        
+        names = (_normalize(name), _normalize(display_name or name))
+        self._members[member_id] = names
+        for key in set(names):
+            if not key:
+                continue
+            ids = self._by_name.get(key)
+            if ids is None:
+                ids = self._by_name[key] = set()
+                for gram in _grams(key):
+                    self._by_gram.setdefault(gram, []).append(key)
+                if self.loading:
+                    self._sorted_names.append(key)
+                else:
+                    insort(self._sorted_names, key)
+            ids.add(member_id)
+    
+    def remove(self, member_id: int):
+        """Retirer un membre"""
+        names = self._members.pop(member_id, None)
+        if names is None:
+            return
+        
+        for key in set(names):
+            ids = self._by_name.get(key)
+            if ids is None:
+                continue
+            ids.discard(member_id)
+            if not ids:
+                del self._by_name[key]
+                for gram in _grams(key):
+                    keys = self._by_gram.get(gram)
+                    if keys is not None:
+                        keys.remove(key)
+                        if not keys:
+                            del self._by_gram[gram]
+                if self.loading:
+                    self._sorted_names.remove(key)
+                else:
+                    del self._sorted_names[bisect_left(self._sorted_names, key)]
+    
+    def finish_loading(self):
+        """Terminer le chargement initial (tri des noms pour la recherche par préfixe)"""
+        self._sorted_names.sort()
+        self.loading = False
+    
+    def find_exact(self, query: str) -> Set[int]:
+        """Membres dont le nom ou le pseudo est exactement la recherche"""
+        return set(self._by_name.get(_normalize(query), ()))
+    
+    def find_partial(self, query: str) -> List[str]:
+        """
+        Noms contenant la recherche
+        
+        Returns:
+            Noms normalisés, les préfixes d'abord puis par longueur croissante
+        """
+        query = _normalize(query)
+        if not query:
+            return []
+        
+        if len(query) < GRAM_SIZE:
+            # Trop court pour les trigrammes: recherche par préfixe
+            matches = []
+            position = bisect_left(self._sorted_names, query)
+            while position < len(self._sorted_names) and self._sorted_names[position].startswith(query):
+                matches.append(self._sorted_names[position])
+                position += 1
+        else:
+            postings = sorted((self._by_gram.get(gram, ()) for gram in _grams(query)), key=len)
+            if not postings[0]:
+                return []
+            # Intersection en partant de la liste la plus courte
+            candidates = set(postings[0])
+            for keys in postings[1:]:
+                candidates.intersection_update(keys)
+                if not candidates:
+                    return []
+            # Les trigrammes sont nécessaires mais pas suffisants: vérifier la sous-chaîne
+            matches = [key for key in candidates if query in key]
+        
+        return sorted(matches, key=lambda key: (not key.startswith(query), len(key), key))
+    
+    def find(self, query: str) -> Optional[int]:
+        """
+        Résoudre une recherche en ID de membre
+        
+        Correspondance exacte d'abord, puis partielle (préfixe avant sous-chaîne,
+        nom le plus court d'abord). À égalité, le plus petit ID est retenu.
+        """
+        exact = self.find_exact(query)
+        if exact:
+            return min(exact)
+        
+        for key in self.find_partial(query):
+            ids = self._by_name.get(key)
+            if ids:
+                return min(ids)
+        return None
+
+
+class MemberIndex:
+    """
+    Index des membres de tous les serveurs
+    
+    L'index d'un serveur est construit en tâche de fond, par tranches, pour ne
+    pas bloquer la boucle d'événements sur les grands serveurs; en attendant,
+    les recherches utilisent un parcours linéaire. Un ID renvoyé peut viser un
+    membre parti entre-temps: l'appelant vérifie avec guild.get_member().
+    """
+    
+    def __init__(self, chunk_size: int = 1000):
+        self.chunk_size = chunk_size
+        self._guilds: Dict[int, GuildMemberIndex] = {}
+        # Index en cours de construction (reçoivent déjà les événements)
+        self._building: Dict[int, GuildMemberIndex] = {}
+        # Références des constructions en tâche de fond (sinon collectables en cours d'exécution)
+        self._tasks: Set[asyncio.Task] = set()
+        
+        # Métriques
+        self.builds = 0
+        self.lookups = 0
+        self.linear_lookups = 0
+    
+    def is_indexed(self, guild_id: int) -> bool:
+        return guild_id in self._guilds
+    
+    def _start_build(self, guild_id: int) -> GuildMemberIndex:
+        # Enregistré avant toute attente: les événements reçus pendant la construction s'y appliquent
+        index = GuildMemberIndex()
+        index.loading = True
+        self._building[guild_id] = index
+        return index
+    
+    async def build_guild(self, guild, index: Optional[GuildMemberIndex] = None) -> GuildMemberIndex:
+        """
+        Construire l'index d'un serveur depuis sa liste de membres (par tranches)
+        
+        Si le serveur est oublié (drop_guild) pendant la construction, l'index
+        construit n'est pas enregistré.
+        """
+        if index is None:
+            index = self._start_build(guild.id)
+        try:
+            members = list(guild.members)
+            for start in range(0, len(members), self.chunk_size):
+                if self._building.get(guild.id) is not index:
+                    break
+                for member in members[start:start + self.chunk_size]:
+                    index.add(member.id, member.name, member.display_name)
+                # Rendre la main à la boucle entre deux tranches
+                await asyncio.sleep(0)
+            index.finish_loading()
+            if self._building.get(guild.id) is not index:
+                logger.debug(f"Construction de l'index abandonnée pour guild {guild.id} (serveur oublié)")
+                return index
+            self._guilds[guild.id] = index
+            self.builds += 1
+            logger.debug(f"Index des membres construit pour guild {guild.id}: {len(index)} membres")
+            return index
+        finally:
+            if self._building.get(guild.id) is index:
+                del self._building[guild.id]
+    
+    def schedule_build(self, guild):
+        """Lancer la construction de l'index d'un serveur en tâche de fond"""
+        if guild.id not in self._guilds and guild.id not in self._building:
+            task = asyncio.create_task(self.build_guild(guild, self._start_build(guild.id)))
+            self._tasks.add(task)
+            task.add_done_callback(self._build_done)
+    
+    def _build_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"❌ Erreur construction de l'index des membres: {task.exception()}")
+    
+    def find_member_id(self, guild, query: str) -> Optional[int]:
+        """Résoudre un nom tapé en ID de membre du serveur"""
+        self.lookups += 1
+        index = self._guilds.get(guild.id)
+        if index is not None:
+            return index.find(query)
+        
+        # Index pas encore prêt: le construire et répondre par un parcours linéaire
+        self.schedule_build(guild)
+        self.linear_lookups += 1
+        return self._linear_find(guild.members, query)
+    
+    @staticmethod
+    def _linear_find(members: Iterable, query: str) -> Optional[int]:
+        query = _normalize(query)
+        if not query:
+            return None
+        partial = None
+        for member in members:
+            name, display_name = _normalize(member.name), _normalize(member.display_name)
+            if query == name or query == display_name:
+                return member.id
+            if partial is None and (query in name or query in display_name):
+                partial = member.id
+        return partial
+    
+    def _indexes_for(self, guild_id: int):
+        for registry in (self._guilds, self._building):
+            index = registry.get(guild_id)
+            if index is not None:
+                yield index
+    
+    # Événements de membres (sans effet tant que le serveur n'est pas indexé)
+    
+    def on_member_join(self, member):
+        for index in self._indexes_for(member.guild.id):
+            index.add(member.id, member.name, member.display_name)
+    
+    def on_member_update(self, before, after):
+        if before.name != after.name or before.display_name != after.display_name:
+            self.on_member_join(after)
+    
+    def on_member_remove(self, member):
+        for index in self._indexes_for(member.guild.id):
+            index.remove(member.id)
+    
+    def on_user_update(self, before, after):
+        """Changement de nom global: mettre à jour chaque serveur indexé où l'utilisateur est membre"""
+        if before.name == after.name and before.display_name == after.display_name:
+            return
+        for guild in getattr(after, 'mutual_guilds', ()):
+            member = guild.get_member(after.id)
+            if member is not None:
+                self.on_member_join(member)
+    
+    def drop_guild(self, guild_id: int):
+        """Oublier l'index d'un serveur (bot retiré du serveur), y compris une construction en cours"""
+        self._guilds.pop(guild_id, None)
+        self._building.pop(guild_id, None)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Statistiques de l'index"""
+        return {
+            'indexed_guilds': len(self._guilds),
+            'indexed_members': sum(len(index) for index in self._guilds.values()),
+            'builds': self.builds,
+            'lookups': self.lookups,
+            'linear_lookups': self.linear_lookups
+        }
+
+
+# Instance globale
+member_index = MemberIndex()
@@ -1,36 +1,463 @@
 """
 Système de limitation de taux pour Aegis
 """
-from typing import Dict, List
-from datetime import datetime, timedelta
-from collections import defaultdict, deque
+import asyncio
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 from config.logging_config import get_logger
 
 logger = get_logger('rate_limiter')
 
 
+class RateLimitBackend:
+    """
+    Interface des backends de stockage du rate limiter
+    
+    Chaque backend gère sa propre horloge et implémente une fenêtre glissante:
+    `hit` vérifie ET enregistre l'action de manière atomique.
+    """
+    
+    name = "none"
+    # True si le backend supprime lui-même les clés expirées au fil de l'eau
+    incremental_cleanup = False
+    # True si les opérations font des E/S bloquantes (à exécuter hors de la boucle d'événements)
+    blocking = False
+    
+    def hit(self, key: str, max_actions: int, window: float) -> bool:
+        """Enregistrer une action si la limite n'est pas atteinte"""
+        return self.hit_many([(key, max_actions)], window) is None
+    
+    def hit_many(self, entries: Sequence[Tuple[str, int]], window: float) -> Optional[int]:
+        """
+        Enregistrer une action sur plusieurs clés en tout-ou-rien
+        
+        Args:
+            entries: Couples (clé, limite)
+            window: Fenêtre glissante en secondes
+            
+        Returns:
+            Index de la première clé dont la limite est atteinte (rien n'est
+            enregistré), None si l'action a été enregistrée sur toutes les clés
+        """
+        raise NotImplementedError
+    
+    def count(self, key: str, window: float) -> int:
+        """Nombre d'actions dans la fenêtre"""
+        raise NotImplementedError
+    
+    def retry_after(self, key: str, max_actions: int, window: float) -> float:
+        """Secondes avant la prochaine action autorisée (0 si autorisée)"""
+        raise NotImplementedError
+    
+    def reset(self, key: str) -> bool:
+        """Oublier les actions d'une clé"""
+        raise NotImplementedError
+    
+    def cleanup(self, window: float) -> int:
+        """Supprimer les actions expirées, retourne le nombre d'entrées supprimées"""
+        raise NotImplementedError
+    
+    def stats(self) -> Dict[str, int]:
+        """Nombre de clés et d'actions suivies"""
+        raise NotImplementedError
+    
+    def close(self):
+        """Libérer les ressources du backend"""
+        pass
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Backend en mémoire (propre au processus, perdu au redémarrage)
+    
+    Chaque clé occupe un tampon circulaire de taille fixe (la limite) d'horodatages
+    monotones en millisecondes. La case suivante à écrire contient l'action la plus
+    ancienne: la vérification est en O(1). Les clés inactives sont supprimées
+    progressivement par une roue temporelle, jamais par un parcours complet sur le
+    chemin des requêtes.
+    """
+    
+    name = "memory"
+    incremental_cleanup = True
+    
+    def __init__(self, tick_seconds: float = 60.0, cleanup_budget: int = 1000):
+        """
+        Args:
+            tick_seconds: Granularité de la roue temporelle
+            cleanup_budget: Nombre maximum de clés examinées par vérification
+        """
+        # {key: array('q', [position d'écriture, t1, ..., tN])}
+        self._rings: Dict[str, array] = {}
+        # Roue temporelle: {tick: [clés à réexaminer]}
+        self._wheel: Dict[int, List[str]] = {}
+        self._tick_ms = max(1, int(tick_seconds * 1000))
+        self._next_tick = self._now_ms() // self._tick_ms
+        self._advance_at = self._next_tick * self._tick_ms
+        self._cleanup_budget = cleanup_budget
+        self._window_ms = 0
+        self.expired_keys = 0
+    
+    @staticmethod
+    def _now_ms() -> int:
+        # Jamais 0: 0 marque une case vide du tampon
+        return time.monotonic_ns() // 1_000_000 or 1
+    
+    @staticmethod
+    def _resize(ring: array, max_actions: int):
+        """Adapter un tampon à une nouvelle limite en gardant les actions les plus récentes"""
+        size = len(ring) - 1
+        position = ring[0]
+        ordered = [stamp for stamp in ring[1 + position:].tolist() + ring[1:1 + position].tolist() if stamp]
+        kept = ordered[-max_actions:]
+        ring[:] = array('q', [len(kept) % max_actions] + kept + [0] * (max_actions - len(kept)))
+    
+    @staticmethod
+    def _newest(ring: array) -> int:
+        return ring[1 + (ring[0] - 1) % (len(ring) - 1)]
+    
+    def _schedule(self, key: str, expires_ms: int):
+        self._wheel.setdefault(expires_ms // self._tick_ms + 1, []).append(key)
+    
+    def _advance(self, now: int):
+        """Faire tourner la roue: supprimer une partie des clés expirées"""
+        current = now // self._tick_ms
+        if not self._wheel:
+            self._next_tick = current + 1
+            self._advance_at = self._next_tick * self._tick_ms
+            return
+        
+        budget = self._cleanup_budget
+        while self._next_tick <= current and budget > 0:
+            keys = self._wheel.get(self._next_tick)
+            while keys and budget > 0:
+                key = keys.pop()
+                budget -= 1
+                ring = self._rings.get(key)
+                if ring is None:
+                    continue
+                expires = self._newest(ring) + self._window_ms
+                if expires <= now:
+                    del self._rings[key]
+                    self.expired_keys += 1
+                else:
+                    self._schedule(key, expires)
+            if not keys:
+                self._wheel.pop(self._next_tick, None)
+                self._next_tick += 1
+        # Budget épuisé: on reprendra dès la prochaine vérification
+        self._advance_at = self._next_tick * self._tick_ms if self._next_tick > current else now
+    
+    def hit_many(self, entries: Sequence[Tuple[str, int]], window: float) -> Optional[int]:
+        now = self._now_ms()
+        window_ms = int(window * 1000)
+        self._window_ms = window_ms
+        if now >= self._advance_at:
+            self._advance(now)
+        
+        pending = []
+        for index, (key, max_actions) in enumerate(entries):
+            if max_actions <= 0:
+                return index
+            ring = self._rings.get(key)
+            if ring is not None:
+                if len(ring) - 1 != max_actions:
+                    self._resize(ring, max_actions)
+                oldest = ring[1 + ring[0]]
+                if oldest and now - oldest < window_ms:
+                    return index
+            pending.append((key, ring, max_actions))
+        
+        for key, ring, max_actions in pending:
+            if ring is None:
+                ring = array('q', bytes(8 * (max_actions + 1)))
+                self._rings[key] = ring
+                self._schedule(key, now + window_ms)
+            position = ring[0]
+            ring[1 + position] = now
+            ring[0] = (position + 1) % max_actions
+        return None
+    
+    def count(self, key: str, window: float) -> int:
+        ring = self._rings.get(key)
+        if ring is None:
+            return 0
+        cutoff = self._now_ms() - int(window * 1000)
+        return sum(1 for stamp in ring[1:] if stamp > cutoff)
+    
+    def retry_after(self, key: str, max_actions: int, window: float) -> float:
+        ring = self._rings.get(key)
+        if ring is None or max_actions <= 0:
+            return 0
+        if len(ring) - 1 != max_actions:
+            self._resize(ring, max_actions)
+        
+        # Temps depuis la plus ancienne action conservée
+        oldest = ring[1 + ring[0]]
+        elapsed = self._now_ms() - oldest
+        window_ms = int(window * 1000)
+        if not oldest or elapsed >= window_ms:
+            return 0
+        return (window_ms - elapsed) / 1000
+    
+    def reset(self, key: str) -> bool:
+        return self._rings.pop(key, None) is not None
+    
+    def cleanup(self, window: float) -> int:
+        """Parcours complet (maintenance explicite, la roue suffit en fonctionnement normal)"""
+        cutoff = self._now_ms() - int(window * 1000)
+        expired = [key for key, ring in self._rings.items() if self._newest(ring) <= cutoff]
+        for key in expired:
+            del self._rings[key]
+        return len(expired)
+    
+    def stats(self) -> Dict[str, int]:
+        cutoff = self._now_ms() - self._window_ms
+        return {
+            'active_keys': len(self._rings),
+            'tracked_actions': sum(1 for ring in self._rings.values() for stamp in ring[1:] if stamp > cutoff),
+            'expired_keys': self.expired_keys
+        }
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    Backend SQLite partagé entre processus (shards) et persistant au redémarrage
+    
+    Les horodatages sont en temps Unix pour être comparables d'un processus à
+    l'autre. Chaque `hit` s'exécute dans une transaction BEGIN IMMEDIATE: la
+    vérification et l'enregistrement sont atomiques même entre processus.
+    L'attente du verrou d'écriture est courte: si un autre processus le garde,
+    l'action est autorisée sans être enregistrée (fail-open) plutôt que de
+    bloquer l'appelant.
+    """
+    
+    name = "sqlite"
+    blocking = True
+    
+    def __init__(self, db_path: str, busy_timeout: float = 0.075, cleanup_batch_size: int = 500):
+        """
+        Args:
+            db_path: Fichier SQLite partagé
+            busy_timeout: Attente maximale du verrou d'écriture (secondes)
+            cleanup_batch_size: Nombre d'actions supprimées par transaction de nettoyage
+        """
+        self.db_path = Path(db_path)
+        self.cleanup_batch_size = cleanup_batch_size
+        self.busy_failures = 0
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(self.db_path), timeout=busy_timeout, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_events (key TEXT NOT NULL, ts REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_rate_limit_events_key_ts ON rate_limit_events(key, ts)"
+        )
+    
+    def hit_many(self, entries: Sequence[Tuple[str, int]], window: float) -> Optional[int]:
+        now = time.time()
+        with self._lock:
+            connection = self._connection
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                blocked = None
+                for index, (key, max_actions) in enumerate(entries):
+                    connection.execute("DELETE FROM rate_limit_events WHERE key = ? AND ts <= ?", (key, now - window))
+                    (count,) = connection.execute(
+                        "SELECT COUNT(*) FROM rate_limit_events WHERE key = ?", (key,)
+                    ).fetchone()
+                    if count >= max_actions:
+                        blocked = index
+                        break
+                if blocked is None:
+                    connection.executemany(
+                        "INSERT INTO rate_limit_events (key, ts) VALUES (?, ?)", [(key, now) for key, _ in entries]
+                    )
+                connection.execute("COMMIT")
+                return blocked
+            except sqlite3.OperationalError as e:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                if "locked" not in str(e) and "busy" not in str(e):
+                    raise
+                # Verrou tenu par un autre processus: on autorise sans attendre
+                self.busy_failures += 1
+                logger.warning(f"Rate limiter SQLite occupé, action autorisée sans enregistrement: {e}")
+                return None
+            except Exception:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+    
+    def count(self, key: str, window: float) -> int:
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM rate_limit_events WHERE key = ? AND ts > ?", (key, time.time() - window)
+            ).fetchone()
+        return count
+    
+    def retry_after(self, key: str, max_actions: int, window: float) -> float:
+        now = time.time()
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT ts FROM rate_limit_events WHERE key = ? AND ts > ? ORDER BY ts LIMIT ?",
+                (key, now - window, max_actions)
+            ).fetchall()
+        if len(rows) < max_actions:
+            return 0
+        return max(0.0, window - (now - rows[0][0]))
+    
+    def reset(self, key: str) -> bool:
+        with self._lock:
+            cursor = self._connection.execute("DELETE FROM rate_limit_events WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+    
+    def cleanup(self, window: float) -> int:
+        """
+        Supprimer les actions expirées par petits lots
+        
+        Le parcours avance dans l'ordre des rowid: chaque lot est une courte
+        transaction et le verrou est relâché entre deux lots, les vérifications
+        ne restent jamais bloquées derrière le nettoyage.
+        """
+        cutoff = time.time() - window
+        removed = 0
+        last_rowid = 0
+        while True:
+            with self._lock:
+                try:
+                    rows = self._connection.execute(
+                        "SELECT rowid FROM rate_limit_events WHERE rowid > ? AND ts <= ? ORDER BY rowid LIMIT ?",
+                        (last_rowid, cutoff, self.cleanup_batch_size)
+                    ).fetchall()
+                    if not rows:
+                        break
+                    cursor = self._connection.execute(
+                        "DELETE FROM rate_limit_events WHERE rowid BETWEEN ? AND ? AND ts <= ?",
+                        (rows[0][0], rows[-1][0], cutoff)
+                    )
+                except sqlite3.OperationalError as e:
+                    # Base occupée: la suite sera supprimée au prochain nettoyage
+                    logger.warning(f"Nettoyage du rate limiter SQLite interrompu: {e}")
+                    break
+            removed += cursor.rowcount
+            last_rowid = rows[-1][0]
+            if len(rows) < self.cleanup_batch_size:
+                break
+        return removed
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            keys, actions = self._connection.execute(
+                "SELECT COUNT(DISTINCT key), COUNT(*) FROM rate_limit_events"
+            ).fetchone()
+        return {'active_keys': keys, 'tracked_actions': actions, 'busy_failures': self.busy_failures}
+    
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def create_rate_limit_backend(backend: Optional[str] = None) -> RateLimitBackend:
+    """
+    Créer le backend configuré (RATE_LIMIT_BACKEND)
+    
+    Args:
+        backend: memory ou sqlite (défaut: bot_settings.rate_limit_backend)
+    
+    Returns:
+        Backend du rate limiter (mémoire en cas d'erreur)
+    """
+    from config.bot_config import bot_settings
+    
+    backend = backend or bot_settings.rate_limit_backend
+    
+    if backend == "sqlite":
+        try:
+            return SQLiteRateLimitBackend(bot_settings.local_db_path)
+        except Exception as e:
+            logger.error(f"❌ Backend SQLite du rate limiter indisponible, repli en mémoire: {e}")
+    
+    return MemoryRateLimitBackend()
+
+
 class RateLimiter:
-    """Gestionnaire de limitation de taux pour les actions utilisateurs"""
+    """
+    Gestionnaire de limitation de taux pour les actions utilisateurs
+    
+    Les limites sont hiérarchiques: par utilisateur sur un serveur, par
+    serveur (tous utilisateurs confondus) et globale. Une action n'est
+    enregistrée que si aucun niveau n'est saturé.
+    """
     
-    def __init__(self, max_actions: int = 3, time_window: int = 3600):
+    def __init__(self, max_actions: int = 3, time_window: int = 3600, backend: Optional[RateLimitBackend] = None,
+                 guild_max_actions: Optional[int] = None, global_max_actions: Optional[int] = None,
+                 limits_resolver: Optional[Callable[[int], Dict[str, int]]] = None):
         """
         Initialiser le rate limiter
         
         Args:
-            max_actions: Nombre maximum d'actions par fenêtre
+            max_actions: Nombre maximum d'actions par utilisateur et par fenêtre
             time_window: Fenêtre de temps en secondes (défaut: 1 heure)
+            backend: Stockage des actions (défaut: en mémoire)
+            guild_max_actions: Limite par serveur (None = pas de limite)
+            global_max_actions: Limite globale tous serveurs (None = pas de limite)
+            limits_resolver: Fonction guild_id -> rate_limits de la config du serveur
+                (reports_per_user_per_hour, reports_per_guild_per_hour)
         """
         self.max_actions = max_actions
         self.time_window = time_window
-        
-        # Stockage des actions par utilisateur et serveur
-        # Structure: {(user_id, guild_id): deque([timestamps...])}
-        self.user_actions: Dict[tuple, deque] = defaultdict(deque)
+        self.backend = backend or MemoryRateLimitBackend()
+        self.guild_max_actions = guild_max_actions
+        self.global_max_actions = global_max_actions
+        self.limits_resolver = limits_resolver
         
         # Dernière action de nettoyage
-        self.last_cleanup = datetime.utcnow()
-        self.cleanup_interval = timedelta(hours=1)
+        self.last_cleanup = time.monotonic()
+        self.cleanup_interval = 3600.0
+        # True: cleanup() est appelé par le planificateur, plus sur le chemin des requêtes
+        self.scheduled_cleanup = False
+        # Un seul thread pour les backends bloquants: le backend sérialise déjà ses accès
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    @staticmethod
+    def _key(user_id: int, guild_id: int = None) -> str:
+        return f"{user_id}:{guild_id}"
+    
+    def _scopes(self, user_id: int, guild_id: int = None) -> List[Tuple[str, int]]:
+        """
+        Niveaux de limite applicables à une action
+        
+        Returns:
+            Liste de (clé, limite): utilisateur, puis serveur, puis global
+        """
+        user_limit = self.max_actions
+        guild_limit = self.guild_max_actions
+        
+        if guild_id is not None and self.limits_resolver:
+            try:
+                limits = self.limits_resolver(guild_id) or {}
+                user_limit = limits.get('reports_per_user_per_hour', user_limit)
+                guild_limit = limits.get('reports_per_guild_per_hour', guild_limit)
+            except Exception as e:
+                logger.error(f"Erreur lecture des limites du serveur {guild_id}: {e}")
+        
+        scopes = [(f"{user_id}:{guild_id}", user_limit)]
+        if guild_id is not None and guild_limit is not None:
+            scopes.append((f"guild:{guild_id}", guild_limit))
+        if self.global_max_actions is not None:
+            scopes.append(("global", self.global_max_actions))
+        return scopes
     
     def check_rate_limit(self, user_id: int, guild_id: int = None) -> bool:
         """
@@ -39,36 +466,70 @@ class RateLimiter:
         Args:
             user_id: ID de l'utilisateur
             guild_id: ID du serveur (optionnel)
-            
+        
         Returns:
             True si l'action est autorisée
         """
         try:
             # Nettoyer périodiquement
-            self._cleanup_if_needed()
-            
-            key = (user_id, guild_id)
-            now = datetime.utcnow()
-            cutoff_time = now - timedelta(seconds=self.time_window)
-            
-            # Nettoyer les anciennes entrées pour cet utilisateur
-            actions = self.user_actions[key]
-            while actions and actions[0] < cutoff_time:
-                actions.popleft()
-            
-            # Vérifier si la limite est dépassée
-            if len(actions) >= self.max_actions:
-                logger.warning(f"Rate limit dépassé pour user {user_id} (guild {guild_id})")
-                return False
-            
-            # Enregistrer l'action
-            actions.append(now)
-            return True
+            if self._cleanup_due():
+                self.cleanup()
             
+            # Vérification et enregistrement atomiques sur tous les niveaux
+            scopes = self._scopes(user_id, guild_id)
+            blocked = self.backend.hit_many(scopes, self.time_window)
+            return self._allowed(scopes, blocked, user_id, guild_id)
+        
         except Exception as e:
             logger.error(f"Erreur dans check_rate_limit: {e}")
             return True  # En cas d'erreur, on autorise (fail-open)
     
+    async def check_rate_limit_async(self, user_id: int, guild_id: int = None) -> bool:
+        """
+        Variante de check_rate_limit pour les appelants asynchrones
+        
+        Un backend bloquant (SQLite) est interrogé dans un thread dédié, jamais
+        sur la boucle d'événements. Le backend mémoire reste appelé directement.
+        
+        Returns:
+            True si l'action est autorisée
+        """
+        if not self.backend.blocking:
+            return self.check_rate_limit(user_id, guild_id)
+        
+        try:
+            if self._cleanup_due():
+                await self._run_blocking(self.cleanup)
+            
+            scopes = self._scopes(user_id, guild_id)
+            blocked = await self._run_blocking(self.backend.hit_many, scopes, self.time_window)
+            return self._allowed(scopes, blocked, user_id, guild_id)
+        
+        except Exception as e:
+            logger.error(f"Erreur dans check_rate_limit_async: {e}")
+            return True  # En cas d'erreur, on autorise (fail-open)
+    
+    async def _run_blocking(self, func, *args):
+        """Exécuter une opération du backend bloquant dans le thread dédié (accès sérialisés)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rate_limiter")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    def _allowed(self, scopes: List[Tuple[str, int]], blocked: Optional[int], user_id: int, guild_id: int) -> bool:
+        """Interpréter le résultat de hit_many et journaliser le niveau saturé"""
+        if blocked is None:
+            return True
+        
+        key = scopes[blocked][0]
+        if blocked == 0:
+            logger.warning(f"Rate limit dépassé pour user {user_id} (guild {guild_id})")
+        elif key.startswith("guild:"):
+            logger.warning(f"Rate limit du serveur {guild_id} dépassé (user {user_id})")
+        else:
+            logger.warning(f"Rate limit global dépassé (user {user_id}, guild {guild_id})")
+        return False
+    
     def get_remaining_time(self, user_id: int, guild_id: int = None) -> int:
         """
         Obtenir le temps restant avant la prochaine action autorisée
@@ -76,21 +537,41 @@ class RateLimiter:
         Args:
             user_id: ID de l'utilisateur
             guild_id: ID du serveur
-            
+        
         Returns:
             Secondes restantes (0 si action autorisée)
         """
-        key = (user_id, guild_id)
-        actions = self.user_actions.get(key)
-        
-        if not actions or len(actions) < self.max_actions:
+        try:
+            remaining = self._retry_after(self._scopes(user_id, guild_id))
+        except Exception as e:
+            logger.error(f"Erreur dans get_remaining_time: {e}")
             return 0
         
-        # Temps depuis la première action dans la fenêtre
-        oldest_action = actions[0]
-        time_since_oldest = (datetime.utcnow() - oldest_action).total_seconds()
+        return max(0, int(remaining))
+    
+    async def get_remaining_time_async(self, user_id: int, guild_id: int = None) -> int:
+        """
+        Variante de get_remaining_time pour les appelants asynchrones
+        
+        Passe par le même thread dédié que check_rate_limit_async pour un
+        backend bloquant.
         
-        return max(0, int(self.time_window - time_since_oldest))
+        Returns:
+            Secondes restantes (0 si action autorisée)
+        """
+        if not self.backend.blocking:
+            return self.get_remaining_time(user_id, guild_id)
+        
+        try:
+            remaining = await self._run_blocking(self._retry_after, self._scopes(user_id, guild_id))
+        except Exception as e:
+            logger.error(f"Erreur dans get_remaining_time_async: {e}")
+            return 0
+        
+        return max(0, int(remaining))
+    
+    def _retry_after(self, scopes: List[Tuple[str, int]]) -> float:
+        return max(self.backend.retry_after(key, limit, self.time_window) for key, limit in scopes)
     
     def reset_user_limit(self, user_id: int, guild_id: int = None):
         """
@@ -100,9 +581,7 @@ class RateLimiter:
             user_id: ID de l'utilisateur
             guild_id: ID du serveur
         """
-        key = (user_id, guild_id)
-        if key in self.user_actions:
-            del self.user_actions[key]
+        if self.backend.reset(self._key(user_id, guild_id)):
             logger.info(f"Rate limit réinitialisé pour user {user_id} (guild {guild_id})")
     
     def get_user_action_count(self, user_id: int, guild_id: int = None) -> int:
@@ -112,56 +591,53 @@ class RateLimiter:
         Args:
             user_id: ID de l'utilisateur
             guild_id: ID du serveur
-            
+        
         Returns:
             Nombre d'actions dans la fenêtre
         """
-        key = (user_id, guild_id)
-        actions = self.user_actions.get(key, deque())
-        
-        # Nettoyer les anciennes entrées
-        now = datetime.utcnow()
-        cutoff_time = now - timedelta(seconds=self.time_window)
-        
-        while actions and actions[0] < cutoff_time:
-            actions.popleft()
-            
-        return len(actions)
+        return self.backend.count(self._key(user_id, guild_id), self.time_window)
     
-    def _cleanup_if_needed(self):
-        """Nettoyer les anciennes entrées si nécessaire"""
-        now = datetime.utcnow()
-        
-        if now - self.last_cleanup < self.cleanup_interval:
-            return
-        
-        self.last_cleanup = now
-        cutoff_time = now - timedelta(seconds=self.time_window)
-        
-        # Nettoyer toutes les entrées expirées
-        keys_to_remove = []
+    def _cleanup_due(self) -> bool:
+        """Indiquer si un nettoyage doit être fait pendant la vérification"""
+        # La roue temporelle du backend mémoire nettoie déjà au fil de l'eau
+        if self.backend.incremental_cleanup or self.scheduled_cleanup:
+            return False
         
-        for key, actions in self.user_actions.items():
-            # Nettoyer les anciennes actions
-            while actions and actions[0] < cutoff_time:
-                actions.popleft()
-            
-            # Marquer les clés vides pour suppression
-            if not actions:
-                keys_to_remove.append(key)
+        return time.monotonic() - self.last_cleanup >= self.cleanup_interval
+    
+    def cleanup(self) -> int:
+        """
+        Nettoyer les entrées expirées du backend
         
-        # Supprimer les clés vides
-        for key in keys_to_remove:
-            del self.user_actions[key]
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        self.last_cleanup = time.monotonic()
+        removed = self.backend.cleanup(self.time_window)
         
-        if keys_to_remove:
-            logger.debug(f"Nettoyage rate limiter: {len(keys_to_remove)} entrées supprimées")
+        if removed:
+            logger.debug(f"Nettoyage rate limiter: {removed} entrées supprimées")
+        return removed
+    
+    def close(self):
+        """Fermer le backend (fin du bot)"""
+        try:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            self.backend.close()
+        except Exception as e:
+            logger.error(f"Erreur fermeture du rate limiter: {e}")
     
     def get_stats(self) -> Dict[str, int]:
         """Obtenir les statistiques du rate limiter"""
+        backend_stats = self.backend.stats()
         return {
-            'active_users': len(self.user_actions),
-            'total_tracked_actions': sum(len(actions) for actions in self.user_actions.values()),
+            'active_users': backend_stats['active_keys'],
+            'total_tracked_actions': backend_stats['tracked_actions'],
             'max_actions_per_window': self.max_actions,
-            'time_window_seconds': self.time_window
-        }
\ No newline at end of file
+            'guild_max_actions_per_window': self.guild_max_actions,
+            'global_max_actions_per_window': self.global_max_actions,
+            'time_window_seconds': self.time_window,
+            'backend': self.backend.name
+        }
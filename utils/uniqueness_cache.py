@@ -0,0 +1,179 @@
+"""
+Cache borné des vérifications de doublons pour Aegis
+"""
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from config.logging_config import get_logger
+
+logger = get_logger('uniqueness_cache')
+
+# Marqueur des résultats négatifs (hash absent de la base)
+_NOT_DUPLICATE = ""
+
+
+class BloomFilter:
+    """
+    Filtre de Bloom sur les hash d'unicité
+
+    Un résultat négatif est certain (le hash n'a jamais été ajouté), un résultat
+    positif peut être un faux positif et doit être confirmé en base.
+
+    Le filtre ne connaît que les hash chargés au démarrage et ceux ajoutés par
+    ce processus: il n'est pas sûr si une autre instance du bot écrit dans la
+    même base Supabase (ses signalements ne seraient pas vus comme doublons).
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class UniquenessCache:
+    """
+    Cache LRU avec expiration des résultats de détection de doublons
+
+    Conserve les résultats positifs (hash → ID du signalement) et négatifs
+    (hash absent de la base) pour éviter un aller-retour Supabase à chaque
+    nouveau signalement.
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 86_400.0, negative_ttl: float = 300.0):
+        """
+        Initialiser le cache
+
+        Args:
+            max_size: Nombre maximum d'entrées (éviction LRU au-delà)
+            ttl: Durée de vie d'un résultat positif en secondes
+            negative_ttl: Durée de vie d'un résultat négatif en secondes
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        # {uniqueness_hash: (report_id ou _NOT_DUPLICATE, expiration)}
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.bloom: Optional[BloomFilter] = None
+
+        # Métriques
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.bloom_skips = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def lookup(self, uniqueness_hash: str) -> Tuple[bool, Optional[str]]:
+        """
+        Chercher un hash dans le cache
+
+        Returns:
+            (trouvé, report_id) - report_id est None pour un résultat négatif
+        """
+        entry = self._entries.get(uniqueness_hash)
+        if entry is not None:
+            report_id, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(uniqueness_hash)
+                if report_id == _NOT_DUPLICATE:
+                    self.negative_hits += 1
+                    return True, None
+                self.hits += 1
+                return True, report_id
+
+            del self._entries[uniqueness_hash]
+            self.expirations += 1
+
+        # Absent du filtre de Bloom: jamais vu en base ni localement
+        if self.bloom is not None and uniqueness_hash not in self.bloom:
+            self.bloom_skips += 1
+            return True, None
+
+        self.misses += 1
+        return False, None
+
+    def put(self, uniqueness_hash: str, report_id: str):
+        """Enregistrer un résultat positif"""
+        self._store(uniqueness_hash, report_id, self.ttl)
+        if self.bloom is not None:
+            self.bloom.add(uniqueness_hash)
+
+    def put_negative(self, uniqueness_hash: str):
+        """Enregistrer un résultat négatif (pas de doublon en base)"""
+        self._store(uniqueness_hash, _NOT_DUPLICATE, self.negative_ttl)
+
+    def _store(self, uniqueness_hash: str, value: str, ttl: float):
+        self._entries[uniqueness_hash] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(uniqueness_hash)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, uniqueness_hash: str):
+        """Oublier un hash (signalement supprimé)"""
+        self._entries.pop(uniqueness_hash, None)
+
+    def contains_duplicate(self, uniqueness_hash: str) -> bool:
+        """Vérification sans effet de bord: hash connu comme doublon et non expiré"""
+        entry = self._entries.get(uniqueness_hash)
+        return bool(entry and entry[0] != _NOT_DUPLICATE and entry[1] > time.monotonic())
+
+    def seed_bloom(self, hashes: Iterable[str], capacity: int = 100_000) -> int:
+        """
+        Construire le filtre de Bloom à partir des hash connus en base
+
+        Args:
+            hashes: Hash d'unicité existants
+            capacity: Capacité attendue du filtre
+
+        Returns:
+            Nombre de hash ajoutés
+        """
+        hashes = list(hashes)
+        bloom = BloomFilter(capacity=max(capacity, len(hashes) * 2))
+        for uniqueness_hash in hashes:
+            bloom.add(uniqueness_hash)
+        # Les résultats positifs déjà en cache doivent rester visibles
+        for uniqueness_hash, (report_id, _) in self._entries.items():
+            if report_id != _NOT_DUPLICATE:
+                bloom.add(uniqueness_hash)
+        self.bloom = bloom
+        return len(hashes)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques du cache"""
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'bloom_skips': self.bloom_skips,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'bloom_entries': self.bloom.count if self.bloom is not None else None
+        }
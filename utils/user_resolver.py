@@ -0,0 +1,133 @@
+"""
+Résolution des utilisateurs Discord sans appel API superflu
+
+Cherche d'abord dans le cache de discord.py (membre du serveur, puis
+utilisateur connu du bot), puis dans un cache borné avec expiration des
+utilisateurs déjà récupérés; fetch_user (requête HTTP) n'est appelé qu'en
+dernier recours, une seule fois par ID même sous charge.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import discord
+
+from config.logging_config import get_logger
+from config.bot_config import bot_settings
+
+logger = get_logger('user_resolver')
+
+
+class UserResolver:
+    """Résolution ID -> nom d'utilisateur avec cache LRU à expiration"""
+    
+    def __init__(self, max_size: int = 5000, ttl: float = 3600.0, negative_ttl: float = 300.0):
+        """
+        Args:
+            max_size: Nombre maximum d'utilisateurs récupérés conservés
+            ttl: Durée de vie d'un utilisateur récupéré (secondes)
+            negative_ttl: Durée de vie d'un ID inexistant (secondes)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        
+        # {user_id: (nom ou None si inexistant, expiration)}
+        self._entries: "OrderedDict[int, Tuple[Optional[str], float]]" = OrderedDict()
+        # Récupérations en cours (une seule requête HTTP par ID)
+        self._inflight: Dict[int, asyncio.Task] = {}
+        
+        # Métriques
+        self.member_hits = 0
+        self.client_hits = 0
+        self.cache_hits = 0
+        self.misses = 0
+        self.fetch_errors = 0
+        self.evictions = 0
+    
+    async def resolve_name(self, client, guild, user_id: int) -> Optional[str]:
+        """
+        Nom d'utilisateur d'un ID Discord
+        
+        Args:
+            client: Bot discord.py
+            guild: Serveur de la commande (optionnel)
+            user_id: ID Discord
+        
+        Returns:
+            Nom de l'utilisateur, ou None s'il est introuvable
+        """
+        member = guild.get_member(user_id) if guild else None
+        if member is not None:
+            self.member_hits += 1
+            return member.name
+        
+        user = client.get_user(user_id)
+        if user is not None:
+            self.client_hits += 1
+            return user.name
+        
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            name, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.cache_hits += 1
+                return name
+            del self._entries[user_id]
+        
+        task = self._inflight.get(user_id)
+        if task is not None:
+            self.cache_hits += 1
+        else:
+            self.misses += 1
+            task = asyncio.create_task(self._fetch(client, user_id))
+            self._inflight[user_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(user_id, None))
+        
+        # Récupération partagée: l'annulation d'une commande (même la première)
+        # ne l'interrompt pas pour les autres appels en attente
+        return await asyncio.shield(task)
+    
+    async def _fetch(self, client, user_id: int) -> Optional[str]:
+        try:
+            user = await client.fetch_user(user_id)
+        except discord.NotFound:
+            self._store(user_id, None, self.negative_ttl)
+            return None
+        except Exception as e:
+            # Erreur transitoire (rate limit, réseau): ne pas mettre en cache
+            self.fetch_errors += 1
+            logger.debug(f"fetch_user({user_id}) impossible: {e}")
+            return None
+        
+        self._store(user_id, user.name, self.ttl)
+        return user.name
+    
+    def _store(self, user_id: int, name: Optional[str], ttl: float):
+        self._entries[user_id] = (name, time.monotonic() + ttl)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques du résolveur"""
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'member_hits': self.member_hits,
+            'client_hits': self.client_hits,
+            'cache_hits': self.cache_hits,
+            'misses': self.misses,
+            'fetch_errors': self.fetch_errors,
+            'evictions': self.evictions
+        }
+
+
+# Instance globale
+user_resolver = UserResolver(
+    max_size=bot_settings.user_cache_size,
+    ttl=bot_settings.user_cache_ttl
+)